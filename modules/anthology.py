@@ -0,0 +1,163 @@
+import os
+import sys
+import time
+import zipfile
+import argparse
+import tempfile
+from io import BytesIO
+
+from lxml import etree
+
+from modules.rtf_converter import (
+    RTF_HEADER,
+    markdown_to_rtf_body,
+    get_docx_template,
+    new_styled_document,
+    append_markdown_to_docx,
+)
+from modules.bulk_convert import find_markdown_files
+
+# Page break between posts in each format
+RTF_PAGE_BREAK = '\n\\page\\pard '
+DOCX_PAGE_BREAK = (b'<w:p xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+                   b'<w:r><w:br w:type="page"/></w:r></w:p>')
+
+def read_title(path):
+    """Return the first heading of a markdown post, or its file name if it has none"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            stripped = line.strip()
+            if stripped.startswith('#'):
+                return stripped.lstrip('#').strip()
+    return os.path.splitext(os.path.basename(path))[0]
+
+def read_post(path):
+    """Read one markdown post"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read().replace('\r\n', '\n')
+
+def contents_markdown(title, posts):
+    """Build the title page and table of contents as markdown"""
+    lines = [f"# {title}", "", "## Contents", ""]
+    for i, (_, post_title) in enumerate(posts):
+        lines.append(f"{i + 1}. {post_title}")
+    return '\n'.join(lines) + '\n'
+
+def write_rtf_anthology(posts, output, title):
+    """Stream posts into a single RTF file, one post in memory at a time"""
+    output.write(RTF_HEADER)
+    output.write(markdown_to_rtf_body(contents_markdown(title, posts)))
+
+    for i, (path, _) in enumerate(posts):
+        output.write(RTF_PAGE_BREAK)
+        output.write(markdown_to_rtf_body(read_post(path)))
+        print(f"Added post {i + 1} of {len(posts)}: {path}")
+
+    output.write("\n}")
+
+def write_docx_body(stream, markdown_text, numbering):
+    """Render markdown with the styled template and write its body XML to a stream
+
+    List numbering is added to numbering, the anthology's own numbering part,
+    so numbering ids stay unique across posts and each list starts at 1.
+    """
+    doc = append_markdown_to_docx(new_styled_document(), markdown_text, numbering)
+    for child in doc.element.body:
+        # The section properties come from the template, once, at the end
+        if child.tag.endswith('}sectPr'):
+            continue
+        stream.write(etree.tostring(child))
+
+def split_document_xml(document_xml):
+    """Split the template's document.xml into the part before and after the body content"""
+    body_start = document_xml.index(b'<w:body>') + len(b'<w:body>')
+    body_end = document_xml.rfind(b'<w:sectPr')
+    if body_end < body_start:
+        body_end = document_xml.rindex(b'</w:body>')
+    return document_xml[:body_start], document_xml[body_end:]
+
+def write_docx_anthology(posts, output, title):
+    """Stream posts into a single DOCX package, one post in memory at a time
+
+    The package is copied from the styled template, and word/document.xml is
+    written incrementally instead of building one huge Document in memory.
+    word/numbering.xml is written last, once every list has its numbering.
+    """
+    numbering_part = new_styled_document().part.numbering_part
+    numbering_info = 'word/numbering.xml'
+    with zipfile.ZipFile(BytesIO(get_docx_template())) as source, \
+         zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as target:
+        for info in source.infolist():
+            if info.filename == 'word/numbering.xml':
+                numbering_info = info
+                continue
+            if info.filename != 'word/document.xml':
+                target.writestr(info, source.read(info))
+                continue
+
+            head, tail = split_document_xml(source.read(info))
+            with target.open('word/document.xml', 'w', force_zip64=True) as stream:
+                stream.write(head)
+                write_docx_body(stream, contents_markdown(title, posts), numbering_part.element)
+
+                for i, (path, _) in enumerate(posts):
+                    stream.write(DOCX_PAGE_BREAK)
+                    write_docx_body(stream, read_post(path), numbering_part.element)
+                    print(f"Added post {i + 1} of {len(posts)}: {path}")
+
+                stream.write(tail)
+
+        target.writestr(numbering_info, numbering_part.blob)
+
+def build_anthology(input_dir, output_file, title=None, fmt=None):
+    """Merge every markdown post in a folder into one RTF or DOCX with a table of contents"""
+    fmt = fmt or os.path.splitext(output_file)[1].lstrip('.').lower()
+    if fmt not in ('rtf', 'docx'):
+        raise ValueError(f"Unsupported anthology format: {fmt}")
+
+    title = title or os.path.basename(os.path.abspath(input_dir))
+    start = time.perf_counter()
+
+    # Only titles are kept in memory; post bodies are read one at a time while writing
+    posts = [(path, read_title(path)) for path in find_markdown_files(input_dir)]
+    if not posts:
+        raise ValueError(f"No markdown posts found in {input_dir}")
+
+    # Write to a temp file next to the output so a failed run never leaves a partial file
+    output_dir = os.path.dirname(os.path.abspath(output_file))
+    os.makedirs(output_dir, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=output_dir, suffix='.tmp')
+    try:
+        if fmt == 'rtf':
+            with os.fdopen(fd, 'w', encoding='utf-8') as output:
+                write_rtf_anthology(posts, output, title)
+        else:
+            with os.fdopen(fd, 'wb') as output:
+                write_docx_anthology(posts, output, title)
+        os.replace(temp_path, output_file)
+    except Exception:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+    print(f"Wrote {len(posts)} posts to {output_file} in {time.perf_counter() - start:.1f}s")
+    return output_file
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Merge a folder of markdown posts into one RTF or DOCX")
+    parser.add_argument('input_dir', help="Folder containing markdown posts (searched recursively)")
+    parser.add_argument('output_file', help="Output file ending in .rtf or .docx")
+    parser.add_argument('--title', help="Title for the anthology (defaults to the folder name)")
+    args = parser.parse_args(argv)
+
+    try:
+        build_anthology(args.input_dir, args.output_file, args.title)
+    except Exception as e:
+        print(f"Error building anthology: {str(e)}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
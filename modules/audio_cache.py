@@ -0,0 +1,74 @@
+import os
+import sys
+import json
+import hashlib
+import tempfile
+
+from modules.disk_cache import DiskCache
+from modules.settings import load_settings, AUDIO_CACHE_DIR, DEFAULT_AUDIO_CACHE_MB
+
+# pyttsx3 writes AIFF on macOS and WAV elsewhere; gTTS always writes MP3
+AUDIO_EXTENSIONS = {
+    'gtts': '.mp3',
+    'pyttsx3': '.aiff' if sys.platform == 'darwin' else '.wav',
+}
+
+# Shared cache instance, created on first use
+_audio_cache = None
+
+def get_audio_cache():
+    """Return the shared audio cache"""
+    global _audio_cache
+    if _audio_cache is None:
+        settings = load_settings()
+        max_mb = settings.get('audio_cache_max_mb', DEFAULT_AUDIO_CACHE_MB)
+        _audio_cache = DiskCache(AUDIO_CACHE_DIR, int(max_mb * 1024 * 1024))
+    return _audio_cache
+
+def audio_key(text, engine, voice_id='', rate=None, lang='en'):
+    """Build the cache key for one chunk of text rendered with a given engine and voice"""
+    fingerprint = json.dumps([text, engine, voice_id or '', rate, lang], ensure_ascii=False)
+    digest = hashlib.sha256(fingerprint.encode('utf-8')).hexdigest()
+    return digest + AUDIO_EXTENSIONS.get(engine, '.audio')
+
+def cached_audio_path(text, engine, voice_id='', rate=None, lang='en'):
+    """Return the path of a cached rendering of the text, or None"""
+    return get_audio_cache().get_path(audio_key(text, engine, voice_id, rate, lang))
+
+def synthesize_cached(text, engine, synthesize, voice_id='', rate=None, lang='en'):
+    """Return a cached audio file for the text, rendering it with synthesize(text, path) on a miss"""
+    cache = get_audio_cache()
+    key = audio_key(text, engine, voice_id, rate, lang)
+
+    path = cache.get_path(key)
+    if path:
+        return path
+
+    # Render into the cache folder first, then move it into place
+    os.makedirs(cache.directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=cache.directory, suffix='.tmp' + AUDIO_EXTENSIONS.get(engine, ''))
+    os.close(fd)
+    try:
+        synthesize(text, temp_path)
+        if os.path.getsize(temp_path) == 0:
+            raise RuntimeError(f"{engine} produced no audio")
+        return cache.add_file(key, temp_path)
+    except Exception:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+def synthesize_cached_bytes(text, engine, synthesize, voice_id='', rate=None, lang='en'):
+    """Return audio bytes for the text from the cache, rendering them in memory with synthesize(text) on a miss"""
+    cache = get_audio_cache()
+    key = audio_key(text, engine, voice_id, rate, lang)
+
+    data = cache.get(key)
+    if data is None:
+        data = synthesize(text)
+        if not data:
+            raise RuntimeError(f"{engine} produced no audio")
+        cache.put(key, data)
+    return data
@@ -0,0 +1,170 @@
+import os
+import re
+import sys
+import json
+import html
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import markdown
+
+from modules.settings import load_settings
+from modules.bulk_convert import find_markdown_files
+from modules.audio_cache import audio_key, AUDIO_EXTENSIONS
+
+# Engine names used by the audio cache for each TTS method
+ENGINES = {
+    'offline': 'pyttsx3',
+    'online': 'gtts',
+}
+
+DEFAULT_RATE = 190
+
+# pyttsx3 engine for this worker process, created once by the pool initializer
+_worker_engine = None
+
+def markdown_to_speech_text(markdown_text):
+    """Strip markdown formatting so only the words are spoken"""
+    rendered = markdown.markdown(markdown_text, extensions=['extra'])
+    # Put block elements on their own lines so headings don't run into paragraphs
+    rendered = re.sub(r'</(h[1-6]|p|li|tr)>', '.\n', rendered)
+    text = html.unescape(re.sub(r'<[^>]+>', '', rendered))
+    text = re.sub(r'\.\.+', '.', text)
+    text = re.sub(r'([!?:])\.', r'\1', text)
+    return re.sub(r'\n\s*\n+', '\n', text).strip()
+
+def init_worker(method):
+    """Start one pyttsx3 engine per worker process for offline rendering"""
+    global _worker_engine
+    if method == 'offline':
+        import pyttsx3
+        _worker_engine = pyttsx3.init()
+
+def render_audio(text, path, method, voice_id, rate, lang):
+    """Render text to an audio file with the chosen engine"""
+    if method == 'offline':
+        if voice_id:
+            _worker_engine.setProperty('voice', voice_id)
+        _worker_engine.setProperty('rate', rate)
+        _worker_engine.save_to_file(text, path)
+        _worker_engine.runAndWait()
+    else:
+        from gtts import gTTS
+        gTTS(text=text, lang=lang, slow=False).save(path)
+
+def manifest_path(audio_path):
+    """Return the sidecar file recording what an audio file was rendered from"""
+    return audio_path + '.json'
+
+def is_already_rendered(audio_path, key):
+    """Check if the audio exists and was rendered from the same text, engine and voice"""
+    if not os.path.exists(audio_path):
+        return False
+    try:
+        with open(manifest_path(audio_path), 'r', encoding='utf-8') as f:
+            return json.load(f).get('key') == key
+    except (OSError, ValueError):
+        return False
+
+def export_post_audio(input_file, audio_path, method, voice_id, rate, lang, force=False):
+    """Render one post to an audio file unless an identical rendering already exists"""
+    start = time.perf_counter()
+    result = {'input': input_file, 'output': audio_path, 'status': 'skipped', 'error': None, 'seconds': 0.0}
+
+    try:
+        with open(input_file, 'r', encoding='utf-8') as f:
+            text = markdown_to_speech_text(f.read())
+
+        key = audio_key(text, ENGINES[method], voice_id if method == 'offline' else '', rate, lang)
+        if force or not is_already_rendered(audio_path, key):
+            os.makedirs(os.path.dirname(audio_path) or '.', exist_ok=True)
+
+            # Render next to the target and rename, so a crash never leaves a truncated file
+            temp_path = audio_path + '.part' + os.path.splitext(audio_path)[1]
+            render_audio(text, temp_path, method, voice_id, rate, lang)
+            os.replace(temp_path, audio_path)
+
+            with open(manifest_path(audio_path), 'w', encoding='utf-8') as f:
+                json.dump({'key': key, 'source': input_file, 'engine': ENGINES[method],
+                           'voice_id': voice_id, 'rate': rate, 'lang': lang}, f, indent=4)
+            result['status'] = 'rendered'
+    except Exception as e:
+        result['status'] = 'failed'
+        result['error'] = str(e)
+
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+def export_audiobooks(input_dir, output_dir, method='offline', voice_id=None, rate=DEFAULT_RATE,
+                      lang='en', workers=None, force=False):
+    """Render every markdown post under input_dir to an audio file using a process pool"""
+    if method not in ENGINES:
+        raise ValueError(f"Unknown TTS method: {method}")
+
+    # Default to the voice chosen in the voice manager
+    if method == 'offline' and not voice_id:
+        voice_id = load_settings().get('voice_id', '')
+
+    extension = AUDIO_EXTENSIONS[ENGINES[method]]
+    posts = find_markdown_files(input_dir)
+    total_files = len(posts)
+    print(f"Found {total_files} posts in {input_dir}")
+
+    results = []
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(method,)) as pool:
+        futures = {}
+        for input_file in posts:
+            relative = os.path.relpath(input_file, input_dir)
+            audio_path = os.path.splitext(os.path.join(output_dir, relative))[0] + extension
+            future = pool.submit(export_post_audio, input_file, audio_path, method, voice_id, rate, lang, force)
+            futures[future] = input_file
+
+        for i, future in enumerate(as_completed(futures)):
+            try:
+                result = future.result()
+            except Exception as e:
+                # The worker process itself died
+                result = {'input': futures[future], 'status': 'failed', 'error': str(e), 'seconds': 0.0}
+            results.append(result)
+
+            # Progress with a simple ETA based on the average time per post so far
+            elapsed = time.perf_counter() - start
+            remaining = (elapsed / (i + 1)) * (total_files - i - 1)
+            line = (f"[{i+1}/{total_files}] {result['status']:>8} {result['input']} "
+                    f"({result['seconds']:.1f}s, ~{remaining:.0f}s left)")
+            if result['error']:
+                line += f" - {result['error']}"
+            print(line)
+
+    rendered = sum(1 for r in results if r['status'] == 'rendered')
+    skipped = sum(1 for r in results if r['status'] == 'skipped')
+    failed = [r for r in results if r['status'] == 'failed']
+    print(f"\nRendered {rendered}, skipped {skipped}, failed {len(failed)} "
+          f"in {time.perf_counter() - start:.1f}s")
+    for r in failed:
+        print(f"  {r['input']}: {r['error']}")
+
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render a folder of markdown posts to audio files")
+    parser.add_argument('input_dir', help="Folder containing markdown posts (searched recursively)")
+    parser.add_argument('-o', '--output-dir', default='audiobooks', help="Where to write the audio files")
+    parser.add_argument('-m', '--method', choices=sorted(ENGINES), default='offline',
+                        help="offline (pyttsx3, WAV/AIFF) or online (gTTS, MP3)")
+    parser.add_argument('--voice', help="pyttsx3 voice id (defaults to the saved voice)")
+    parser.add_argument('--rate', type=int, default=DEFAULT_RATE, help="Speech rate for offline voices")
+    parser.add_argument('--lang', default='en', help="Language for online voices")
+    parser.add_argument('-j', '--workers', type=int, default=None, help="Number of worker processes")
+    parser.add_argument('--force', action='store_true', help="Re-render even if the audio is up to date")
+    args = parser.parse_args(argv)
+
+    results = export_audiobooks(args.input_dir, args.output_dir, args.method, args.voice,
+                                args.rate, args.lang, args.workers, args.force)
+    return 1 if any(r['status'] == 'failed' for r in results) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,311 @@
+import os
+import sys
+import time
+import sqlite3
+import argparse
+from concurrent.futures import wait as wait_for_futures, CancelledError as FutureCancelledError
+
+from modules.settings import load_settings, load_prompt, DEFAULT_MODEL, DEFAULT_TEMPERATURE, DEFAULT_MAX_TOKENS
+from modules.openai_api import generate_blog_post, get_api_key, CANCELLED_MESSAGE
+from modules.batch_progress import BatchProgress, format_progress
+from modules.cancel import CancelToken
+from modules.journal import JobJournal
+from modules.scheduler import get_scheduler, PRIORITY_INTERACTIVE, PRIORITY_BATCH
+from modules.prefetch import Prefetcher
+from modules.post_cache import post_key, get_cached_post, cache_post
+from modules.export import schedule_export
+from modules.catalog import record_post, find_post
+from modules.transcript_reader import read_text, decode_text, clean_chunks
+from modules.corpus import walk_corpus, scan_in_background, ArchiveMember, corpus_filters, add_filter_arguments, filters_from_args
+
+# Retries when the API reports a rate limit, doubling the pause each time
+RATE_LIMIT_RETRIES = 3
+RATE_LIMIT_BACKOFF_SECONDS = 5
+
+class NamedString(str):
+    """Transcript text that carries its file name, as generate_blog_post expects"""
+
+def find_transcripts(folder, **filters):
+    """Yield the transcript files under a folder as they are found (see corpus.walk_corpus for the filters)"""
+    return walk_corpus(folder, **(filters or corpus_filters()))
+
+def read_transcript(path, name=None, clean=False):
+    """Read a transcript file or archive member in any encoding, named after it (just the file name unless another name is given)
+
+    With clean, the text is cleaned as it is decoded (see clean_transcript).
+    """
+    if isinstance(path, ArchiveMember):
+        transcript = NamedString(decode_text(path.read_bytes(), clean))
+        transcript.name = name or path.name
+        return transcript
+    transcript = NamedString(read_text(path, clean))
+    transcript.name = name or os.path.basename(path)
+    return transcript
+
+def clean_transcript(text):
+    """Normalize line endings and whitespace and drop control characters, which only cost tokens"""
+    return ''.join(clean_chunks([text]))
+
+def prepare_transcript(path, prompt, model, temperature, max_tokens, name=None, reuse=True):
+    """Read, clean and size a transcript and look up an earlier post for it
+
+    Returns a dict with the name, the source path, the cleaned transcript, its
+    estimated tokens, its post cache key and the earlier post (None if it was
+    never generated with these settings, or reuse is off), or an error message
+    if the file couldn't be read.
+    """
+    name = name or getattr(path, 'name', None) or os.path.basename(path)
+    try:
+        transcript = read_transcript(path, name, clean=True)
+    except Exception as e:
+        return {'name': name, 'error': f"Error reading {name}: {str(e)}"}
+    key = post_key(transcript, prompt, model, temperature, max_tokens)
+
+    post = get_cached_post(key) if reuse else None
+    if post is None and reuse and load_settings().get('reuse_cached_posts', True):
+        # Posts evicted from the post cache are still in the catalog
+        try:
+            found = find_post(transcript, model, prompt, temperature, max_tokens)
+        except sqlite3.Error as e:
+            print(f"Warning: Could not search catalog: {e}")
+            found = None
+        if found:
+            post = found['markdown']
+            cache_post(key, post)
+
+    return {
+        'name': name,
+        'source': getattr(path, 'source', None) or os.path.abspath(path),
+        'transcript': transcript,
+        'tokens': estimate_tokens(transcript),
+        'key': key,
+        'post': post,
+        'error': None,
+    }
+
+def export_reused_post(item):
+    """Export a post reused from the cache or catalog, as a newly generated one would be
+
+    The export format may have changed since it was generated; an unchanged
+    export is found in the output store instead of being written again.
+    """
+    schedule_export(item['post'], os.path.splitext(os.path.basename(item['name']))[0])
+
+def save_generated_post(item, prompt, model, temperature, max_tokens, post, latency):
+    """Cache a newly generated post and add it to the catalog (errors and cancels are skipped)"""
+    if post.startswith("Error"):
+        return
+    cache_post(item['key'], post)
+    try:
+        record_post(item['name'], item['source'], item['transcript'], model, prompt, temperature, max_tokens,
+                    post, input_tokens=item['tokens'], output_tokens=estimate_tokens(post), latency=latency)
+    except sqlite3.Error as e:
+        print(f"Warning: Could not record post in catalog: {e}")
+
+def estimate_tokens(text):
+    """Rough token count for English text (about four characters per token)"""
+    return max(1, len(text) // 4)
+
+def is_rate_limited(result):
+    """Check if generate_blog_post failed because of a rate limit"""
+    lowered = result.lower()
+    return result.startswith("Error") and ("rate limit" in lowered or "429" in lowered)
+
+def estimate_file_tokens(path):
+    """Rough token count of a transcript file, from its size, for ordering work before it is read"""
+    if isinstance(path, ArchiveMember):
+        return max(1, path.size // 4)
+    try:
+        return max(1, os.path.getsize(path) // 4)
+    except OSError:
+        return 1
+
+def generate_with_retry(transcript, prompt, model, temperature, max_tokens, progress=None, cancel_token=None,
+                        budget=None):
+    """Generate a post, pausing and retrying when the API is rate limited
+
+    With a shared budget the pause holds back every job's requests, not just this one.
+    """
+    cancel_token = cancel_token or CancelToken()
+    for attempt in range(RATE_LIMIT_RETRIES + 1):
+        if budget is not None and not budget.wait(cancel_token):
+            return CANCELLED_MESSAGE
+        result = generate_blog_post(transcript, prompt, model, temperature, max_tokens, cancel_token)
+        if not is_rate_limited(result) or attempt == RATE_LIMIT_RETRIES:
+            return result
+
+        pause = RATE_LIMIT_BACKOFF_SECONDS * 2 ** attempt
+        print(f"Debug: Rate limited on {transcript.name}, retrying in {pause}s")
+        if progress:
+            progress.wait(pause)
+        if budget is not None:
+            budget.pause(pause)
+        # A cancel during the pause ends it straight away
+        elif cancel_token.wait(pause):
+            return CANCELLED_MESSAGE
+
+def generate_single(path, prompt, model, temperature, max_tokens, cancel_token=None):
+    """Generate the post for one transcript as an interactive job, ahead of any queued batch work
+
+    Picking a file is a request for a fresh post, so earlier posts aren't reused
+    (the new one still goes into the cache and the catalog).
+    """
+    item = prepare_transcript(path, prompt, model, temperature, max_tokens, reuse=False)
+    if item['error']:
+        return item['error']
+
+    scheduler = get_scheduler()
+    job = scheduler.create_job(item['name'], PRIORITY_INTERACTIVE, cancel_token)
+    future = job.submit(generate_with_retry, item['transcript'], prompt, model, temperature, max_tokens,
+                        None, job.cancel_token, scheduler.budget)
+    started = time.perf_counter()
+    try:
+        result = future.result()
+    except FutureCancelledError:
+        return CANCELLED_MESSAGE
+    save_generated_post(item, prompt, model, temperature, max_tokens, result, time.perf_counter() - started)
+    return result
+
+def run_batch(paths, prompt, model, temperature, max_tokens, on_result=None, on_progress=None,
+              cancel_token=None, journal=None, priority=PRIORITY_BATCH, root=None):
+    """Generate a post for each transcript, reporting results and progress as they happen
+
+    paths is a list, or a generator such as find_transcripts() that is scanned
+    on its own thread while the first files are already being generated; with a
+    root, items are named by their path relative to it.
+    Transcripts are read, cleaned and looked up in the post cache on a prefetch
+    pool (smallest first when paths is a list) while earlier ones are generated;
+    cached posts are reported without an API call. The rest are queued on the shared scheduler so
+    other jobs get their fair share of the workers. on_result(name, post) is
+    called for every file (post is an error string if it failed) and
+    on_progress(snapshot) after every progress change, both from worker threads.
+    Cancelling cancel_token aborts the requests in flight and drops the files
+    still queued; every finished post is already saved in the journal.
+    """
+    scheduler = get_scheduler()
+    streaming = not isinstance(paths, (list, tuple))
+    progress = BatchProgress(0 if streaming else len(paths), on_change=on_progress, scanning=streaming)
+    job = scheduler.create_job(journal.job_id if journal else "batch", priority, cancel_token)
+    cancel_token = job.cancel_token
+
+    def name_of(path):
+        if isinstance(path, ArchiveMember):
+            return path.name
+        return os.path.relpath(path, root).replace(os.sep, '/') if root else os.path.basename(path)
+
+    if streaming:
+        source = scan_in_background(paths, on_found=progress.found)
+    else:
+        source = sorted(paths, key=estimate_file_tokens)
+    if journal:
+        journal.start(model=model, root=root, files=None if streaming else [name_of(path) for path in paths])
+
+    def report(name, result, cached=False):
+        # Abandoned mid-request: neither a result nor a failure
+        if result == CANCELLED_MESSAGE:
+            progress.cancel(name)
+            if journal:
+                journal.record(name, 'cancelled')
+            return
+
+        if result.startswith("Error"):
+            progress.fail(name)
+        else:
+            progress.finish(name, tokens=estimate_tokens(result), cached=cached)
+
+        if journal:
+            journal.record(name, 'failed' if result.startswith("Error") else 'done',
+                           None if result.startswith("Error") else result)
+
+        if on_result:
+            on_result(name, result)
+
+    def process(item):
+        if cancel_token.cancelled:
+            return
+        progress.start(item['name'])
+        started = time.perf_counter()
+        try:
+            result = generate_with_retry(item['transcript'], prompt, model, temperature, max_tokens,
+                                         progress, cancel_token, scheduler.budget)
+        except Exception as e:
+            result = f"Error: {str(e)}"
+        save_generated_post(item, prompt, model, temperature, max_tokens, result, time.perf_counter() - started)
+        report(item['name'], result)
+
+    prefetcher = Prefetcher(source, lambda path: prepare_transcript(path, prompt, model, temperature, max_tokens,
+                                                                    name_of(path)))
+    futures = []
+    for item in prefetcher:
+        if cancel_token.cancelled:
+            break
+        if item['error'] or item['post'] is not None:
+            if not item['error']:
+                export_reused_post(item)
+            report(item['name'], item['error'] or item['post'], cached=not item['error'])
+            prefetcher.release()
+            continue
+        # The prefetch slot is given back once the item is generated or dropped
+        future = job.submit(process, item, estimate=item['tokens'])
+        future.add_done_callback(lambda future: prefetcher.release())
+        futures.append(future)
+    # Also stops the scan: the prefetcher closes its source from the thread reading it
+    prefetcher.close()
+    if streaming:
+        progress.scan_finished()
+
+    wait_for_futures(futures)
+    for future in futures:
+        if not future.cancelled() and future.exception():
+            print(f"Error processing batch item: {str(future.exception())}")
+
+    if journal:
+        journal.finish('cancelled' if cancel_token.cancelled else 'finished')
+    return progress
+
+def main(argv=None):
+    settings = load_settings()
+    parser = argparse.ArgumentParser(description="Generate blog posts for every transcript in a folder")
+    parser.add_argument('folder', help="Folder (searched recursively) or zip/tar bundle containing .txt transcripts")
+    parser.add_argument('--model', default=settings.get('model', DEFAULT_MODEL))
+    parser.add_argument('--temperature', type=float, default=settings.get('temperature', DEFAULT_TEMPERATURE))
+    parser.add_argument('--max-tokens', type=int, default=settings.get('max_tokens', DEFAULT_MAX_TOKENS))
+    add_filter_arguments(parser)
+    args = parser.parse_args(argv)
+
+    if not get_api_key():
+        print("Error: no API key set (use OPENAI_API_KEY or config.json)")
+        return 1
+
+    # Files are processed as the scan finds them
+    paths = find_transcripts(args.folder, **filters_from_args(args))
+
+    def on_result(name, result):
+        status = "failed" if result.startswith("Error") else "done"
+        print(f"{status:>6} {name}" + (f" - {result}" if status == "failed" else ""))
+
+    # Print a progress line whenever a file finishes
+    last_done = [0]
+
+    def on_progress(snapshot):
+        if snapshot['done'] != last_done[0]:
+            last_done[0] = snapshot['done']
+            print(format_progress(snapshot))
+
+    # Ctrl+C cancels the job, keeping the posts already written to the journal
+    cancel_token = CancelToken()
+    journal = JobJournal()
+    print(f"Journal: {journal.path}")
+    try:
+        progress = run_batch(paths, load_prompt(), args.model, args.temperature, args.max_tokens,
+                             on_result, on_progress, cancel_token, journal, root=args.folder)
+    except KeyboardInterrupt:
+        cancel_token.cancel()
+        journal.finish('cancelled')
+        print("Cancelled")
+        return 130
+    print(f"Processed {progress.snapshot()['total']} transcripts in {args.folder}")
+    return 1 if progress.failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
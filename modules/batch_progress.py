@@ -0,0 +1,159 @@
+import time
+import threading
+from collections import deque
+
+# Throughput is measured over completions in this trailing window
+ROLLING_WINDOW_SECONDS = 300
+
+class BatchProgress:
+    """Counts for a batch run with rolling throughput and an ETA
+
+    Workers call start/finish/fail from any thread; on_change(snapshot) is
+    called after every update so the Tk progress bar and the console can
+    both be fed from the same numbers.
+    """
+
+    def __init__(self, total, on_change=None, window_seconds=ROLLING_WINDOW_SECONDS, scanning=False):
+        self.total = total
+        self.scanning = scanning  # True while files are still being discovered, so total is a lower bound
+        self.on_change = on_change
+        self.window_seconds = window_seconds
+        self.completed = 0
+        self.failed = 0
+        self.cached = 0
+        self.tokens = 0
+        self.in_flight = {}  # item name -> start time
+        self.recent = deque()  # (finish time, tokens) for completions inside the window
+        self.durations = deque(maxlen=20)  # seconds per generated item, for the ETA before the first completion
+        self.wait_until = 0.0
+        self.waited_seconds = 0.0
+        self.start_time = time.perf_counter()
+        self.lock = threading.Lock()
+
+    def found(self, total):
+        """Update the total while the folder is still being scanned"""
+        with self.lock:
+            self.total = max(self.total, total)
+        self.changed()
+
+    def scan_finished(self):
+        with self.lock:
+            self.scanning = False
+        self.changed()
+
+    def start(self, name):
+        """Mark an item as in flight"""
+        with self.lock:
+            self.in_flight[name] = time.perf_counter()
+        self.changed()
+
+    def finish(self, name, tokens=0, cached=False):
+        """Mark an item as done; cached items didn't need an API call"""
+        now = time.perf_counter()
+        with self.lock:
+            started = self.in_flight.pop(name, now)
+            if cached:
+                self.cached += 1
+            else:
+                self.completed += 1
+                self.tokens += tokens
+                self.durations.append(now - started)
+            self.recent.append((now, 0 if cached else tokens))
+        self.changed()
+
+    def fail(self, name):
+        """Mark an item as failed"""
+        now = time.perf_counter()
+        with self.lock:
+            self.in_flight.pop(name, None)
+            self.failed += 1
+            self.recent.append((now, 0))
+        self.changed()
+
+    def cancel(self, name):
+        """Drop an item that was abandoned because the job was cancelled"""
+        with self.lock:
+            self.in_flight.pop(name, None)
+        self.changed()
+
+    def wait(self, seconds):
+        """Record a rate-limit pause, so the ETA includes the time left on it"""
+        with self.lock:
+            self.wait_until = max(self.wait_until, time.perf_counter() + seconds)
+            self.waited_seconds += seconds
+        self.changed()
+
+    def changed(self):
+        if self.on_change:
+            self.on_change(self.snapshot())
+
+    def snapshot(self):
+        """Return the current counts, rates and ETA as a dict"""
+        now = time.perf_counter()
+        with self.lock:
+            while self.recent and now - self.recent[0][0] > self.window_seconds:
+                self.recent.popleft()
+
+            elapsed = now - self.start_time
+            span = min(self.window_seconds, elapsed)
+            done = self.completed + self.failed + self.cached
+            remaining = self.total - done
+            rate_limit_wait = max(0.0, self.wait_until - now)
+
+            files_per_min = len(self.recent) / span * 60 if span > 0 else 0.0
+            tokens_per_sec = sum(tokens for _, tokens in self.recent) / span if span > 0 else 0.0
+
+            # Measured throughput already reflects how many items run at once; before the
+            # first completion, fall back to recent durations spread over the items in flight
+            if self.scanning:
+                eta = None
+            elif remaining <= 0:
+                eta = 0.0
+            elif files_per_min > 0:
+                eta = remaining / (files_per_min / 60)
+            elif self.durations:
+                concurrency = max(1, len(self.in_flight))
+                eta = sum(self.durations) / len(self.durations) * remaining / concurrency
+            else:
+                eta = None
+            if eta is not None:
+                eta += rate_limit_wait
+
+            return {
+                'total': self.total,
+                'scanning': self.scanning,
+                'done': done,
+                'completed': self.completed,
+                'failed': self.failed,
+                'cached': self.cached,
+                'in_flight': len(self.in_flight),
+                'fraction': done / self.total if self.total else 1.0,
+                'files_per_min': files_per_min,
+                'tokens_per_sec': tokens_per_sec,
+                'tokens': self.tokens,
+                'rate_limit_wait': rate_limit_wait,
+                'waited_seconds': self.waited_seconds,
+                'elapsed': elapsed,
+                'eta_seconds': eta,
+            }
+
+def format_duration(seconds):
+    """Format seconds as e.g. '1h 05m', '4m 30s' or '12s'"""
+    seconds = int(round(seconds))
+    if seconds >= 3600:
+        return f"{seconds // 3600}h {seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m {seconds % 60:02d}s"
+    return f"{seconds}s"
+
+def format_progress(snapshot):
+    """Format a progress snapshot as one status line"""
+    total = f"{snapshot['total']}+ found so far" if snapshot.get('scanning') else snapshot['total']
+    line = (f"{snapshot['done']}/{total} done "
+            f"({snapshot['failed']} failed, {snapshot['cached']} cached, {snapshot['in_flight']} in flight)"
+            f" | {snapshot['files_per_min']:.1f} files/min | {snapshot['tokens_per_sec']:.0f} tokens/s")
+    if snapshot['rate_limit_wait'] > 0:
+        line += f" | rate limited, resuming in {format_duration(snapshot['rate_limit_wait'])}"
+    if snapshot['eta_seconds'] is not None and snapshot['done'] < snapshot['total']:
+        line += f" | ETA {format_duration(snapshot['eta_seconds'])}"
+    return line
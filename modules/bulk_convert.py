@@ -0,0 +1,133 @@
+import os
+import sys
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from modules.render_cache import save_rtf, save_docx
+
+# File extensions treated as saved markdown posts
+MARKDOWN_EXTENSIONS = ('.md', '.markdown')
+
+def find_markdown_files(input_dir):
+    """Walk a directory tree and return every markdown file in it"""
+    markdown_files = []
+    for dirpath, dirnames, filenames in os.walk(input_dir):
+        # Walk in a stable order so runs are reproducible; hidden folders (like the
+        # output store behind the exported links) are skipped
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith('.'))
+        for filename in sorted(filenames):
+            if filename.lower().endswith(MARKDOWN_EXTENSIONS):
+                markdown_files.append(os.path.join(dirpath, filename))
+    return markdown_files
+
+def is_up_to_date(source_file, target_file):
+    """Check if the target exists and is newer than its source"""
+    try:
+        return os.path.getmtime(target_file) >= os.path.getmtime(source_file)
+    except OSError:
+        return False
+
+def convert_one(input_file, output_file_rtf=None, output_file_docx=None, force=False):
+    """Convert a single markdown file, skipping outputs that are already up to date"""
+    start = time.perf_counter()
+    result = {'input': input_file, 'status': 'skipped', 'error': None, 'seconds': 0.0}
+
+    try:
+        # Only render the outputs that are missing or older than the source
+        need_rtf = output_file_rtf and (force or not is_up_to_date(input_file, output_file_rtf))
+        need_docx = output_file_docx and (force or not is_up_to_date(input_file, output_file_docx))
+
+        if need_rtf or need_docx:
+            with open(input_file, 'r', encoding='utf-8') as f:
+                markdown_content = f.read().replace('\r\n', '\n')
+
+            # Renders go through the render cache, so unchanged posts aren't re-rendered
+            if need_rtf:
+                save_rtf(markdown_content, output_file_rtf)
+
+            if need_docx:
+                save_docx(markdown_content, output_file_docx)
+
+            result['status'] = 'converted'
+    except Exception as e:
+        result['status'] = 'failed'
+        result['error'] = str(e)
+
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+def output_paths(input_file, input_dir, output_dir, formats):
+    """Build the RTF and DOCX output paths for an input file, mirroring the input tree"""
+    relative = os.path.relpath(input_file, input_dir)
+    stem = os.path.splitext(os.path.join(output_dir, relative))[0]
+    rtf_path = stem + '.rtf' if 'rtf' in formats else None
+    docx_path = stem + '.docx' if 'docx' in formats else None
+    return rtf_path, docx_path
+
+def bulk_convert(input_dir, output_dir=None, formats=('rtf', 'docx'), workers=None, force=False):
+    """Convert every markdown file under input_dir to RTF/DOCX using a process pool"""
+    output_dir = output_dir or input_dir
+    markdown_files = find_markdown_files(input_dir)
+    total_files = len(markdown_files)
+    print(f"Found {total_files} markdown files in {input_dir}")
+
+    results = []
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {}
+        for input_file in markdown_files:
+            rtf_path, docx_path = output_paths(input_file, input_dir, output_dir, formats)
+            future = pool.submit(convert_one, input_file, rtf_path, docx_path, force)
+            futures[future] = input_file
+
+        for i, future in enumerate(as_completed(futures)):
+            try:
+                result = future.result()
+            except Exception as e:
+                # The worker process itself died
+                result = {'input': futures[future], 'status': 'failed', 'error': str(e), 'seconds': 0.0}
+            results.append(result)
+
+            line = f"[{i+1}/{total_files}] {result['status']:>9} {result['input']} ({result['seconds']:.2f}s)"
+            if result['error']:
+                line += f" - {result['error']}"
+            print(line)
+
+    elapsed = time.perf_counter() - start
+    print_summary(results, elapsed)
+    return results
+
+def print_summary(results, elapsed):
+    """Print throughput and the list of failed files"""
+    converted = sum(1 for r in results if r['status'] == 'converted')
+    skipped = sum(1 for r in results if r['status'] == 'skipped')
+    failed = [r for r in results if r['status'] == 'failed']
+    rate = converted / elapsed if elapsed > 0 else 0.0
+
+    print(f"\nConverted {converted}, skipped {skipped}, failed {len(failed)} "
+          f"in {elapsed:.1f}s ({rate:.1f} files/s)")
+
+    if failed:
+        print("Failures:")
+        for r in failed:
+            print(f"  {r['input']}: {r['error']}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-render a folder of markdown posts to RTF and DOCX")
+    parser.add_argument('input_dir', help="Folder containing markdown posts (searched recursively)")
+    parser.add_argument('-o', '--output-dir', help="Where to write outputs (defaults to next to each source)")
+    parser.add_argument('-f', '--formats', default='rtf,docx', help="Comma-separated output formats: rtf, docx")
+    parser.add_argument('-j', '--workers', type=int, default=None, help="Number of worker processes")
+    parser.add_argument('--force', action='store_true', help="Re-render even if outputs are up to date")
+    args = parser.parse_args(argv)
+
+    formats = [f.strip().lower() for f in args.formats.split(',') if f.strip()]
+    results = bulk_convert(args.input_dir, args.output_dir, formats, args.workers, args.force)
+
+    # Non-zero exit code if anything failed
+    return 1 if any(r['status'] == 'failed' for r in results) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+import threading
+
+class CancelledError(Exception):
+    """Raised when work is abandoned because its job was cancelled"""
+
+class CancelToken:
+    """Shared flag that tells queued and running work of a job to stop
+
+    Work checks cancelled between steps, sleeps with wait() so a cancel wakes
+    it, and registers callbacks with on_cancel() to abort blocking calls such
+    as an open HTTP response.
+    """
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.callbacks = []
+        self.lock = threading.Lock()
+
+    @property
+    def cancelled(self):
+        return self.event.is_set()
+
+    def cancel(self):
+        """Cancel the job and run the registered abort callbacks"""
+        with self.lock:
+            if self.event.is_set():
+                return
+            self.event.set()
+            callbacks = list(self.callbacks)
+            self.callbacks.clear()
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"Error aborting cancelled work: {e}")
+
+    def on_cancel(self, callback):
+        """Call callback when the job is cancelled (right away if it already was)"""
+        with self.lock:
+            if not self.event.is_set():
+                self.callbacks.append(callback)
+                return
+        callback()
+
+    def remove_callback(self, callback):
+        with self.lock:
+            if callback in self.callbacks:
+                self.callbacks.remove(callback)
+
+    def wait(self, seconds):
+        """Sleep for up to seconds, returning True early if the job is cancelled"""
+        return self.event.wait(seconds)
+
+    def raise_if_cancelled(self):
+        if self.event.is_set():
+            raise CancelledError()
@@ -0,0 +1,278 @@
+import os
+import sys
+import time
+import sqlite3
+import hashlib
+import argparse
+import threading
+from datetime import datetime
+
+from modules.settings import CATALOG_FILE
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    source_path TEXT,
+    source_hash TEXT NOT NULL,
+    model TEXT NOT NULL,
+    prompt_hash TEXT NOT NULL,
+    temperature REAL,
+    max_tokens INTEGER,
+    input_tokens INTEGER,
+    output_tokens INTEGER,
+    latency REAL,
+    created REAL NOT NULL,
+    title TEXT,
+    markdown TEXT NOT NULL,
+    markdown_hash TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS posts_by_source ON posts (source_hash, model, prompt_hash, temperature, max_tokens);
+CREATE INDEX IF NOT EXISTS posts_by_markdown ON posts (markdown_hash);
+CREATE INDEX IF NOT EXISTS posts_by_created ON posts (created);
+CREATE TABLE IF NOT EXISTS outputs (
+    markdown_hash TEXT NOT NULL,
+    format TEXT NOT NULL,
+    path TEXT NOT NULL,
+    created REAL NOT NULL,
+    object TEXT
+);
+CREATE INDEX IF NOT EXISTS outputs_by_markdown ON outputs (markdown_hash);
+CREATE TABLE IF NOT EXISTS archived (
+    post_id INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    archive TEXT NOT NULL,
+    member TEXT NOT NULL,
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS archived_by_post ON archived (post_id);
+"""
+
+# Added after the first release; catalogs created before it get the column on open
+MIGRATIONS = [
+    ('outputs', 'object', "ALTER TABLE outputs ADD COLUMN object TEXT"),
+]
+INDEXES = """
+CREATE INDEX IF NOT EXISTS outputs_by_object ON outputs (object);
+"""
+
+# Full-text index over the markdown, kept in step with the posts table by triggers
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5(title, markdown, content='posts', content_rowid='id');
+CREATE TRIGGER IF NOT EXISTS posts_fts_insert AFTER INSERT ON posts BEGIN
+    INSERT INTO posts_fts (rowid, title, markdown) VALUES (new.id, new.title, new.markdown);
+END;
+CREATE TRIGGER IF NOT EXISTS posts_fts_delete AFTER DELETE ON posts BEGIN
+    INSERT INTO posts_fts (posts_fts, rowid, title, markdown) VALUES ('delete', old.id, old.title, old.markdown);
+END;
+"""
+
+# One connection per thread (sqlite3 connections can't be shared); WAL lets readers run during a write
+_local = threading.local()
+_init_lock = threading.Lock()
+_initialized = set()
+_has_fts = {}
+
+def text_hash(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def post_title(markdown_text):
+    """Return the first heading of a post, or its first line"""
+    lines = [line.strip() for line in markdown_text.splitlines() if line.strip()]
+    for line in lines:
+        if line.startswith('#'):
+            return line.lstrip('#').strip()
+    return lines[0][:120] if lines else ''
+
+def connect(path=CATALOG_FILE):
+    """Return this thread's connection to the catalog, creating the schema on first use"""
+    connections = getattr(_local, 'connections', None)
+    if connections is None:
+        connections = _local.connections = {}
+    if path in connections:
+        return connections[path]
+
+    connection = sqlite3.connect(path, timeout=30)
+    connection.row_factory = sqlite3.Row
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    with _init_lock:
+        if path not in _initialized:
+            connection.executescript(SCHEMA)
+            for table, column, statement in MIGRATIONS:
+                columns = [row[1] for row in connection.execute(f"PRAGMA table_info({table})")]
+                if column not in columns:
+                    connection.execute(statement)
+            connection.executescript(INDEXES)
+            try:
+                connection.executescript(FTS_SCHEMA)
+                _has_fts[path] = True
+            except sqlite3.OperationalError as e:
+                # Python builds without FTS5 fall back to LIKE searches
+                print(f"Warning: Full-text search unavailable, using slower searches: {e}")
+                _has_fts[path] = False
+            connection.commit()
+            _initialized.add(path)
+    connections[path] = connection
+    return connection
+
+def record_post(name, source_path, transcript, model, prompt, temperature, max_tokens, markdown_text,
+                input_tokens=None, output_tokens=None, latency=None, path=CATALOG_FILE):
+    """Add a generated post to the catalog and return its id"""
+    connection = connect(path)
+    with connection:
+        cursor = connection.execute(
+            "INSERT INTO posts (name, source_path, source_hash, model, prompt_hash, temperature, max_tokens,"
+            " input_tokens, output_tokens, latency, created, title, markdown, markdown_hash)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (name, source_path, text_hash(str(transcript)), model, text_hash(prompt), temperature, max_tokens,
+             input_tokens, output_tokens, latency, time.time(), post_title(markdown_text), markdown_text,
+             text_hash(markdown_text)))
+    return cursor.lastrowid
+
+def record_output(markdown_text, fmt, output_path, object_key=None, path=CATALOG_FILE):
+    """Remember where a post was exported (outputs are matched to posts by their markdown)
+
+    object_key is the output store's key for the exported file's contents.
+    """
+    connection = connect(path)
+    with connection:
+        connection.execute("INSERT INTO outputs (markdown_hash, format, path, created, object) VALUES (?, ?, ?, ?, ?)",
+                           (text_hash(markdown_text), fmt, os.path.abspath(output_path), time.time(), object_key))
+
+def find_outputs(object_key, path=CATALOG_FILE):
+    """Return the paths an output store object was exported under, newest first"""
+    rows = connect(path).execute("SELECT DISTINCT path FROM outputs WHERE object = ? ORDER BY created DESC",
+                                 (object_key,))
+    return [row[0] for row in rows]
+
+def record_archived(post_id, archive, entries, path=CATALOG_FILE):
+    """Remember which members of an archive hold a post's files (entries is a list of (kind, member))"""
+    connection = connect(path)
+    now = time.time()
+    with connection:
+        connection.executemany("INSERT INTO archived (post_id, kind, archive, member, created) VALUES (?, ?, ?, ?, ?)",
+                               [(post_id, kind, os.path.abspath(archive), member, now) for kind, member in entries])
+
+def post_ids(since=None, until=None, unarchived=False, path=CATALOG_FILE):
+    """Return the ids of the posts created between two timestamps, oldest first"""
+    query = "SELECT id FROM posts WHERE created >= ? AND created < ?"
+    if unarchived:
+        query += " AND id NOT IN (SELECT post_id FROM archived)"
+    rows = connect(path).execute(query + " ORDER BY created", (since or 0, until or float('inf')))
+    return [row[0] for row in rows]
+
+def stored_outputs(path=CATALOG_FILE):
+    """Return (path, object key) for every export recorded with an output store object"""
+    rows = connect(path).execute("SELECT DISTINCT path, object FROM outputs WHERE object IS NOT NULL")
+    return [(row[0], row[1]) for row in rows]
+
+def find_post(transcript, model, prompt, temperature, max_tokens, path=CATALOG_FILE):
+    """Return the latest post generated from this transcript with these settings, or None (an index lookup)"""
+    row = connect(path).execute(
+        "SELECT * FROM posts WHERE source_hash = ? AND model = ? AND prompt_hash = ? AND temperature = ?"
+        " AND max_tokens = ? ORDER BY created DESC LIMIT 1",
+        (text_hash(str(transcript)), model, text_hash(prompt), temperature, max_tokens)).fetchone()
+    return dict(row) if row else None
+
+def get_post(post_id, path=CATALOG_FILE):
+    """Return a post with its exported files and the archives holding copies of them"""
+    connection = connect(path)
+    row = connection.execute("SELECT * FROM posts WHERE id = ?", (post_id,)).fetchone()
+    if row is None:
+        return None
+    post = dict(row)
+    post['outputs'] = [dict(output) for output in connection.execute(
+        "SELECT format, path, created, object FROM outputs WHERE markdown_hash = ? ORDER BY created",
+        (post['markdown_hash'],))]
+    post['archived'] = [dict(entry) for entry in connection.execute(
+        "SELECT kind, archive, member, created FROM archived WHERE post_id = ? ORDER BY created", (post_id,))]
+    return post
+
+def quote_terms(text):
+    """Turn plain search text into an FTS5 query matching every word, so "e-mail" or "C++" aren't read as syntax"""
+    return ' '.join('"' + term.replace('"', '""') + '"' for term in text.split())
+
+def search_posts(query, limit=50, since=None, raw=True, path=CATALOG_FILE):
+    """Return posts matching a full-text query, best match first
+
+    With raw the query is FTS5 syntax (AND, OR, "phrases", prefix*); otherwise
+    it is plain text and posts containing all of its words match. Each result
+    has id, name, title, model, created and a snippet around the match.
+    """
+    connection = connect(path)
+    since = since or 0
+    if _has_fts.get(path):
+        if not raw:
+            query = quote_terms(query)
+            if not query:
+                return []
+        rows = connection.execute(
+            "SELECT posts.id, posts.name, posts.title, posts.model, posts.created,"
+            " snippet(posts_fts, 1, '[', ']', '...', 12) AS snippet"
+            " FROM posts_fts JOIN posts ON posts.id = posts_fts.rowid"
+            " WHERE posts_fts MATCH ? AND posts.created >= ? ORDER BY rank LIMIT ?",
+            (query, since, limit))
+    else:
+        rows = connection.execute(
+            "SELECT id, name, title, model, created, substr(markdown, 1, 120) AS snippet FROM posts"
+            " WHERE (markdown LIKE ? OR title LIKE ?) AND created >= ? ORDER BY created DESC LIMIT ?",
+            (f"%{query}%", f"%{query}%", since, limit))
+    return [dict(row) for row in rows]
+
+def recent_posts(limit=50, path=CATALOG_FILE):
+    """Return the most recently generated posts"""
+    rows = connect(path).execute(
+        "SELECT id, name, title, model, created FROM posts ORDER BY created DESC LIMIT ?", (limit,))
+    return [dict(row) for row in rows]
+
+def format_row(row):
+    created = datetime.fromtimestamp(row['created']).strftime("%Y-%m-%d %H:%M")
+    line = f"{row['id']:>6}  {created}  {row['name']}  -  {row['title']}"
+    if row.get('snippet'):
+        line += f"\n        {row['snippet']}"
+    return line
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Search and inspect the catalog of generated posts")
+    commands = parser.add_subparsers(dest='command', required=True)
+    search = commands.add_parser('search', help="Full-text search of the posts")
+    search.add_argument('query')
+    search.add_argument('--days', type=int, help="Only posts from the last N days")
+    search.add_argument('-n', '--limit', type=int, default=20)
+    recent = commands.add_parser('recent', help="List the latest posts")
+    recent.add_argument('-n', '--limit', type=int, default=20)
+    show = commands.add_parser('show', help="Print a post and where it was exported")
+    show.add_argument('id', type=int)
+    args = parser.parse_args(argv)
+
+    if args.command == 'search':
+        since = time.time() - args.days * 86400 if args.days else None
+        try:
+            rows = search_posts(args.query, args.limit, since)
+        except sqlite3.OperationalError as e:
+            print(f"Error: invalid search: {str(e)}")
+            return 1
+        for row in rows:
+            print(format_row(row))
+        print(f"{len(rows)} posts", file=sys.stderr)
+    elif args.command == 'recent':
+        for row in recent_posts(args.limit):
+            print(format_row(row))
+    else:
+        post = get_post(args.id)
+        if post is None:
+            print(f"Error: no post {args.id}")
+            return 1
+        print(f"{post['name']} ({post['model']}, {post['output_tokens']} tokens, {post['latency'] or 0:.1f}s)")
+        print(f"Source: {post['source_path']}")
+        for output in post['outputs']:
+            print(f"Output: {output['path']} ({output['format']})")
+        for entry in post['archived']:
+            print(f"Archived: {entry['archive']}: {entry['member']} ({entry['kind']})")
+        print()
+        print(post['markdown'])
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,267 @@
+import os
+import sys
+import queue
+import tarfile
+import zipfile
+import argparse
+import threading
+from fnmatch import fnmatch
+from datetime import datetime
+
+from modules.settings import load_settings
+
+# Files picked up when no include patterns are given
+DEFAULT_INCLUDE = ["*.txt"]
+
+# Bundles whose members are read in place, without extracting them
+ARCHIVE_SUFFIXES = ('.zip', '.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz')
+
+# Archive members read ahead by the scan thread, which hold their contents in memory
+SCAN_BUFFER_MEMBERS = 64
+
+class ArchiveMember:
+    """A transcript inside a zip or tar bundle, read while the bundle was scanned
+
+    name is stable across runs: the bundle's path inside the corpus followed by
+    the member's path, e.g. "2023/week1.zip/monday.txt". source is the same
+    with the bundle's full path.
+    """
+
+    def __init__(self, name, data, mtime, source=None):
+        self.name = name
+        self.source = source or name
+        self.data = data
+        self.size = len(data)
+        self.mtime = mtime
+
+    def read_bytes(self):
+        return self.data
+
+    def __repr__(self):
+        return f"ArchiveMember({self.name!r})"
+
+def is_archive(path):
+    return path.lower().endswith(ARCHIVE_SUFFIXES)
+
+def keep_member(relative_path, size, mtime, include, exclude, min_size, max_size, newer_than, older_than):
+    """Apply the corpus filters to an archive member (excluded folders inside the bundle included)"""
+    if not matches(relative_path, include) or matches(relative_path, exclude):
+        return False
+    folders = relative_path.split('/')[:-1]
+    if any(matches('/'.join(folders[:depth]), exclude) for depth in range(1, len(folders) + 1)):
+        return False
+    if (min_size is not None and size < min_size) or (max_size is not None and size > max_size):
+        return False
+    if (newer_than is not None and mtime < newer_than) or (older_than is not None and mtime >= older_than):
+        return False
+    return True
+
+def iter_archive(path, name, include=None, exclude=None, min_size=None, max_size=None,
+                 newer_than=None, older_than=None):
+    """Yield the transcripts in a zip or tar bundle as ArchiveMembers, in the bundle's order
+
+    Tar bundles are read as a stream (compressed ones can't be read any other
+    way without unpacking them), so each member is read as it is reached.
+    """
+    filters = (include or DEFAULT_INCLUDE, exclude or [], min_size, max_size, newer_than, older_than)
+    try:
+        if path.lower().endswith('.zip'):
+            with zipfile.ZipFile(path) as bundle:
+                for info in bundle.infolist():
+                    if info.is_dir():
+                        continue
+                    mtime = datetime(*info.date_time).timestamp()
+                    if not keep_member(info.filename, info.file_size, mtime, *filters):
+                        continue
+                    try:
+                        data = bundle.read(info)
+                    except (RuntimeError, zipfile.BadZipFile, OSError) as e:
+                        print(f"Error reading {info.filename} in {path}: {str(e)}")
+                        continue
+                    yield ArchiveMember(f"{name}/{info.filename}", data, mtime, f"{path}/{info.filename}")
+        else:
+            with tarfile.open(path, 'r|*') as bundle:
+                for member in bundle:
+                    if not member.isfile() or not keep_member(member.name, member.size, member.mtime, *filters):
+                        continue
+                    yield ArchiveMember(f"{name}/{member.name}", bundle.extractfile(member).read(), member.mtime,
+                                        f"{path}/{member.name}")
+    except (OSError, zipfile.BadZipFile, tarfile.TarError) as e:
+        print(f"Error reading archive {path}: {str(e)}")
+
+def matches(relative_path, patterns):
+    """Check a path (relative to the corpus root, with forward slashes) or its file name against glob patterns"""
+    name = relative_path.rsplit('/', 1)[-1]
+    return any(fnmatch(relative_path, pattern) or fnmatch(name, pattern) for pattern in patterns)
+
+def walk_corpus(root, recursive=True, include=None, exclude=None, min_size=None, max_size=None,
+                newer_than=None, older_than=None, archives=True):
+    """Yield the paths of transcripts under root as they are found
+
+    Built on os.scandir, so processing can start on the first file instead of
+    after a full listing. Directories matching an exclude pattern are skipped
+    entirely; files must match an include pattern and none of the exclude
+    patterns, be between min_size and max_size bytes, and be modified between
+    newer_than and older_than (timestamps). Symlinked directories aren't followed.
+    With archives, zip and tar bundles (or a root that is one) yield their
+    matching members as ArchiveMembers instead of paths.
+    """
+    include = include or DEFAULT_INCLUDE
+    exclude = exclude or []
+    member_filters = dict(include=include, exclude=exclude, min_size=min_size, max_size=max_size,
+                          newer_than=newer_than, older_than=older_than)
+    if os.path.isfile(root):
+        if archives and is_archive(root):
+            yield from iter_archive(root, os.path.basename(root), **member_filters)
+        return
+
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            entries = os.scandir(directory)
+        except OSError as e:
+            print(f"Error reading folder {directory}: {str(e)}")
+            continue
+
+        subdirectories = []
+        with entries:
+            for entry in entries:
+                relative_path = os.path.relpath(entry.path, root).replace(os.sep, '/')
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive and not matches(relative_path, exclude):
+                            subdirectories.append(entry.path)
+                        continue
+                    if archives and is_archive(entry.name) and entry.is_file() and not matches(relative_path, exclude):
+                        yield from iter_archive(entry.path, relative_path, **member_filters)
+                        continue
+                    if not entry.is_file() or not matches(relative_path, include) or matches(relative_path, exclude):
+                        continue
+                    if min_size is not None or max_size is not None or newer_than is not None or older_than is not None:
+                        stat = entry.stat()
+                        if min_size is not None and stat.st_size < min_size:
+                            continue
+                        if max_size is not None and stat.st_size > max_size:
+                            continue
+                        if newer_than is not None and stat.st_mtime < newer_than:
+                            continue
+                        if older_than is not None and stat.st_mtime >= older_than:
+                            continue
+                except OSError as e:
+                    print(f"Error reading {entry.path}: {str(e)}")
+                    continue
+                yield entry.path
+
+        # Visit subfolders in name order, depth first
+        stack.extend(sorted(subdirectories, reverse=True))
+
+def scan_in_background(paths, on_found=None):
+    """Run a path generator on its own thread, yielding its paths as they arrive
+
+    The scan keeps going while the consumer is busy, so on_found(count) can
+    report the growing total. Archive members carry their contents, so at most
+    SCAN_BUFFER_MEMBERS of them wait in the queue. Closing the returned
+    generator stops the scan.
+    """
+    found = queue.Queue()
+    buffered = threading.Semaphore(SCAN_BUFFER_MEMBERS)
+    stop = threading.Event()
+    done = object()
+
+    def scan():
+        count = 0
+        try:
+            for path in paths:
+                if isinstance(path, ArchiveMember):
+                    while not buffered.acquire(timeout=0.1):
+                        if stop.is_set():
+                            return
+                if stop.is_set():
+                    break
+                count += 1
+                found.put(path)
+                if on_found:
+                    on_found(count)
+        except Exception as e:
+            found.put(e)
+        finally:
+            found.put(done)
+
+    threading.Thread(target=scan, name="corpus-scan", daemon=True).start()
+    try:
+        while True:
+            path = found.get()
+            if path is done:
+                return
+            if isinstance(path, Exception):
+                raise path
+            if isinstance(path, ArchiveMember):
+                buffered.release()
+            yield path
+    finally:
+        stop.set()
+
+def parse_date(value):
+    """Turn a YYYY-MM-DD date into a timestamp (None stays None)"""
+    if value is None or value == '':
+        return None
+    return datetime.strptime(value, "%Y-%m-%d").timestamp()
+
+def corpus_filters(settings=None):
+    """Return the walk_corpus options saved in the settings ('corpus_recursive', 'corpus_include', ...)"""
+    settings = settings if settings is not None else load_settings()
+    return {
+        'recursive': settings.get('corpus_recursive', True),
+        'include': settings.get('corpus_include', DEFAULT_INCLUDE),
+        'exclude': settings.get('corpus_exclude', []),
+        'min_size': settings.get('corpus_min_bytes'),
+        'max_size': settings.get('corpus_max_bytes'),
+        'newer_than': parse_date(settings.get('corpus_newer_than')),
+        'older_than': parse_date(settings.get('corpus_older_than')),
+        'archives': settings.get('corpus_archives', True),
+    }
+
+def add_filter_arguments(parser):
+    """Add the corpus filter options to an argparse parser"""
+    defaults = corpus_filters()
+    parser.add_argument('--no-recursive', dest='recursive', action='store_false', default=defaults['recursive'],
+                        help="Only look at the top folder")
+    parser.add_argument('--include', action='append', help="Glob of files to process (repeatable, default *.txt)")
+    parser.add_argument('--exclude', action='append', help="Glob of files or folders to skip (repeatable)")
+    parser.add_argument('--min-size', type=int, default=defaults['min_size'], help="Skip files smaller than this many bytes")
+    parser.add_argument('--max-size', type=int, default=defaults['max_size'], help="Skip files larger than this many bytes")
+    parser.add_argument('--newer-than', type=parse_date, default=defaults['newer_than'], help="Only files modified on or after YYYY-MM-DD")
+    parser.add_argument('--older-than', type=parse_date, default=defaults['older_than'], help="Only files modified before YYYY-MM-DD")
+    parser.add_argument('--no-archives', dest='archives', action='store_false', default=defaults['archives'],
+                        help="Don't read transcripts inside zip and tar bundles")
+
+def filters_from_args(args):
+    """Return the walk_corpus options given on the command line"""
+    defaults = corpus_filters()
+    return {
+        'recursive': args.recursive,
+        'include': args.include or defaults['include'],
+        'exclude': args.exclude or defaults['exclude'],
+        'min_size': args.min_size,
+        'max_size': args.max_size,
+        'newer_than': args.newer_than,
+        'older_than': args.older_than,
+        'archives': args.archives,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="List the transcripts a folder run would process")
+    parser.add_argument('folder', help="Root of the transcript tree, or a zip/tar bundle")
+    add_filter_arguments(parser)
+    args = parser.parse_args(argv)
+
+    count = 0
+    for path in walk_corpus(args.folder, **filters_from_args(args)):
+        print(path.name if isinstance(path, ArchiveMember) else os.path.relpath(path, args.folder))
+        count += 1
+    print(f"{count} transcripts", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
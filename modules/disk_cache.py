@@ -0,0 +1,158 @@
+import os
+import threading
+import tempfile
+
+class DiskCache:
+    """A directory of files keyed by content hash, with size-based LRU eviction
+
+    on_evict(paths), if given, is called with the paths of the entries each eviction removed.
+    """
+
+    def __init__(self, directory, max_bytes, suffix='', on_evict=None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self.on_evict = on_evict
+        self.lock = threading.Lock()
+        # Total size on disk, computed lazily on the first write
+        self.total_bytes = None
+
+    def path_for(self, key):
+        """Return the file path for a key, sharded by its first two characters"""
+        return os.path.join(self.directory, key[:2], key + self.suffix)
+
+    def touch(self, path):
+        """Mark an entry as recently used (eviction goes by modification time)"""
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+
+    def entry_size(self, path):
+        """Return the size of an entry on disk, or 0 if it doesn't exist"""
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
+
+    def get_path(self, key):
+        """Return the path of a cached entry, or None if it isn't cached"""
+        path = self.path_for(key)
+        if os.path.exists(path):
+            self.touch(path)
+            return path
+        return None
+
+    def get(self, key):
+        """Return the cached bytes for a key, or None if it isn't cached"""
+        path = self.path_for(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        self.touch(path)
+        return data
+
+    def put(self, key, data):
+        """Store bytes for a key and evict old entries if the cache is over its limit"""
+        return self.put_chunks(key, [data])
+
+    def put_chunks(self, key, chunks):
+        """Store bytes for a key, written a chunk at a time as they are produced, then evict as put() does"""
+        path = self.path_for(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Write to a temp file and rename so readers never see a partial entry
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        size = 0
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in chunks:
+                    f.write(chunk)
+                    size += len(chunk)
+            # Overwriting an entry replaces its bytes rather than adding to them
+            old_size = self.entry_size(path)
+            os.replace(temp_path, path)
+        except Exception:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+
+        with self.lock:
+            if self.total_bytes is None:
+                self.total_bytes = self.scan_size()
+            else:
+                self.total_bytes += size - old_size
+            if self.total_bytes > self.max_bytes:
+                self.evict()
+        return path
+
+    def add_file(self, key, source_path):
+        """Move an already rendered file into the cache"""
+        path = self.path_for(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        old_size = self.entry_size(path)
+        os.replace(source_path, path)
+        with self.lock:
+            if self.total_bytes is None:
+                self.total_bytes = self.scan_size()
+            else:
+                self.total_bytes += os.path.getsize(path) - old_size
+            if self.total_bytes > self.max_bytes:
+                self.evict()
+        return path
+
+    def entries(self):
+        """Return (mtime, size, path) for every entry in the cache"""
+        entries = []
+        if not os.path.isdir(self.directory):
+            return entries
+        for shard in os.scandir(self.directory):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.is_file() and not entry.name.endswith('.tmp'):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def scan_size(self):
+        """Return the total size of all entries on disk"""
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self):
+        """Remove the least recently used entries until the cache is under its limit"""
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+
+        # Evict down to 90% of the limit so we don't evict again on every write
+        target = self.max_bytes * 0.9
+        removed = []
+        for mtime, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                removed.append(path)
+            except OSError:
+                pass
+
+        self.total_bytes = total
+        if removed:
+            print(f"Cache {self.directory}: evicted {len(removed)} entries")
+            if self.on_evict:
+                self.on_evict(removed)
+
+    def clear(self):
+        """Remove every entry from the cache"""
+        with self.lock:
+            for _, _, path in self.entries():
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self.total_bytes = 0
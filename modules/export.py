@@ -0,0 +1,161 @@
+import html
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+import markdown
+
+from modules.settings import (
+    load_settings,
+    EXPORT_FORMATS,
+    EXPORT_MODES,
+    DEFAULT_EXPORT_FORMAT,
+    DEFAULT_EXPORT_MODE,
+)
+from modules.render_cache import render_rtf, render_docx_bytes
+from modules.catalog import record_output
+from modules.output_store import get_output_store
+
+# File extension for each export format
+EXPORT_EXTENSIONS = {
+    'rtf': '.rtf',
+    'docx': '.docx',
+    'html': '.html',
+    'markdown': '.md',
+}
+
+HTML_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+</head>
+<body>
+{body}
+</body>
+</html>
+"""
+
+# Background export pool, created on first use
+_export_pool = None
+_export_pool_lock = threading.Lock()
+
+# Posts waiting to be exported in lazy mode: list of (markdown_text, base_name, timestamp)
+_pending_exports = []
+_pending_lock = threading.Lock()
+
+def get_export_settings():
+    """Return the configured (format, mode) for exports"""
+    settings = load_settings()
+    fmt = settings.get('export_format', DEFAULT_EXPORT_FORMAT)
+    mode = settings.get('export_mode', DEFAULT_EXPORT_MODE)
+    if fmt not in EXPORT_FORMATS:
+        fmt = DEFAULT_EXPORT_FORMAT
+    if mode not in EXPORT_MODES:
+        mode = DEFAULT_EXPORT_MODE
+    return fmt, mode
+
+def make_timestamp():
+    """Return the timestamp used in output file names"""
+    return datetime.now().strftime("%Y%m%d_%H%M%S")
+
+def render_export(markdown_text, base_name, fmt):
+    """Return the contents of a post exported in the given format"""
+    if fmt == 'rtf':
+        rtf_content = render_rtf(markdown_text)
+        if not rtf_content.startswith('{\\rtf'):
+            raise ValueError(f"RTF conversion failed: {rtf_content}")
+        return rtf_content.encode('utf-8')
+    if fmt == 'docx':
+        return render_docx_bytes(markdown_text)
+    if fmt == 'html':
+        body = markdown.markdown(markdown_text, extensions=['extra', 'tables'])
+        return HTML_TEMPLATE.format(title=html.escape(base_name), body=body).encode('utf-8')
+    return markdown_text.encode('utf-8')
+
+def export_post(markdown_text, base_name, fmt, timestamp=None):
+    """Write a post in the given format to the output store and return the path of its link"""
+    if fmt == 'none':
+        return None
+    if fmt not in EXPORT_EXTENSIONS:
+        raise ValueError(f"Unknown export format: {fmt}")
+
+    timestamp = timestamp or make_timestamp()
+    data = render_export(markdown_text, base_name, fmt)
+    filename, object_key, new_link = get_output_store().put(data, base_name, EXPORT_EXTENSIONS[fmt], timestamp)
+    if not new_link:
+        print(f"Debug: Already exported as: {filename}")
+        return filename
+
+    print(f"Debug: Successfully saved to: {filename}")
+    try:
+        record_output(markdown_text, fmt, filename, object_key)
+    except Exception as e:
+        print(f"Warning: Could not record export in catalog: {e}")
+    return filename
+
+def get_export_pool():
+    """Return the shared background export pool"""
+    global _export_pool
+    with _export_pool_lock:
+        if _export_pool is None:
+            _export_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="export")
+        return _export_pool
+
+def run_export(markdown_text, base_name, fmt, timestamp):
+    """Export a post from the background pool, logging instead of raising"""
+    try:
+        return export_post(markdown_text, base_name, fmt, timestamp)
+    except Exception as e:
+        print(f"Error exporting {base_name} as {fmt}: {str(e)}")
+        return None
+
+def schedule_export(markdown_text, base_name, fmt=None, mode=None):
+    """Hand a generated post to the export stage without blocking the caller
+
+    In background mode the export is submitted to the export pool and a Future
+    is returned. In lazy mode the post is queued until export_pending() is called.
+    """
+    default_fmt, default_mode = get_export_settings()
+    fmt = fmt or default_fmt
+    mode = mode or default_mode
+
+    if fmt == 'none':
+        return None
+
+    # Stamp the post now so the file name reflects when it was generated
+    timestamp = make_timestamp()
+
+    if mode == 'lazy':
+        with _pending_lock:
+            _pending_exports.append((markdown_text, base_name, timestamp))
+        return None
+
+    return get_export_pool().submit(run_export, markdown_text, base_name, fmt, timestamp)
+
+def pending_export_count():
+    """Return the number of posts waiting for a lazy export"""
+    with _pending_lock:
+        return len(_pending_exports)
+
+def export_pending(fmt=None):
+    """Export every post queued in lazy mode and return the output paths"""
+    fmt = fmt or get_export_settings()[0]
+    with _pending_lock:
+        pending = list(_pending_exports)
+        _pending_exports.clear()
+
+    paths = []
+    for markdown_text, base_name, timestamp in pending:
+        path = run_export(markdown_text, base_name, fmt, timestamp)
+        if path:
+            paths.append(path)
+    return paths
+
+def shutdown_exports(wait=True):
+    """Stop the background export pool, optionally waiting for queued exports"""
+    global _export_pool
+    with _export_pool_lock:
+        if _export_pool is not None:
+            _export_pool.shutdown(wait=wait)
+            _export_pool = None
@@ -0,0 +1,67 @@
+import os
+import re
+import json
+import time
+import threading
+from datetime import datetime
+
+from modules.settings import JOBS_DIR
+
+class JobJournal:
+    """Append-only record of a batch job, with each finished post saved next to it
+
+    Every item is written as soon as it finishes, so a job that is cancelled
+    or interrupted keeps the posts it had already generated.
+    """
+
+    def __init__(self, job_id=None, directory=JOBS_DIR):
+        self.job_id = job_id or datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        self.directory = os.path.join(directory, self.job_id)
+        self.path = os.path.join(self.directory, "journal.jsonl")
+        self.count = 0
+        self.lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def append(self, event, **fields):
+        """Write one event as a line of JSON"""
+        with self.lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(dict(fields, event=event, time=time.time()), ensure_ascii=False) + "\n")
+                f.flush()
+
+    def start(self, **fields):
+        self.append('start', **fields)
+
+    def record(self, name, status, post=None):
+        """Record a finished item, saving its post if there is one, and return the post's path"""
+        path = None
+        if post is not None:
+            with self.lock:
+                self.count += 1
+                stem = re.sub(r'[^\w.-]+', '_', os.path.splitext(name)[0])
+                path = os.path.join(self.directory, f"{self.count:05d}_{stem}.md")
+            temp_path = path + '.tmp'
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write(post)
+            os.replace(temp_path, path)
+        self.append('item', name=name, status=status, path=path)
+        return path
+
+    def finish(self, status):
+        self.append('finish', status=status)
+
+def read_journal(path):
+    """Return the events of a journal, skipping a torn last line"""
+    events = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                continue
+    return events
+
+def completed_items(path):
+    """Return {name: post path} for the items a journal recorded as done"""
+    return {event['name']: event['path'] for event in read_journal(path)
+            if event.get('event') == 'item' and event.get('status') == 'done'}
@@ -5,7 +5,8 @@ from tkinter import messagebox, simpledialog, ttk
 import tkinter as tk
 import webbrowser
 from modules.settings import load_settings, save_settings, OPENAI_API_KEY_URL
-from modules.rtf_converter import markdown_to_docx, save_as_docx, markdown_to_rtf
+from modules.export import schedule_export
+from modules.cancel import CancelledError
 
 # Check if the new OpenAI client is available (v1.0.0+)
 has_new_openai_client = False
@@ -17,6 +18,9 @@ except ImportError:
     print("Warning: Using legacy OpenAI package. Some features may not work correctly.")
     has_new_openai_client = False
 
+# Returned instead of a post when the job was cancelled mid-request
+CANCELLED_MESSAGE = "Error: Cancelled"
+
 # Flag to track if we're using OpenRouter
 using_openrouter = False
 
@@ -330,8 +334,41 @@ This will install the latest version of the OpenAI Python package which is requi
     y = (popup.winfo_screenheight() // 2) - (height // 2)
     popup.geometry(f"{width}x{height}+{x}+{y}")
 
-def generate_blog_post(transcript, prompt, model, temperature, max_tokens):
-    """Generate a blog post from a transcript using the OpenAI API or OpenRouter"""
+def stream_completion(stream, cancel_token, new_client):
+    """Collect a streamed completion, closing the connection as soon as the job is cancelled
+    
+    Closing the stream aborts the request, so the API stops generating (and billing) for it.
+    """
+    # The new client's stream can be closed from the thread that cancels; the legacy
+    # one is a generator, so it is only checked between chunks
+    close = getattr(stream, 'close', None) if new_client else None
+    if close:
+        cancel_token.on_cancel(close)
+    
+    parts = []
+    try:
+        for chunk in stream:
+            if cancel_token.cancelled:
+                break
+            if new_client:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+            else:
+                delta = chunk["choices"][0]["delta"].get("content")
+            if delta:
+                parts.append(delta)
+    finally:
+        if close:
+            cancel_token.remove_callback(close)
+            close()
+    
+    cancel_token.raise_if_cancelled()
+    return ''.join(parts)
+
+def generate_blog_post(transcript, prompt, model, temperature, max_tokens, cancel_token=None):
+    """Generate a blog post from a transcript using the OpenAI API or OpenRouter
+    
+    With a cancel_token the response is streamed so a cancel can abort the request.
+    """
     global openai_client, using_openrouter
     
     try:
@@ -403,7 +440,7 @@ def generate_blog_post(transcript, prompt, model, temperature, max_tokens):
         if needs_openrouter and has_new_openai_client:
             # Use new client API with OpenRouter
             try:
-                response = openai_client.chat.completions.create(
+                request = dict(
                     model=model,
                     messages=[
                         {"role": "system", "content": system_prompt},
@@ -416,15 +453,24 @@ def generate_blog_post(transcript, prompt, model, temperature, max_tokens):
                         "X-Title": "AI Blog Post Generator"
                     }
                 )
-                markdown_text = response.choices[0].message.content
+                if cancel_token is None:
+                    response = openai_client.chat.completions.create(**request)
+                    markdown_text = response.choices[0].message.content
+                else:
+                    cancel_token.raise_if_cancelled()
+                    stream = openai_client.chat.completions.create(stream=True, **request)
+                    markdown_text = stream_completion(stream, cancel_token, new_client=True)
             except Exception as e:
+                if isinstance(e, CancelledError) or (cancel_token is not None and cancel_token.cancelled):
+                    print("Debug: Request cancelled")
+                    return CANCELLED_MESSAGE
                 error_msg = f"Error with OpenRouter API: {str(e)}"
                 print(f"Debug: {error_msg}")
                 return error_msg
         else:
             # Use legacy OpenAI API
             try:
-                response = openai.ChatCompletion.create(
+                request = dict(
                     model=model,
                     messages=[
                         {"role": "system", "content": system_prompt},
@@ -433,29 +479,25 @@ def generate_blog_post(transcript, prompt, model, temperature, max_tokens):
                     temperature=temperature,
                     max_tokens=max_tokens
                 )
-                markdown_text = response["choices"][0]["message"]["content"]
+                if cancel_token is None:
+                    response = openai.ChatCompletion.create(**request)
+                    markdown_text = response["choices"][0]["message"]["content"]
+                else:
+                    cancel_token.raise_if_cancelled()
+                    stream = openai.ChatCompletion.create(stream=True, **request)
+                    markdown_text = stream_completion(stream, cancel_token, new_client=False)
             except Exception as e:
+                if isinstance(e, CancelledError) or (cancel_token is not None and cancel_token.cancelled):
+                    print("Debug: Request cancelled")
+                    return CANCELLED_MESSAGE
                 error_msg = f"Error with OpenAI API: {str(e)}"
                 print(f"Debug: {error_msg}")
                 return error_msg
                 
         print("Debug: API call successful, received response")
         
-        # Convert markdown to RTF
-        rtf_content = markdown_to_rtf(markdown_text)
-        
-        # Create output directory
-        os.makedirs("blog_posts", exist_ok=True)
-        
-        # Generate filename with timestamp
-        from datetime import datetime
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"blog_posts/{base_name}_{timestamp}.rtf"
-        
-        # Save as RTF
-        with open(filename, "w", encoding="utf-8") as f:
-            f.write(rtf_content)
-        print(f"Debug: Successfully saved to: {filename}")
+        # Hand the post to the export stage so this thread can go straight back to the API
+        schedule_export(markdown_text, base_name)
         
         return markdown_text  # Return markdown for display in UI
             
@@ -0,0 +1,163 @@
+import os
+import re
+import sys
+import time
+import hashlib
+import argparse
+import itertools
+import threading
+
+from modules.disk_cache import DiskCache
+from modules.catalog import find_outputs, stored_outputs
+from modules.settings import load_settings, OUTPUT_DIR, OUTPUT_STORE_DIR, DEFAULT_OUTPUT_STORE_MB
+
+class OutputStore:
+    """Exported files stored once by content hash, with readable links to them
+
+    Contents go to <directory>/.store/<xx>/<sha256><ext>, written to a temp file
+    and renamed into place, so identical exports share one file and readers
+    never see a partial one. Each export gets a link <base_name>_<timestamp><ext>
+    in the directory: a symlink, a hard link where symlinks aren't allowed, or
+    only its catalog entry if neither works. Re-exporting identical content
+    under the same name returns the existing link instead of adding another.
+    A hard link keeps its data on disk after the stored file is evicted, so
+    evicting a file also removes the links the catalog recorded for it.
+    """
+
+    def __init__(self, directory=OUTPUT_DIR, max_bytes=DEFAULT_OUTPUT_STORE_MB * 1024 * 1024, retention_days=None):
+        self.directory = directory
+        self.objects = DiskCache(os.path.join(directory, OUTPUT_STORE_DIR), max_bytes, on_evict=self.remove_links)
+        self.retention_days = retention_days
+
+    def object_key(self, data, extension):
+        return hashlib.sha256(data).hexdigest() + extension
+
+    def put(self, data, base_name, extension, timestamp):
+        """Store exported bytes and return (link path, object key, whether the link is new)"""
+        key = self.object_key(data, extension)
+        object_path = self.objects.get_path(key)
+        if object_path:
+            # Already exported: reuse a link with the same name if there is one
+            link_name = re.compile(re.escape(base_name) + r'_\d{8}_\d{6}(_\d+)?' + re.escape(extension))
+            for path in find_outputs(key):
+                if link_name.fullmatch(os.path.basename(path)) and os.path.exists(path):
+                    return path, key, False
+        else:
+            object_path = self.objects.put(key, data)
+        return self.link(object_path, base_name, extension, timestamp), key, True
+
+    def link(self, object_path, base_name, extension, timestamp):
+        """Create a readable link to a stored file, numbering it if the name is taken"""
+        os.makedirs(self.directory, exist_ok=True)
+        for attempt in itertools.count(1):
+            suffix = '' if attempt == 1 else f"_{attempt}"
+            link_path = os.path.join(self.directory, f"{base_name}_{timestamp}{suffix}{extension}")
+            try:
+                # Creating a link fails if the name exists, so two workers never overwrite each other
+                os.symlink(os.path.relpath(object_path, self.directory), link_path)
+                return link_path
+            except FileExistsError:
+                continue
+            except (OSError, NotImplementedError):
+                pass
+            try:
+                os.link(object_path, link_path)
+                return link_path
+            except FileExistsError:
+                continue
+            except OSError:
+                # No links at all: the catalog records the export under the stored file's path
+                return object_path
+
+    def remove_links(self, object_paths):
+        """Remove the recorded links to stored files that are gone, and return how many were removed"""
+        removed = 0
+        for object_path in object_paths:
+            for path in find_outputs(os.path.basename(object_path)):
+                # Without links the export was recorded under the stored file itself
+                if os.path.abspath(path) == os.path.abspath(object_path) or not os.path.lexists(path):
+                    continue
+                try:
+                    os.remove(path)
+                    removed += 1
+                except OSError:
+                    pass
+        return removed
+
+    def prune(self):
+        """Apply the retention period and remove links whose stored file was evicted
+
+        Returns (stored files removed, links removed).
+        """
+        expired = []
+        if self.retention_days:
+            cutoff = time.time() - self.retention_days * 86400
+            for mtime, _, path in self.objects.entries():
+                if mtime < cutoff:
+                    try:
+                        os.remove(path)
+                        expired.append(path)
+                    except OSError:
+                        pass
+            self.objects.total_bytes = None
+        links = self.remove_links(expired)
+
+        # Files evicted by an earlier run: hard links are found through the catalog,
+        # symlinks (including ones the catalog doesn't know) by being dangling
+        missing = set()
+        for path, key in stored_outputs():
+            object_path = self.objects.path_for(key)
+            if os.path.lexists(path) and not os.path.exists(object_path):
+                missing.add(object_path)
+        links += self.remove_links(missing)
+        if os.path.isdir(self.directory):
+            for entry in os.scandir(self.directory):
+                if entry.is_symlink() and not os.path.exists(entry.path):
+                    try:
+                        os.remove(entry.path)
+                        links += 1
+                    except OSError:
+                        pass
+        return len(expired), links
+
+    def stats(self):
+        """Return (stored files, bytes stored, links)"""
+        entries = self.objects.entries()
+        links = 0
+        if os.path.isdir(self.directory):
+            links = sum(1 for entry in os.scandir(self.directory) if not entry.name.startswith('.'))
+        return len(entries), sum(size for _, size, _ in entries), links
+
+# Shared store, created (and pruned) on first use
+_output_store = None
+_output_store_lock = threading.Lock()
+
+def get_output_store():
+    """Return the shared output store"""
+    global _output_store
+    with _output_store_lock:
+        if _output_store is None:
+            settings = load_settings()
+            max_mb = settings.get('output_store_max_mb', DEFAULT_OUTPUT_STORE_MB)
+            _output_store = OutputStore(OUTPUT_DIR, int(max_mb * 1024 * 1024), settings.get('output_retention_days'))
+            try:
+                _output_store.prune()
+            except OSError as e:
+                print(f"Warning: Could not prune output store: {e}")
+        return _output_store
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Show or prune the store of exported posts")
+    parser.add_argument('--prune', action='store_true', help="Apply the retention settings and remove broken links")
+    args = parser.parse_args(argv)
+
+    store = get_output_store()
+    if args.prune:
+        removed, dangling = store.prune()
+        print(f"Removed {removed} expired files and {dangling} broken links")
+    files, size, links = store.stats()
+    print(f"{files} stored files ({size / 1024 / 1024:.1f} MB) behind {links} links in {store.directory}/")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,230 @@
+import os
+import sys
+import json
+import time
+import zipfile
+import argparse
+import threading
+from datetime import datetime
+
+from modules.catalog import get_post, post_ids, record_archived, find_outputs
+from modules.corpus import parse_date
+from modules.output_store import get_output_store
+from modules.settings import load_settings, ARCHIVE_DIR, DEFAULT_ARCHIVE_COMPRESSION
+
+COMPRESSION = {
+    'deflate': zipfile.ZIP_DEFLATED,
+    'bzip2': zipfile.ZIP_BZIP2,
+    'lzma': zipfile.ZIP_LZMA,
+}
+
+# Written last, so an archive with an index is complete
+INDEX_MEMBER = "index.json"
+ARCHIVE_VERSION = 1
+
+# Open archives, kept so browsing one doesn't re-read its directory on every read
+_open_archives = {}
+_open_archives_lock = threading.Lock()
+
+def compression_setting():
+    """Return the configured compression name, falling back to deflate"""
+    name = load_settings().get('archive_compression', DEFAULT_ARCHIVE_COMPRESSION)
+    return name if name in COMPRESSION else DEFAULT_ARCHIVE_COMPRESSION
+
+def default_archive_path():
+    return os.path.join(ARCHIVE_DIR, f"posts_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip")
+
+def archive_posts(archive_path, ids, compression=None, remove=False, remove_transcripts=False):
+    """Write posts with their transcripts and exports to a new archive and return the number archived
+
+    Every file is its own zip entry, compressed on its own, so one post can be
+    read back without decompressing the rest. Files are copied from disk a
+    chunk at a time. The archive is written under a temporary name and renamed
+    when complete. With remove, the exports that were archived are deleted
+    afterwards, and with remove_transcripts the source transcripts are too (the
+    posts themselves, markdown included, stay in the catalog).
+    """
+    if os.path.exists(archive_path):
+        raise FileExistsError(f"Archive already exists: {archive_path}")
+    compress_type = COMPRESSION[compression or compression_setting()]
+    os.makedirs(os.path.dirname(archive_path) or '.', exist_ok=True)
+
+    index = {'version': ARCHIVE_VERSION, 'created': time.time(), 'posts': []}
+    archived = []  # (post, [(kind, member)], [archived file paths])
+    temp_path = archive_path + '.tmp'
+    try:
+        with zipfile.ZipFile(temp_path, 'w', compression=compress_type) as bundle:
+            for post_id in ids:
+                post = get_post(post_id)
+                if post is None:
+                    print(f"Warning: No post {post_id} in the catalog")
+                    continue
+                folder = f"posts/{post_id}"
+                entries = [('post', f"{folder}/post.md")]
+                files = []
+                bundle.writestr(entries[0][1], post['markdown'])
+
+                source = post['source_path']
+                if source and os.path.isfile(source):
+                    member = f"{folder}/transcript{os.path.splitext(source)[1] or '.txt'}"
+                    bundle.write(source, member)
+                    entries.append(('transcript', member))
+                    files.append(source)
+
+                added = set()
+                for output in post['outputs']:
+                    path = output['path']
+                    name = os.path.basename(path)
+                    if name in added or not os.path.exists(path):
+                        continue
+                    member = f"{folder}/exports/{name}"
+                    bundle.write(path, member)
+                    entries.append((output['format'], member))
+                    files.append(path)
+                    added.add(name)
+
+                index['posts'].append({
+                    'id': post_id,
+                    'name': post['name'],
+                    'title': post['title'],
+                    'model': post['model'],
+                    'created': post['created'],
+                    'source_path': source,
+                    'entries': dict((kind, member) for kind, member in entries if kind in ('post', 'transcript')),
+                    'exports': [{'format': kind, 'member': member} for kind, member in entries[1:] if kind != 'transcript'],
+                })
+                archived.append((post, entries, files))
+            bundle.writestr(INDEX_MEMBER, json.dumps(index, indent=1))
+        os.replace(temp_path, archive_path)
+    except Exception:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+    for post, entries, files in archived:
+        record_archived(post['id'], archive_path, entries)
+        # Transcripts are the user's own files, so they are only deleted when asked for separately
+        removed = [path for path in files if (remove_transcripts if path == post['source_path'] else remove)]
+        if removed:
+            remove_archived_files(post, removed)
+    print(f"Debug: Archived {len(archived)} posts to {archive_path}")
+    return len(archived)
+
+def remove_archived_files(post, files):
+    """Delete a post's archived files, and stored exports no other link still uses"""
+    objects = {output['path']: output['object'] for output in post['outputs']}
+    store = get_output_store()
+    for path in files:
+        try:
+            os.remove(path)
+        except OSError as e:
+            print(f"Warning: Could not remove {path}: {e}")
+            continue
+        key = objects.get(path)
+        if key and not any(os.path.lexists(other) for other in find_outputs(key)):
+            try:
+                os.remove(store.objects.path_for(key))
+            except OSError:
+                pass
+
+def open_archive(path):
+    """Return (zip file, index) for an archive, reusing it while the file is unchanged"""
+    path = os.path.abspath(path)
+    mtime = os.path.getmtime(path)
+    with _open_archives_lock:
+        cached = _open_archives.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1], cached[2]
+        if cached:
+            cached[1].close()
+        bundle = zipfile.ZipFile(path)
+        try:
+            index = json.loads(bundle.read(INDEX_MEMBER))
+        except KeyError:
+            bundle.close()
+            raise ValueError(f"{path} is not a post archive (no {INDEX_MEMBER})")
+        _open_archives[path] = (mtime, bundle, index)
+        return bundle, index
+
+def read_member(archive, member):
+    """Return the bytes of one archive entry (only that entry is decompressed)"""
+    bundle, _ = open_archive(archive)
+    with _open_archives_lock:
+        return bundle.read(member)
+
+def read_index(archive):
+    """Return the list of posts in an archive"""
+    return open_archive(archive)[1]['posts']
+
+def read_archived(post_id, kind='post'):
+    """Return a catalog post's file from the latest archive holding it, or None"""
+    for entry in reversed(get_post(post_id)['archived']):
+        if entry['kind'] == kind and os.path.exists(entry['archive']):
+            return read_member(entry['archive'], entry['member'])
+    return None
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Archive old posts with their transcripts and exports")
+    commands = parser.add_subparsers(dest='command', required=True)
+    create = commands.add_parser('create', help="Archive posts from the catalog")
+    create.add_argument('archive', nargs='?', help="Archive to write (default archives/posts_<timestamp>.zip)")
+    create.add_argument('--since', type=parse_date, help="Only posts created on or after YYYY-MM-DD")
+    create.add_argument('--before', type=parse_date, help="Only posts created before YYYY-MM-DD")
+    create.add_argument('--older-than-days', type=int, help="Only posts older than N days")
+    create.add_argument('--all', action='store_true', help="Include posts already in another archive")
+    create.add_argument('--compression', choices=sorted(COMPRESSION), help="Default from the settings (deflate)")
+    create.add_argument('--remove', action='store_true', help="Delete the archived exports")
+    create.add_argument('--remove-transcripts', action='store_true', help="Delete the archived source transcripts")
+    listing = commands.add_parser('list', help="List the posts in an archive")
+    listing.add_argument('archive')
+    cat = commands.add_parser('cat', help="Print one file of an archived post")
+    cat.add_argument('archive')
+    cat.add_argument('id', type=int)
+    cat.add_argument('--kind', default='post', help="post, transcript or an export format (e.g. html)")
+    args = parser.parse_args(argv)
+
+    if args.command == 'create':
+        until = args.before
+        if args.older_than_days:
+            cutoff = time.time() - args.older_than_days * 86400
+            until = min(until, cutoff) if until else cutoff
+        ids = post_ids(args.since, until, unarchived=not args.all)
+        if not ids:
+            print("No posts to archive")
+            return 0
+        try:
+            archive_posts(args.archive or default_archive_path(), ids, args.compression, args.remove,
+                          args.remove_transcripts)
+        except (OSError, zipfile.BadZipFile) as e:
+            print(f"Error writing archive: {str(e)}")
+            return 1
+        return 0
+
+    try:
+        posts = read_index(args.archive)
+    except (OSError, ValueError, zipfile.BadZipFile) as e:
+        print(f"Error reading archive: {str(e)}")
+        return 1
+    if args.command == 'list':
+        for post in posts:
+            created = datetime.fromtimestamp(post['created']).strftime("%Y-%m-%d %H:%M")
+            print(f"{post['id']:>6}  {created}  {post['name']}  -  {post['title']}")
+        print(f"{len(posts)} posts", file=sys.stderr)
+        return 0
+
+    for post in posts:
+        if post['id'] == args.id:
+            members = dict(post['entries'])
+            members.update((export['format'], export['member']) for export in post['exports'])
+            if args.kind not in members:
+                print(f"Error: post {args.id} has no {args.kind} in this archive")
+                return 1
+            sys.stdout.buffer.write(read_member(args.archive, members[args.kind]))
+            return 0
+    print(f"Error: no post {args.id} in {args.archive}")
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,38 @@
+import json
+import hashlib
+
+from modules.disk_cache import DiskCache
+from modules.settings import load_settings, POST_CACHE_DIR, DEFAULT_POST_CACHE_MB
+
+# Shared cache instance, created on first use
+_post_cache = None
+
+def get_post_cache():
+    """Return the shared cache of generated posts"""
+    global _post_cache
+    if _post_cache is None:
+        settings = load_settings()
+        max_mb = settings.get('post_cache_max_mb', DEFAULT_POST_CACHE_MB)
+        _post_cache = DiskCache(POST_CACHE_DIR, int(max_mb * 1024 * 1024), suffix='.md')
+    return _post_cache
+
+def post_key(transcript, prompt, model, temperature, max_tokens):
+    """Build the cache key for a transcript generated with a given prompt and model settings"""
+    fingerprint = json.dumps([str(transcript), prompt, model, temperature, max_tokens], ensure_ascii=False)
+    return hashlib.sha256(fingerprint.encode('utf-8')).hexdigest()
+
+def get_cached_post(key):
+    """Return the post generated earlier for a key, or None (always None if 'reuse_cached_posts' is off)"""
+    if not load_settings().get('reuse_cached_posts', True):
+        return None
+    data = get_post_cache().get(key)
+    return data.decode('utf-8') if data is not None else None
+
+def cache_post(key, post):
+    """Remember a generated post; errors are never cached"""
+    if post.startswith("Error"):
+        return
+    try:
+        get_post_cache().put(key, post.encode('utf-8'))
+    except OSError as e:
+        print(f"Warning: Could not write post cache: {e}")
@@ -0,0 +1,71 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Threads reading transcripts, and how many prepared transcripts may wait for generation at once
+PREFETCH_WORKERS = 4
+PREFETCH_WINDOW = 16
+
+class Prefetcher:
+    """Prepares work items on an I/O thread pool ahead of the code consuming them
+
+    Iterating yields prepare(item) results in input order. At most window
+    results are held at once: a slot is taken when an item starts preparing and
+    given back with release() once the consumer is done with it, so memory stays
+    bounded however many items there are. Items are pulled from the source on a
+    feeder thread, so a source that is slow to produce the next item (a scan
+    still walking the tree) never holds back results that are already prepared.
+    """
+
+    def __init__(self, items, prepare, workers=PREFETCH_WORKERS, window=PREFETCH_WINDOW):
+        self.items = iter(items)
+        self.prepare = prepare
+        self.slots = threading.Semaphore(window)
+        self.ready = queue.Queue()
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prefetch")
+        self.stopped = threading.Event()
+
+    def release(self):
+        """Give back the slot of a result the consumer has finished with"""
+        self.slots.release()
+
+    def feed(self):
+        """Start preparing items as the window has room, until the source runs out or close() is called"""
+        try:
+            while not self.stopped.is_set():
+                if not self.slots.acquire(timeout=0.1):
+                    continue
+                try:
+                    item = next(self.items)
+                except StopIteration:
+                    break
+                if self.stopped.is_set():
+                    break
+                self.ready.put(self.executor.submit(self.prepare, item))
+        except Exception as e:
+            # Handed to the consumer, which raises it in input order
+            self.ready.put(e)
+        finally:
+            self.ready.put(None)
+            # The source is closed here, on the thread that was iterating it
+            close = getattr(self.items, 'close', None)
+            if close:
+                close()
+
+    def __iter__(self):
+        threading.Thread(target=self.feed, name="prefetch-feed", daemon=True).start()
+        try:
+            while True:
+                future = self.ready.get()
+                if future is None:
+                    return
+                if isinstance(future, Exception):
+                    raise future
+                yield future.result()
+        finally:
+            self.close()
+
+    def close(self):
+        """Stop reading ahead; items not yet started are dropped and the source is closed"""
+        self.stopped.set()
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,73 @@
+import sys
+import time
+import zipfile
+import argparse
+from io import BytesIO
+
+from modules.rtf_converter import basic_markdown_to_docx, markdown_to_docx, new_styled_document
+
+def make_sample_markdown(num_headings):
+    """Build a long synthetic post with the given number of headings"""
+    lines = ["# Benchmark Post", "", "A short summary paragraph with **bold** and *italic* text.", ""]
+    for i in range(num_headings):
+        level = '##' if i % 3 == 0 else '###'
+        lines.append(f"{level} Section {i + 1}")
+        lines.append("")
+        lines.append(f"Paragraph {i + 1} explains the section in a couple of plain sentences. "
+                     "It has enough text to look like a real post.")
+        lines.append("")
+        if i % 5 == 0:
+            lines.extend(["* First point", "* Second point", "* Third point", ""])
+    return '\n'.join(lines)
+
+def document_xml_size(doc):
+    """Return the size in bytes of word/document.xml for a document"""
+    buffer = BytesIO()
+    doc.save(buffer)
+    with zipfile.ZipFile(buffer) as package:
+        return len(package.read('word/document.xml'))
+
+def time_renderer(renderer, markdown_text, repeat):
+    """Return the best wall time over several runs and the last document produced"""
+    best = float('inf')
+    doc = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        doc = renderer(markdown_text)
+        best = min(best, time.perf_counter() - start)
+    return best, doc
+
+def benchmark_docx(num_headings=300, repeat=3):
+    """Compare the per-run and the style-based DOCX renderers on a long post"""
+    markdown_text = make_sample_markdown(num_headings)
+
+    # Build the cached template up front so it isn't counted against the first run
+    new_styled_document()
+
+    results = {}
+    for name, renderer in (('basic_markdown_to_docx', basic_markdown_to_docx),
+                           ('markdown_to_docx', markdown_to_docx)):
+        seconds, doc = time_renderer(renderer, markdown_text, repeat)
+        results[name] = {
+            'seconds': seconds,
+            'document_xml_bytes': document_xml_size(doc),
+        }
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the DOCX renderers on long posts")
+    parser.add_argument('--headings', type=int, nargs='+', default=[100, 300, 1000],
+                        help="Heading counts to benchmark")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per renderer (best time is kept)")
+    args = parser.parse_args(argv)
+
+    for num_headings in args.headings:
+        results = benchmark_docx(num_headings, args.repeat)
+        print(f"{num_headings} headings:")
+        for name, result in results.items():
+            print(f"  {name:<24} {result['seconds'] * 1000:8.1f} ms  "
+                  f"document.xml {result['document_xml_bytes'] / 1024:8.1f} KiB")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+import os
+import hashlib
+from io import BytesIO
+
+import markdown
+import docx
+
+from modules import rtf_converter
+from modules.disk_cache import DiskCache
+from modules.settings import load_settings, RENDER_CACHE_DIR, DEFAULT_RENDER_CACHE_MB
+
+# Shared cache instance and renderer fingerprint, created on first use
+_render_cache = None
+_renderer_fingerprint = None
+
+def renderer_fingerprint():
+    """Return a hash identifying the current renderer code and styling"""
+    global _renderer_fingerprint
+    if _renderer_fingerprint is None:
+        digest = hashlib.sha256()
+        digest.update(rtf_converter.RENDERER_VERSION.encode('utf-8'))
+        digest.update(getattr(markdown, '__version__', '').encode('utf-8'))
+        digest.update(getattr(docx, '__version__', '').encode('utf-8'))
+
+        # Any edit to the converter (styles, fonts, spacing) changes the fingerprint
+        with open(rtf_converter.__file__, 'rb') as f:
+            digest.update(f.read())
+
+        _renderer_fingerprint = digest.hexdigest()
+    return _renderer_fingerprint
+
+def cache_key(markdown_text, fmt):
+    """Build the cache key for a markdown document rendered to a format"""
+    digest = hashlib.sha256()
+    digest.update(renderer_fingerprint().encode('utf-8'))
+    digest.update(fmt.encode('utf-8'))
+    digest.update(markdown_text.encode('utf-8'))
+    return digest.hexdigest()
+
+def get_render_cache():
+    """Return the shared render cache"""
+    global _render_cache
+    if _render_cache is None:
+        settings = load_settings()
+        max_mb = settings.get('render_cache_max_mb', DEFAULT_RENDER_CACHE_MB)
+        _render_cache = DiskCache(RENDER_CACHE_DIR, int(max_mb * 1024 * 1024))
+    return _render_cache
+
+def render_rtf(markdown_text):
+    """Convert markdown to RTF, reusing a cached render if the markdown is unchanged"""
+    cache = get_render_cache()
+    key = cache_key(markdown_text, 'rtf')
+
+    cached = cache.get(key)
+    if cached is not None:
+        return cached.decode('utf-8')
+
+    rtf_content = rtf_converter.markdown_to_rtf(markdown_text)
+
+    # markdown_to_rtf returns the error message on failure; don't cache that
+    if rtf_content.startswith('{\\rtf'):
+        try:
+            cache.put(key, rtf_content.encode('utf-8'))
+        except OSError as e:
+            print(f"Warning: Could not write render cache: {e}")
+    return rtf_content
+
+def render_docx_bytes(markdown_text):
+    """Convert markdown to DOCX file contents, reusing a cached render if possible"""
+    cache = get_render_cache()
+    key = cache_key(markdown_text, 'docx')
+
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    buffer = BytesIO()
+    rtf_converter.markdown_to_docx(markdown_text).save(buffer)
+    data = buffer.getvalue()
+
+    try:
+        cache.put(key, data)
+    except OSError as e:
+        print(f"Warning: Could not write render cache: {e}")
+    return data
+
+def save_rtf(markdown_text, filename):
+    """Render markdown to an RTF file through the cache"""
+    rtf_content = render_rtf(markdown_text)
+    if not rtf_content.startswith('{\\rtf'):
+        raise ValueError(f"RTF conversion failed: {rtf_content}")
+    os.makedirs(os.path.dirname(filename) or '.', exist_ok=True)
+    with open(filename, 'w', encoding='utf-8') as f:
+        f.write(rtf_content)
+
+def save_docx(markdown_text, filename):
+    """Render markdown to a DOCX file through the cache"""
+    data = render_docx_bytes(markdown_text)
+    os.makedirs(os.path.dirname(filename) or '.', exist_ok=True)
+    with open(filename, 'wb') as f:
+        f.write(data)
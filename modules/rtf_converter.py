@@ -7,193 +7,196 @@ from docx.shared import Pt, RGBColor
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 import html2text
 from html.parser import HTMLParser
-from io import StringIO
+from io import StringIO, BytesIO
 
-def markdown_to_rtf(markdown_text):
-    """Convert markdown text to RTF format with enhanced styling"""
-    try:
-        # First, normalize line endings and ensure proper spacing between sections
-        markdown_text = markdown_text.replace('\r\n', '\n')
-        
-        # Make sure headers have proper spacing before them
-        for header_level in range(1, 7):
-            header_marker = '#' * header_level + ' '
-            markdown_text = re.sub(r'([^\n])\n' + re.escape(header_marker), 
-                                  r'\1\n\n' + header_marker, 
-                                  markdown_text)
-        
-        # Convert markdown to HTML with essential extensions
-        html = markdown.markdown(markdown_text, extensions=['extra', 'tables'])
-        
-        # Define RTF header with optimized styling
-        rtf_header = [
-            r"{\rtf1\ansi\ansicpg1252\cocoartf2761",
-            r"\cocoatextscaling0\cocoaplatform0",
-            r"{\fonttbl",
-            r"\f0\fswiss\fcharset0 Helvetica;",
-            r"\f1\fswiss\fcharset0 Helvetica-Bold;",
-            r"\f2\fswiss\fcharset0 Helvetica-Italic;",
-            r"\f3\fswiss\fcharset0 Helvetica-BoldItalic;",
-            r"}",
-            r"{\colortbl;\red0\green0\blue0;\red0\green0\blue255;}",
-            r"\paperw12240\paperh15840",
-            r"\margl1440\margr1440",
-            r"\vieww12000\viewh15000\viewkind0",
-            r"\pard\tx720\pardeftab720\partightenfactor0",
-            r"\f0\fs24",
-        ]
-        
-        rtf = '\n'.join(rtf_header)
-        
-        class RTFConverter(HTMLParser):
-            def __init__(self):
-                super().__init__()
-                self.result = StringIO()
-                self.in_paragraph = False
+# Bump when output changes for reasons outside this file (e.g. a dependency upgrade).
+# Edits to this file already invalidate cached renders on their own.
+RENDERER_VERSION = "1"
+
+# RTF document header with optimized styling
+RTF_HEADER = '\n'.join([
+    r"{\rtf1\ansi\ansicpg1252\cocoartf2761",
+    r"\cocoatextscaling0\cocoaplatform0",
+    r"{\fonttbl",
+    r"\f0\fswiss\fcharset0 Helvetica;",
+    r"\f1\fswiss\fcharset0 Helvetica-Bold;",
+    r"\f2\fswiss\fcharset0 Helvetica-Italic;",
+    r"\f3\fswiss\fcharset0 Helvetica-BoldItalic;",
+    r"}",
+    r"{\colortbl;\red0\green0\blue0;\red0\green0\blue255;}",
+    r"\paperw12240\paperh15840",
+    r"\margl1440\margr1440",
+    r"\vieww12000\viewh15000\viewkind0",
+    r"\pard\tx720\pardeftab720\partightenfactor0",
+    r"\f0\fs24",
+])
+
+def markdown_to_rtf_body(markdown_text):
+    """Convert markdown text to the body of an RTF document (no header or closing brace)"""
+    # First, normalize line endings and ensure proper spacing between sections
+    markdown_text = markdown_text.replace('\r\n', '\n')
+    
+    # Make sure headers have proper spacing before them
+    for header_level in range(1, 7):
+        header_marker = '#' * header_level + ' '
+        markdown_text = re.sub(r'([^\n])\n' + re.escape(header_marker), 
+                              r'\1\n\n' + header_marker, 
+                              markdown_text)
+    
+    # Convert markdown to HTML with essential extensions
+    html = markdown.markdown(markdown_text, extensions=['extra', 'tables'])
+    
+    class RTFConverter(HTMLParser):
+        def __init__(self):
+            super().__init__()
+            self.result = StringIO()
+            self.in_paragraph = False
+            self.in_header = False
+            self.header_level = 0
+            self.in_list = False
+            self.in_list_item = False
+            self.in_bold = False
+            self.in_italic = False
+            self.skip_next_data = False
+            self.in_link = False
+            self.link_content = ""
+            self.tags_stack = []
+            
+        def handle_starttag(self, tag, attrs):
+            self.tags_stack.append(tag)
+            
+            if tag == 'h1':
+                self.in_header = True
+                self.header_level = 1
+                self.result.write('\\par\\pard\\f1\\fs40\\b ')
+            elif tag == 'h2':
+                self.in_header = True
+                self.header_level = 2
+                self.result.write('\\par\\pard\\f1\\fs32\\b ')
+            elif tag == 'h3':
+                self.in_header = True
+                self.header_level = 3
+                self.result.write('\\par\\pard\\f1\\fs28\\b ')
+            elif tag == 'h4':
+                self.in_header = True
+                self.header_level = 4
+                self.result.write('\\par\\pard\\f1\\fs24\\b ')
+            elif tag == 'p':
+                if not self.in_paragraph and not self.in_list_item:
+                    self.result.write('\\par\\pard ')
+                self.in_paragraph = True
+            elif tag == 'ul' or tag == 'ol':
+                self.in_list = True
+                if not self.in_paragraph:
+                    self.result.write('\\par\\pard ')
+            elif tag == 'li':
+                self.in_list_item = True
+                self.result.write('\\par\\pard\\fi-360\\li720 {\\bullet} ')
+            elif tag == 'strong' or tag == 'b':
+                self.in_bold = True
+                self.result.write('\\b ')
+            elif tag == 'em' or tag == 'i':
+                self.in_italic = True
+                self.result.write('\\i ')
+            elif tag == 'a':
+                self.in_link = True
+                href = next((attr[1] for attr in attrs if attr[0] == 'href'), '')
+                if href:
+                    # Format as blue underlined text
+                    self.result.write('\\cf2\\ul ')
+            elif tag == 'br':
+                self.result.write('\\par ')
+            elif tag == 'table':
+                self.result.write('\\par\\pard ')
+            elif tag == 'tr':
+                self.result.write('\\par\\pard ')
+            elif tag == 'td' or tag == 'th':
+                self.result.write('\\cell ')
+            
+        def handle_endtag(self, tag):
+            if self.tags_stack and self.tags_stack[-1] == tag:
+                self.tags_stack.pop()
+            
+            if tag in ('h1', 'h2', 'h3', 'h4'):
                 self.in_header = False
                 self.header_level = 0
+                self.result.write('\\f0\\b0\\fs24\\par\\par\\pard ')
+            elif tag == 'p':
+                self.in_paragraph = False
+                if not self.in_list_item:
+                    self.result.write('\\par\\par\\pard ')
+            elif tag in ('ul', 'ol'):
                 self.in_list = False
+                self.result.write('\\par\\pard ')
+            elif tag == 'li':
                 self.in_list_item = False
+                self.result.write('\\par ')
+            elif tag == 'strong' or tag == 'b':
                 self.in_bold = False
+                self.result.write('\\b0 ')
+            elif tag == 'em' or tag == 'i':
                 self.in_italic = False
-                self.skip_next_data = False
+                self.result.write('\\i0 ')
+            elif tag == 'a':
                 self.in_link = False
-                self.link_content = ""
-                self.tags_stack = []
-                
-            def handle_starttag(self, tag, attrs):
-                self.tags_stack.append(tag)
-                
-                if tag == 'h1':
-                    self.in_header = True
-                    self.header_level = 1
-                    self.result.write('\\par\\pard\\f1\\fs40\\b ')
-                elif tag == 'h2':
-                    self.in_header = True
-                    self.header_level = 2
-                    self.result.write('\\par\\pard\\f1\\fs32\\b ')
-                elif tag == 'h3':
-                    self.in_header = True
-                    self.header_level = 3
-                    self.result.write('\\par\\pard\\f1\\fs28\\b ')
-                elif tag == 'h4':
-                    self.in_header = True
-                    self.header_level = 4
-                    self.result.write('\\par\\pard\\f1\\fs24\\b ')
-                elif tag == 'p':
-                    if not self.in_paragraph and not self.in_list_item:
-                        self.result.write('\\par\\pard ')
-                    self.in_paragraph = True
-                elif tag == 'ul' or tag == 'ol':
-                    self.in_list = True
-                    if not self.in_paragraph:
-                        self.result.write('\\par\\pard ')
-                elif tag == 'li':
-                    self.in_list_item = True
-                    self.result.write('\\par\\pard\\fi-360\\li720 {\\bullet} ')
-                elif tag == 'strong' or tag == 'b':
-                    self.in_bold = True
-                    self.result.write('\\b ')
-                elif tag == 'em' or tag == 'i':
-                    self.in_italic = True
-                    self.result.write('\\i ')
-                elif tag == 'a':
-                    self.in_link = True
-                    href = next((attr[1] for attr in attrs if attr[0] == 'href'), '')
-                    if href:
-                        # Format as blue underlined text
-                        self.result.write('\\cf2\\ul ')
-                elif tag == 'br':
-                    self.result.write('\\par ')
-                elif tag == 'table':
-                    self.result.write('\\par\\pard ')
-                elif tag == 'tr':
-                    self.result.write('\\par\\pard ')
-                elif tag == 'td' or tag == 'th':
-                    self.result.write('\\cell ')
-                
-            def handle_endtag(self, tag):
-                if self.tags_stack and self.tags_stack[-1] == tag:
-                    self.tags_stack.pop()
-                
-                if tag in ('h1', 'h2', 'h3', 'h4'):
-                    self.in_header = False
-                    self.header_level = 0
-                    self.result.write('\\f0\\b0\\fs24\\par\\par\\pard ')
-                elif tag == 'p':
-                    self.in_paragraph = False
-                    if not self.in_list_item:
-                        self.result.write('\\par\\par\\pard ')
-                elif tag in ('ul', 'ol'):
-                    self.in_list = False
-                    self.result.write('\\par\\pard ')
-                elif tag == 'li':
-                    self.in_list_item = False
-                    self.result.write('\\par ')
-                elif tag == 'strong' or tag == 'b':
-                    self.in_bold = False
-                    self.result.write('\\b0 ')
-                elif tag == 'em' or tag == 'i':
-                    self.in_italic = False
-                    self.result.write('\\i0 ')
-                elif tag == 'a':
-                    self.in_link = False
-                    self.result.write('\\cf1\\ulnone ')
-                elif tag == 'tr':
-                    self.result.write('\\row ')
-                elif tag == 'table':
-                    self.result.write('\\par\\pard ')
-                
-            def handle_data(self, data):
-                if self.skip_next_data:
-                    self.skip_next_data = False
-                    return
-                
-                # Handle RTF escaping for special characters
-                data = data.replace('\\', '\\\\')
-                data = data.replace('{', '\\{')
-                data = data.replace('}', '\\}')
-                
-                # Handle Unicode characters
-                replacements = {
-                    '•': '{\\bullet}',
-                    '"': '\\"',
-                    '"': '\\"',
-                    ''': "\\'92",
-                    ''': "\\'92",
-                    '…': '...',
-                    '–': '-',
-                    '—': '--',
-                    '\u2022': '{\\bullet}',  # Unicode bullet
-                    '\u2018': "\\'91",       # Left single quote
-                    '\u2019': "\\'92",       # Right single quote
-                    '\u201C': "\\'93",       # Left double quote
-                    '\u201D': "\\'94",       # Right double quote
-                }
-                
-                for old, new in replacements.items():
-                    data = data.replace(old, new)
-                
-                self.result.write(data)
+                self.result.write('\\cf1\\ulnone ')
+            elif tag == 'tr':
+                self.result.write('\\row ')
+            elif tag == 'table':
+                self.result.write('\\par\\pard ')
             
-            def get_rtf(self):
-                return self.result.getvalue()
-        
-        # Parse HTML to RTF
-        converter = RTFConverter()
-        converter.feed(html)
-        rtf_body = converter.get_rtf()
-        
-        # Add proper paragraph spacing
-        rtf_body = rtf_body.replace('\\par\\par', '\\par\\sa180\\par')
-        
-        # Special handling for product links with bold-italic formatting [***text***]
-        rtf_body = re.sub(r'\\\*\\\*\\\*([^*]+)\\\*\\\*\\\*', r'\\b\\i \1\\i0\\b0 ', rtf_body)
-        
-        # Add content and close RTF
-        rtf += rtf_body + "\n}"
+        def handle_data(self, data):
+            if self.skip_next_data:
+                self.skip_next_data = False
+                return
+            
+            # Handle RTF escaping for special characters
+            data = data.replace('\\', '\\\\')
+            data = data.replace('{', '\\{')
+            data = data.replace('}', '\\}')
+            
+            # Handle Unicode characters
+            replacements = {
+                '•': '{\\bullet}',
+                '"': '\\"',
+                '"': '\\"',
+                ''': "\\'92",
+                ''': "\\'92",
+                '…': '...',
+                '–': '-',
+                '—': '--',
+                '\u2022': '{\\bullet}',  # Unicode bullet
+                '\u2018': "\\'91",       # Left single quote
+                '\u2019': "\\'92",       # Right single quote
+                '\u201C': "\\'93",       # Left double quote
+                '\u201D': "\\'94",       # Right double quote
+            }
+            
+            for old, new in replacements.items():
+                data = data.replace(old, new)
+            
+            self.result.write(data)
         
-        return rtf
+        def get_rtf(self):
+            return self.result.getvalue()
+    
+    # Parse HTML to RTF
+    converter = RTFConverter()
+    converter.feed(html)
+    rtf_body = converter.get_rtf()
+    
+    # Add proper paragraph spacing
+    rtf_body = rtf_body.replace('\\par\\par', '\\par\\sa180\\par')
+    
+    # Special handling for product links with bold-italic formatting [***text***]
+    rtf_body = re.sub(r'\\\*\\\*\\\*([^*]+)\\\*\\\*\\\*', r'\\b\\i \1\\i0\\b0 ', rtf_body)
+    
+    return rtf_body
+
+def markdown_to_rtf(markdown_text):
+    """Convert markdown text to RTF format with enhanced styling"""
+    try:
+        return RTF_HEADER + markdown_to_rtf_body(markdown_text) + "\n}"
         
     except Exception as e:
         print(f"Error in RTF conversion: {str(e)}")
@@ -279,8 +282,186 @@ def basic_markdown_to_rtf(markdown_text):
     
     return rtf
 
+# Cached bytes of the styled DOCX template, built once per process
+_docx_template = None
+
+# Paragraph styles used for each block-level HTML tag
+DOCX_BLOCK_STYLES = {
+    'h1': 'Heading 1',
+    'h2': 'Heading 2',
+    'h3': 'Heading 3',
+    'h4': 'Heading 3',
+    'h5': 'Heading 3',
+    'h6': 'Heading 3',
+    'p': 'Normal',
+}
+
+def build_docx_template():
+    """Build the styled DOCX template and return it as bytes"""
+    doc = Document()
+    styles = doc.styles
+
+    # Body text
+    normal = styles['Normal']
+    normal.font.name = 'Helvetica'
+    normal.font.size = Pt(11)
+    normal.paragraph_format.space_after = Pt(10)
+
+    # Headings, matching the sizes used by the RTF converter
+    for style_name, size, space_after in (('Heading 1', 20, 12),
+                                          ('Heading 2', 16, 10),
+                                          ('Heading 3', 14, 8)):
+        style = styles[style_name]
+        style.font.name = 'Helvetica'
+        style.font.size = Pt(size)
+        style.font.bold = True
+        style.font.italic = False
+        style.font.color.rgb = RGBColor(0, 0, 0)
+        style.paragraph_format.space_after = Pt(space_after)
+
+    # Lists
+    for style_name in ('List Bullet', 'List Bullet 2', 'List Number'):
+        style = styles[style_name]
+        style.font.name = 'Helvetica'
+        style.font.size = Pt(11)
+        style.paragraph_format.space_after = Pt(4)
+
+    buffer = BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+def get_docx_template():
+    """Return the styled DOCX template bytes, building them once per process"""
+    global _docx_template
+    if _docx_template is None:
+        _docx_template = build_docx_template()
+    return _docx_template
+
+def new_styled_document():
+    """Return a fresh Document cloned from the cached styled template"""
+    return Document(BytesIO(get_docx_template()))
+
+def new_list_numbering(doc, numbering, style_name='List Number'):
+    """Add a numbering instance that restarts the style's list at 1 and return its numId
+
+    'List Number' paragraphs share one numbering instance, so without their own
+    instance every ordered list would continue counting from the one before it.
+    """
+    style_num_id = doc.styles[style_name].element.pPr.numPr.numId.val
+    abstract_num_id = numbering.num_having_numId(style_num_id).abstractNumId.val
+    num = numbering.add_num(abstract_num_id)
+    num.add_lvlOverride(ilvl=0).add_startOverride(1)
+    return num.numId
+
+class DocxBuilder(HTMLParser):
+    """Append HTML content to a DOCX document using paragraph styles
+
+    Each ordered list gets a numbering instance of its own in numbering (the
+    document's numbering part unless another is given), so every list starts at 1.
+    """
+
+    def __init__(self, doc, numbering=None):
+        super().__init__()
+        self.doc = doc
+        self.numbering = numbering if numbering is not None else doc.part.numbering_part.element
+        self.paragraph = None
+        self.list_stack = []
+        self.num_ids = []
+        self.in_list_item = False
+        self.bold = 0
+        self.italic = 0
+        self.style_ids = {}
+
+    def start_paragraph(self, style):
+        self.paragraph = self.doc.add_paragraph()
+        if style == 'Normal':
+            return
+
+        # Resolving a style by name scans the whole style table, so look each
+        # one up once per document and set the style id on the paragraph directly
+        style_id = self.style_ids.get(style)
+        if style_id is None:
+            style_id = self.style_ids[style] = self.doc.styles[style].style_id
+        self.paragraph._p.style = style_id
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ('ul', 'ol'):
+            self.list_stack.append(tag)
+            if tag == 'ol':
+                self.num_ids.append(new_list_numbering(self.doc, self.numbering))
+            self.paragraph = None
+        elif tag == 'li':
+            self.in_list_item = True
+            if self.list_stack and self.list_stack[-1] == 'ol':
+                self.start_paragraph('List Number')
+                num_pr = self.paragraph._p.get_or_add_pPr().get_or_add_numPr()
+                num_pr.get_or_add_ilvl().val = 0
+                num_pr.get_or_add_numId().val = self.num_ids[-1]
+            elif len(self.list_stack) > 1:
+                self.start_paragraph('List Bullet 2')
+            else:
+                self.start_paragraph('List Bullet')
+        elif tag == 'p' and self.in_list_item and self.paragraph is not None:
+            # Loose lists wrap item text in <p>; keep it in the list paragraph
+            pass
+        elif tag in DOCX_BLOCK_STYLES:
+            self.start_paragraph(DOCX_BLOCK_STYLES[tag])
+        elif tag in ('strong', 'b'):
+            self.bold += 1
+        elif tag in ('em', 'i'):
+            self.italic += 1
+        elif tag == 'br' and self.paragraph is not None:
+            self.paragraph.add_run().add_break()
+
+    def handle_endtag(self, tag):
+        if tag in ('ul', 'ol'):
+            if self.list_stack and self.list_stack.pop() == 'ol':
+                self.num_ids.pop()
+            self.paragraph = None
+        elif tag == 'li':
+            self.in_list_item = False
+            self.paragraph = None
+        elif tag == 'p' and self.in_list_item:
+            pass
+        elif tag in DOCX_BLOCK_STYLES:
+            self.paragraph = None
+        elif tag in ('strong', 'b'):
+            self.bold = max(0, self.bold - 1)
+        elif tag in ('em', 'i'):
+            self.italic = max(0, self.italic - 1)
+
+    def handle_data(self, data):
+        # Skip the newlines markdown puts between block elements
+        if not data.strip() and (self.paragraph is None or '\n' in data):
+            return
+        if self.paragraph is None:
+            self.start_paragraph('Normal')
+
+        run = self.paragraph.add_run(data.replace('\n', ' '))
+        # Only inline emphasis gets run-level formatting; everything else comes from styles
+        if self.bold:
+            run.bold = True
+        if self.italic:
+            run.italic = True
+
+def append_markdown_to_docx(doc, markdown_text, numbering=None):
+    """Render markdown into an existing styled document
+
+    numbering is the numbering part element that list numbering is added to,
+    when the body is going to be copied into another document.
+    """
+    html = markdown.markdown(markdown_text.replace('\r\n', '\n'), extensions=['extra'])
+    builder = DocxBuilder(doc, numbering)
+    builder.feed(html)
+    builder.close()
+    return doc
+
 def markdown_to_docx(markdown_text):
-    """Convert markdown text to DOCX format"""
+    """Convert markdown text to DOCX format using the cached styled template"""
+    return append_markdown_to_docx(new_styled_document(), markdown_text)
+
+def basic_markdown_to_docx(markdown_text):
+    """Fallback DOCX converter that formats every heading run by hand"""
     # Convert markdown to HTML first
     html = markdown.markdown(markdown_text)
     
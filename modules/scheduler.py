@@ -0,0 +1,164 @@
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future
+
+from modules.settings import load_settings, DEFAULT_SCHEDULER_WORKERS
+from modules.cancel import CancelToken
+
+# Job priorities, most urgent first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 1
+PRIORITY_BACKGROUND = 2
+
+# Workers kept free of batch and background tasks, so an interactive request starts right away
+RESERVED_INTERACTIVE_WORKERS = 1
+
+class RateLimitBudget:
+    """Pause shared by every job, so a rate limit hit by one holds back new requests from all"""
+
+    def __init__(self):
+        self.resume_at = 0.0
+        self.lock = threading.Lock()
+
+    def pause(self, seconds):
+        """Hold back new requests for the next seconds"""
+        with self.lock:
+            self.resume_at = max(self.resume_at, time.monotonic() + seconds)
+
+    def remaining(self):
+        with self.lock:
+            return max(0.0, self.resume_at - time.monotonic())
+
+    def wait(self, cancel_token=None):
+        """Block until requests may be sent again; returns False if cancelled first"""
+        while True:
+            remaining = self.remaining()
+            if remaining <= 0:
+                return True
+            if cancel_token is not None:
+                if cancel_token.wait(remaining):
+                    return False
+            else:
+                time.sleep(remaining)
+
+class Job:
+    """A group of tasks that share a priority and a cancel token"""
+
+    def __init__(self, scheduler, name, priority, cancel_token):
+        self.scheduler = scheduler
+        self.name = name
+        self.priority = priority
+        self.cancel_token = cancel_token
+        self.pending = []  # heap of (estimated tokens, sequence, fn, args, future)
+        self.running = 0
+        self.last_served = -1
+
+    def submit(self, fn, *args, estimate=0):
+        """Queue fn(*args); smaller estimates run first. Returns a Future"""
+        return self.scheduler.enqueue(self, [(fn, args, estimate)])[0]
+
+    def submit_many(self, fn, items, estimate):
+        """Queue fn(item) for every item at once, so the smallest estimate(item) is picked first"""
+        return self.scheduler.enqueue(self, [(fn, (item,), estimate(item)) for item in items])
+
+    def cancel(self):
+        """Drop the tasks that haven't started; running ones stop through the cancel token"""
+        self.scheduler.drop_pending(self)
+
+class JobScheduler:
+    """Runs the tasks of every job on one pool of worker threads
+
+    The next task comes from the most urgent priority, then from the job with
+    the fewest tasks running (ties go to the job served longest ago), then the
+    smallest estimate in that job. One worker is held back for interactive jobs.
+    """
+
+    def __init__(self, workers=DEFAULT_SCHEDULER_WORKERS):
+        self.workers = max(1, workers)
+        self.reserved = RESERVED_INTERACTIVE_WORKERS if self.workers > RESERVED_INTERACTIVE_WORKERS else 0
+        self.budget = RateLimitBudget()
+        self.condition = threading.Condition()
+        self.jobs = []  # jobs with queued tasks
+        self.busy = 0
+        self.sequence = itertools.count()
+        for i in range(self.workers):
+            threading.Thread(target=self.work_loop, name=f"scheduler-{i}", daemon=True).start()
+
+    def create_job(self, name, priority=PRIORITY_BATCH, cancel_token=None):
+        """Start a job; cancelling its token drops its queued tasks"""
+        job = Job(self, name, priority, cancel_token or CancelToken())
+        job.cancel_token.on_cancel(job.cancel)
+        return job
+
+    def enqueue(self, job, tasks):
+        """Queue (fn, args, estimate) tasks for a job and return their Futures"""
+        futures = [Future() for _ in tasks]
+        if job.cancel_token.cancelled:
+            for future in futures:
+                future.cancel()
+            return futures
+        with self.condition:
+            for (fn, args, estimate), future in zip(tasks, futures):
+                heapq.heappush(job.pending, (estimate, next(self.sequence), fn, args, future))
+            if job not in self.jobs:
+                self.jobs.append(job)
+            self.condition.notify_all()
+        return futures
+
+    def drop_pending(self, job):
+        with self.condition:
+            tasks, job.pending = job.pending, []
+            if job in self.jobs:
+                self.jobs.remove(job)
+        for task in tasks:
+            task[-1].cancel()
+
+    def eligible_jobs(self):
+        """Jobs that may start a task on a free worker now"""
+        if self.busy < self.workers - self.reserved:
+            return self.jobs
+        return [job for job in self.jobs if job.priority == PRIORITY_INTERACTIVE]
+
+    def next_task(self):
+        """Wait for a task that may run and take it off the queue"""
+        with self.condition:
+            while not self.eligible_jobs():
+                self.condition.wait()
+            job = min(self.eligible_jobs(), key=lambda j: (j.priority, j.running, j.last_served))
+            _, _, fn, args, future = heapq.heappop(job.pending)
+            if not job.pending:
+                self.jobs.remove(job)
+            job.running += 1
+            job.last_served = next(self.sequence)
+            self.busy += 1
+            return job, fn, args, future
+
+    def work_loop(self):
+        while True:
+            job, fn, args, future = self.next_task()
+            try:
+                if future.set_running_or_notify_cancel():
+                    try:
+                        future.set_result(fn(*args))
+                    except BaseException as e:
+                        future.set_exception(e)
+            finally:
+                with self.condition:
+                    job.running -= 1
+                    self.busy -= 1
+                    self.condition.notify_all()
+
+# One scheduler for the whole app, so every job draws on the same workers and rate-limit budget
+scheduler = None
+scheduler_lock = threading.Lock()
+
+def get_scheduler():
+    """Return the shared scheduler, starting it on first use"""
+    global scheduler
+    with scheduler_lock:
+        if scheduler is None:
+            workers = load_settings().get('scheduler_workers', DEFAULT_SCHEDULER_WORKERS)
+            scheduler = JobScheduler(workers)
+        return scheduler
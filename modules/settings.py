@@ -16,6 +16,55 @@ DEFAULT_TEMPERATURE = 0.7
 DEFAULT_MAX_TOKENS = 4000
 DEFAULT_PROMPT = "Format the following transcript into a structured blog post with a title, summary, and headings."
 
+# Render cache for RTF/DOCX output (size limit can be overridden with 'render_cache_max_mb')
+RENDER_CACHE_DIR = "render_cache"
+DEFAULT_RENDER_CACHE_MB = 256
+
+# Cache of synthesized speech segments (size limit can be overridden with 'audio_cache_max_mb')
+AUDIO_CACHE_DIR = "audio_cache"
+DEFAULT_AUDIO_CACHE_MB = 512
+
+# Generated posts, keyed by transcript, prompt and model settings (size limit can be
+# overridden with 'post_cache_max_mb'; set 'reuse_cached_posts' to false to always regenerate)
+POST_CACHE_DIR = "post_cache"
+DEFAULT_POST_CACHE_MB = 256
+
+# Decoded transcripts that weren't plain UTF-8 or were large, keyed by content hash
+# (size limit can be overridden with 'text_cache_max_mb')
+TEXT_CACHE_DIR = "text_cache"
+DEFAULT_TEXT_CACHE_MB = 256
+
+# Installed pyttsx3 voices, cached so the voice manager doesn't re-enumerate them
+VOICE_CATALOG_FILE = "voice_catalog.json"
+
+# Export of generated posts
+OUTPUT_DIR = "blog_posts"
+EXPORT_FORMATS = ["none", "rtf", "docx", "html", "markdown"]
+EXPORT_MODES = ["background", "lazy"]
+DEFAULT_EXPORT_FORMAT = "rtf"
+DEFAULT_EXPORT_MODE = "background"
+
+# Exported files are stored once by content hash under OUTPUT_DIR/.store, with links to
+# them in OUTPUT_DIR (size limit can be overridden with 'output_store_max_mb'; set
+# 'output_retention_days' to drop exports older than that)
+OUTPUT_STORE_DIR = ".store"
+DEFAULT_OUTPUT_STORE_MB = 2048
+
+# Worker threads that send generation requests (can be overridden with 'scheduler_workers');
+# one of them is kept for single-file runs
+DEFAULT_SCHEDULER_WORKERS = 3
+
+# SQLite catalog of every generated post, with a full-text index
+CATALOG_FILE = "catalog.db"
+
+# Compressed archives of old posts, their transcripts and exports ('archive_compression'
+# can be "deflate", "bzip2" or "lzma"; deflate archives open in any zip tool)
+ARCHIVE_DIR = "archives"
+DEFAULT_ARCHIVE_COMPRESSION = "deflate"
+
+# Journals and partial results of batch jobs
+JOBS_DIR = "jobs"
+
 # Preferred voice IDs - based on your selection
 PREFERRED_VOICE_IDS = [
     "14", "30", "38", "39", "66", "80", "89", "90", "97", "108"
@@ -0,0 +1,178 @@
+import os
+import re
+import mmap
+import codecs
+import hashlib
+
+from modules.disk_cache import DiskCache
+from modules.settings import load_settings, TEXT_CACHE_DIR, DEFAULT_TEXT_CACHE_MB
+
+# How much of a file is looked at to guess its encoding
+SNIFF_BYTES = 4096
+
+# Files this large are memory-mapped and decoded a chunk at a time instead of read whole
+MMAP_THRESHOLD_BYTES = 8 * 1024 * 1024
+DECODE_CHUNK_BYTES = 1024 * 1024
+
+# Decoded text is cached when the file wasn't plain UTF-8 or is at least this large;
+# smaller UTF-8 files are cheaper to decode again than to look up
+CACHE_MIN_BYTES = 1024 * 1024
+
+# Used when a file has no BOM and isn't valid UTF-8 (Windows tools usually write cp1252)
+FALLBACK_ENCODING = 'cp1252'
+
+# UTF-32 LE is checked before UTF-16 LE because its BOM starts with the same two bytes
+BOMS = [
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
+
+# Control characters (other than tab and newline) that transcription tools leave behind
+CONTROL_CHARS = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]')
+
+# Shared cache instance, created on first use
+_text_cache = None
+
+def get_text_cache():
+    """Return the shared cache of decoded transcripts"""
+    global _text_cache
+    if _text_cache is None:
+        settings = load_settings()
+        max_mb = settings.get('text_cache_max_mb', DEFAULT_TEXT_CACHE_MB)
+        _text_cache = DiskCache(TEXT_CACHE_DIR, int(max_mb * 1024 * 1024), suffix='.txt')
+    return _text_cache
+
+def sniff_encoding(head):
+    """Guess the encoding of a file from its first bytes"""
+    for bom, encoding in BOMS:
+        if head.startswith(bom):
+            return encoding
+
+    # UTF-16 without a BOM: mostly-ASCII text has a NUL in every other byte
+    half = len(head) // 2
+    if half >= 2:
+        even_nuls = head[0::2].count(0)
+        odd_nuls = head[1::2].count(0)
+        if odd_nuls > half * 0.3 and even_nuls < half * 0.05:
+            return 'utf-16-le'
+        if even_nuls > half * 0.3 and odd_nuls < half * 0.05:
+            return 'utf-16-be'
+
+    # cp1252 accents almost never form valid UTF-8 sequences, so text that is mostly
+    # valid UTF-8 is UTF-8 with a few corrupt bytes. The head may end partway through
+    # a character, so its end isn't treated as final
+    text = codecs.getincrementaldecoder('utf-8')(errors='replace').decode(head, final=False)
+    bad = text.count('\ufffd')
+    good = sum(1 for char in text if char > '\x7f') - bad
+    if bad == 0 or good > bad * 4:
+        return 'utf-8'
+    return FALLBACK_ENCODING
+
+def decode_chunks(data, encoding):
+    """Yield the text of a bytes-like object a chunk at a time, replacing undecodable bytes"""
+    decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+    for start in range(0, len(data), DECODE_CHUNK_BYTES):
+        text = decoder.decode(data[start:start + DECODE_CHUNK_BYTES])
+        if text:
+            yield text
+    tail = decoder.decode(b'', final=True)
+    if tail:
+        yield tail
+
+def clean_chunks(chunks):
+    """Yield decoded text with line endings and whitespace normalized and control characters dropped
+
+    Works a chunk at a time, holding back only the unfinished last line. Lines
+    lose their trailing spaces, runs of blank lines become one blank line and
+    blank lines at the start and end are dropped.
+    """
+    carry = ''
+    line_ending = ''
+    started = False
+    blank = False
+    for chunk in chunks:
+        text = line_ending + chunk
+        # A \r at the end of a chunk may be the first half of a \r\n
+        line_ending = '\r' if text.endswith('\r') else ''
+        if line_ending:
+            text = text[:-1]
+        text = text.replace('\r\n', '\n').replace('\r', '\n').replace('\ufeff', '')
+        lines = (carry + CONTROL_CHARS.sub('', text)).split('\n')
+        carry = lines.pop()
+        out = []
+        for line in lines:
+            started, blank = add_clean_line(out, line, started, blank)
+        if out:
+            yield ''.join(out)
+    # A held back \r would only end the last line, and trailing blank lines are dropped anyway
+    out = []
+    add_clean_line(out, carry, started, blank)
+    if out:
+        yield ''.join(out)
+
+def add_clean_line(out, line, started, blank):
+    """Append one cleaned line to out and return the updated (started, blank) state of clean_chunks"""
+    line = line.rstrip()
+    if not line:
+        return started, started
+    if started:
+        out.append('\n\n' if blank else '\n')
+    else:
+        line = line.lstrip()
+    out.append(line)
+    return True, False
+
+def content_hash(data):
+    """Hash a bytes-like object a chunk at a time (so a memory map isn't copied whole)"""
+    digest = hashlib.sha256()
+    for start in range(0, len(data), DECODE_CHUNK_BYTES):
+        digest.update(data[start:start + DECODE_CHUNK_BYTES])
+    return digest.hexdigest()
+
+def decode_text(data, clean=False):
+    """Decode transcript bytes (or a memory map of them), going through the decoded-text cache
+
+    With clean, the text is passed through clean_chunks() as it is decoded and
+    the cleaned text is what gets cached. The cache entry is written as the
+    text is decoded, so the only full copy held is the returned string.
+    """
+    encoding = sniff_encoding(data[:SNIFF_BYTES])
+    chunks = decode_chunks(data, encoding)
+    if clean:
+        chunks = clean_chunks(chunks)
+    if encoding == 'utf-8' and len(data) < CACHE_MIN_BYTES:
+        return ''.join(chunks)
+
+    cache = get_text_cache()
+    key = content_hash(data) + ('-clean' if clean else '')
+    cached = cache.get(key)
+    if cached is not None:
+        return cached.decode('utf-8')
+
+    pieces = []
+    def encoded():
+        for piece in chunks:
+            pieces.append(piece)
+            yield piece.encode('utf-8')
+    try:
+        cache.put_chunks(key, encoded())
+    except OSError as e:
+        print(f"Warning: Could not write text cache: {e}")
+        # Decode whatever the failed write didn't get to
+        pieces.extend(chunks)
+    return ''.join(pieces)
+
+def read_text(path, clean=False):
+    """Read a transcript in whatever encoding it was saved in, cleaned as it is decoded if clean is set
+
+    Files of MMAP_THRESHOLD_BYTES or more are memory-mapped, so their bytes
+    are paged in as they are hashed and decoded instead of copied into memory.
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size >= MMAP_THRESHOLD_BYTES:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return decode_text(data, clean)
+        return decode_text(f.read(), clean)
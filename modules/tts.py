@@ -1,17 +1,25 @@
-import os
+import re
 import time
+import hashlib
 import threading
+from io import BytesIO
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
 import tkinter as tk
 from tkinter import ttk, messagebox
-import pyttsx3
 from gtts import gTTS
 import pygame
-import threading
 
-from modules.settings import load_settings, save_settings, get_preferred_voices, save_preferred_voice, remove_preferred_voice
+from modules.settings import load_settings, save_settings, save_preferred_voice, remove_preferred_voice
+from modules.audio_cache import synthesize_cached, synthesize_cached_bytes
+from modules.tts_worker import get_tts_worker
+from modules.voice_catalog import (
+    get_voice_catalog, preferred_catalog_voices,
+    cached_sample_path, render_sample, start_sample_prerender,
+)
 
 # Global variables
-tts_engine = None
+tts_engine = None  # The shared TTS worker; the pyttsx3 engine lives in its subprocess
 speech_thread = None
 speech_lock = threading.Lock()  # Add a lock to prevent concurrent speech operations
 is_speaking = False
@@ -19,15 +27,72 @@ stop_speaking = False
 skip_voice = False
 is_testing_voices = False
 
-def initialize_engine():
-    """Initialize and return a new TTS engine"""
+# Online TTS pipeline: text is split into sentence groups that are synthesized
+# by a small worker pool and played back in order as they become ready
+ONLINE_CHUNK_CHARS = 400
+ONLINE_FIRST_CHUNK_CHARS = 150  # Keep the first chunk short so audio starts sooner
+ONLINE_TTS_WORKERS = 3
+ONLINE_TTS_LOOKAHEAD = 6
+
+# Set to wake the playing thread as soon as speech is stopped or skipped
+playback_interrupt = threading.Event()
+
+# How often a stopped speech thread checks back while a chunk is still being synthesized
+STOP_CHECK_SECONDS = 0.05
+
+# Unit of the current post being spoken, saved so playback can resume after Stop
+speech_position = {'text': None, 'index': 0}
+
+# Timing of the most recent pipelined speech (time to first audio, gaps between chunks)
+last_speech_metrics = {}
+
+# Voice previews in the voice manager; a new preview stops the previous one
+preview_id = 0
+preview_lock = threading.Lock()
+
+def initialize_engine(root=None):
+    """Return the shared TTS worker, starting its engine process the first time"""
+    global tts_engine
     try:
-        engine = pyttsx3.init()
-        return engine
+        tts_engine = get_tts_worker()
+        if root is not None:
+            watch_worker_status(root, tts_engine)
+        return tts_engine
     except Exception as e:
         print(f"Error initializing TTS engine: {e}")
         return None
 
+def watch_worker_status(root, worker):
+    """Forward the worker's status events to the speech status label (once per worker)"""
+    if getattr(worker, 'status_listener', None):
+        return
+    
+    def on_event(event):
+        kind = event.get('type')
+        if kind == 'started':
+            message = "Status: Speaking..."
+        elif kind == 'stopped':
+            message = "Status: Ready"
+        elif kind == 'error' and event.get('error') != "stopped":
+            print(f"TTS worker error: {event.get('error')}")
+            message = f"Status: Error - {str(event.get('error'))[:30]}..."
+        else:
+            return
+        # Events arrive on a background thread; update the label from the Tk thread
+        root.after(0, lambda: update_speech_status(None, message))
+    
+    worker.status_listener = on_event
+    worker.add_listener(on_event)
+
+def prerender_voice_samples(root):
+    """Start the TTS worker and pre-render the preferred voice samples in the background"""
+    def run():
+        worker = initialize_engine(root)
+        if worker:
+            start_sample_prerender(worker)
+    
+    threading.Thread(target=run, daemon=True).start()
+
 def stop_text_to_speech():
     """Stop current text-to-speech playback"""
     global is_speaking, stop_speaking, tts_engine, is_testing_voices, skip_voice
@@ -38,21 +103,20 @@ def stop_text_to_speech():
     is_testing_voices = False
     
     try:
-        # Stop any pygame playback for online TTS
-        if pygame.mixer.get_init() and pygame.mixer.music.get_busy():
-            pygame.mixer.music.stop()
+        # Stop any pygame playback and wake the thread waiting for it to end
+        if pygame.mixer.get_init():
+            pygame.mixer.stop()
+        interrupt_playback()
     except Exception as e:
         print(f"Error stopping pygame mixer: {e}")
     
-    # Try to cleanly shut down the engine
+    # Tell the worker to stop speaking and drop anything queued; this doesn't block
     try:
         if tts_engine:
             tts_engine.stop()
     except Exception as e:
         print(f"Error stopping TTS engine: {e}")
     
-    # Wait a moment to allow things to stop
-    time.sleep(0.1)
     is_speaking = False
     
     # Log successful stop
@@ -63,237 +127,225 @@ def skip_current_voice():
     """Skip the currently speaking voice during testing"""
     global skip_voice
     skip_voice = True
+    interrupt_playback()
+    if tts_engine:
+        tts_engine.skip()
 
 def test_voices(root, output_text, button_frame):
-    """Test all available voices by speaking a sample text with each voice"""
-    global skip_voice, is_testing_voices, tts_engine
+    """Test the preferred voices by queueing a sample of each on the TTS worker"""
+    global skip_voice, is_testing_voices
     
     # Prevent running if already testing
     if is_testing_voices:
         return
     
-    try:
-        # Reset the skip flag
-        skip_voice = False
-        is_testing_voices = True
-        
-        # Create the skip button if it doesn't exist
-        if not hasattr(test_voices, 'skip_button_exists') and button_frame:
-            skip_button = ttk.Button(button_frame, text="Skip Voice", command=skip_current_voice)
-            skip_button.pack(side=tk.LEFT, padx=10)
-            test_voices.skip_button_exists = True
-        
-        # Initialize a new TTS engine specifically for testing
-        test_engine = initialize_engine()
-        if not test_engine:
-            messagebox.showerror("Error", "Failed to initialize speech engine for testing.")
-            is_testing_voices = False
-            return
-        
-        # Get available voices
-        voices = test_engine.getProperty('voices')
-        
-        # Get preferred voice indices from settings
-        preferred_indices_str = get_preferred_voices()
-        preferred_indices = []
-        for idx in preferred_indices_str:
-            try:
-                preferred_indices.append(int(idx))
-            except:
-                continue
-        
-        # Use default indices if none are set
-        if not preferred_indices:
-            preferred_indices = [14, 30, 38, 39, 66, 80, 89, 90, 97, 108]
-        
-        # Text to speak for testing
-        test_text = "This is a sample of my voice. How do I sound?"
-        
-        # Clear the output area
-        output_text.delete(1.0, tk.END)
-        output_text.insert(tk.END, "Testing your preferred voices...\n\n")
+    # Reset the skip flag
+    skip_voice = False
+    is_testing_voices = True
+    
+    # Create the skip button if it doesn't exist
+    if not hasattr(test_voices, 'skip_button_exists') and button_frame:
+        skip_button = ttk.Button(button_frame, text="Skip Voice", command=skip_current_voice)
+        skip_button.pack(side=tk.LEFT, padx=10)
+        test_voices.skip_button_exists = True
+    
+    # Clear the output area
+    output_text.delete(1.0, tk.END)
+    output_text.insert(tk.END, "Testing your preferred voices...\n\n")
+    output_text.see(tk.END)
+    
+    # Listing voices waits on the worker, so do it off the Tk thread
+    threading.Thread(target=queue_voice_tests, args=(root, output_text), daemon=True).start()
+
+def queue_voice_tests(root, output_text):
+    """Play the sample clip of each preferred voice, rendering any that aren't cached yet"""
+    global is_testing_voices, skip_voice
+    
+    def append_output(message):
+        output_text.insert(tk.END, message)
         output_text.see(tk.END)
-        root.update_idletasks()
+    
+    try:
+        worker = initialize_engine(root)
+        if not worker:
+            raise RuntimeError("Failed to initialize speech engine for testing.")
         
         # Only test the preferred voices that are within the range of available voices
-        for i in preferred_indices:
-            if i < len(voices):
-                voice = voices[i]
-                # Display voice information in the output text area
-                output_text.insert(tk.END, f"Voice {i}: {voice.name} (ID: {voice.id})\n")
-                output_text.see(tk.END)  # Scroll to see the new text
-                root.update_idletasks()  # Update the UI
-                
-                # Set the voice
-                test_engine.setProperty('voice', voice.id)
-                
-                # Set a moderate rate
-                test_engine.setProperty('rate', 190)
-                
-                # Reset skip flag
-                skip_voice = False
-                
-                # Speak the test text
-                test_engine.say(f"Voice number {i}: {voice.name}. {test_text}")
-                
-                # Run the speech
-                try:
-                    test_engine.runAndWait()
-                except Exception as e:
-                    print(f"Error in runAndWait: {e}")
-                    continue
-                
-                # Check if testing was stopped
-                if not is_testing_voices or skip_voice:
-                    break
-                    
-                # Brief pause between voices
-                time.sleep(0.5)
+        selected = preferred_catalog_voices(get_voice_catalog(worker))
+        if not selected:
+            root.after(0, lambda: append_output("No preferred voices are installed.\n"))
+            return
         
-        # Clean up
-        del test_engine
+        for voice in selected:
+            # Samples are usually pre-rendered; render on the worker only if missing
+            path = cached_sample_path(voice) or render_sample(worker, voice)
+            if not is_testing_voices:
+                break
+            
+            message = f"Voice {voice['index']}: {voice['name']} (ID: {voice['id']})\n"
+            root.after(0, lambda message=message: append_output(message))
+            
+            # Skip ends this sample only; Stop clears is_testing_voices and ends the test
+            skip_voice = False
+            play_audio(path, should_stop=lambda: skip_voice or not is_testing_voices)
+            if not is_testing_voices:
+                break
         
-        # Add a completion message
-        output_text.insert(tk.END, "\nVoice testing completed.\n")
-        output_text.see(tk.END)
+        root.after(0, lambda: append_output("\nVoice testing completed.\n"))
         
     except Exception as e:
-        messagebox.showerror("Voice Test Error", f"Error testing voices: {str(e)}")
+        # Stop drops queued renders on the worker, which isn't an error worth showing
+        if is_testing_voices:
+            error_message = f"Error testing voices: {str(e)}"
+            root.after(0, lambda: messagebox.showerror("Voice Test Error", error_message))
     finally:
         is_testing_voices = False
 
+def preview_voice(worker, voice):
+    """Play a voice's sample clip without blocking the Tk thread, stopping any previous preview"""
+    global preview_id
+    preview_id += 1
+    current_id = preview_id
+    interrupt_playback()
+    
+    def run():
+        try:
+            path = cached_sample_path(voice) or render_sample(worker, voice)
+            # Wait for the previous preview to notice it was replaced
+            with preview_lock:
+                if current_id != preview_id:
+                    return
+                play_audio(path, should_stop=lambda: current_id != preview_id)
+        except Exception as e:
+            print(f"Error previewing voice: {e}")
+    
+    threading.Thread(target=run, daemon=True).start()
+
+def stop_voice_preview():
+    """Stop the voice manager's preview, if one is playing"""
+    global preview_id
+    preview_id += 1
+    interrupt_playback()
+
 def select_voice(root, tts_var):
     """Open a dialog to select and save the preferred voice"""
-    try:
-        if tts_var.get() == "offline":
-            # Initialize a temporary engine for voice selection
-            temp_engine = initialize_engine()
-            if not temp_engine:
-                messagebox.showerror("Error", "Failed to initialize speech engine.")
+    if tts_var.get() != "offline":
+        messagebox.showinfo("Online TTS", "Voice selection is not available for online TTS.")
+        return
+    
+    # Starting the worker and listing voices can take a while, so do it off the Tk thread
+    # and open the dialog once the voices arrive
+    def load_voices():
+        try:
+            worker = initialize_engine(root)
+            if not worker:
+                root.after(0, lambda: messagebox.showerror("Error", "Failed to initialize speech engine."))
                 return
-                
-            voices = temp_engine.getProperty('voices')
-            voice_window = tk.Toplevel(root)
-            voice_window.title("Voice Selection")
-            voice_window.geometry("400x300")
-            voice_window.transient(root)
-            voice_window.grab_set()
-            
-            # Create listbox with scrollbar
-            frame = ttk.Frame(voice_window, padding=10)
-            frame.pack(fill=tk.BOTH, expand=True)
-            
-            scrollbar = ttk.Scrollbar(frame)
-            scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-            
-            listbox = tk.Listbox(frame)
-            listbox.pack(fill=tk.BOTH, expand=True)
-            
-            # Configure scrollbar
-            listbox.config(yscrollcommand=scrollbar.set)
-            scrollbar.config(command=listbox.yview)
-            
-            # Get preferred voices from settings
-            preferred_indices_str = get_preferred_voices()
-            preferred_indices = []
-            for idx in preferred_indices_str:
-                try:
-                    preferred_indices.append(int(idx))
-                except:
-                    continue
-            
-            # Use default indices if none are set
-            if not preferred_indices:
-                preferred_indices = [14, 30, 38, 39, 66, 80, 89, 90, 97, 108]
-            
-            # Populate list with preferred voices
-            preferred_voices = []
-            for i in preferred_indices:
-                if i < len(voices):
-                    voice = voices[i]
-                    preferred_voices.append(voice)
-                    listbox.insert(tk.END, f"{voice.name}")
-            
-            # Try to select the current voice
+            # Served from the cached catalog; the worker only enumerates voices when it is stale
+            voices = get_voice_catalog(worker)
+            root.after(0, lambda: show_voice_dialog(root, worker, voices))
+        except Exception as e:
+            error_message = f"An error occurred while selecting a voice: {str(e)}"
+            root.after(0, lambda: messagebox.showerror("Error", error_message))
+    
+    threading.Thread(target=load_voices, name="voice-list", daemon=True).start()
+
+def show_voice_dialog(root, worker, voices):
+    """Show the voice selection dialog for the listed voices"""
+    voice_window = tk.Toplevel(root)
+    voice_window.title("Voice Selection")
+    voice_window.geometry("400x300")
+    voice_window.transient(root)
+    voice_window.grab_set()
+    
+    # Create listbox with scrollbar
+    frame = ttk.Frame(voice_window, padding=10)
+    frame.pack(fill=tk.BOTH, expand=True)
+    
+    scrollbar = ttk.Scrollbar(frame)
+    scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+    
+    listbox = tk.Listbox(frame)
+    listbox.pack(fill=tk.BOTH, expand=True)
+    
+    # Configure scrollbar
+    listbox.config(yscrollcommand=scrollbar.set)
+    scrollbar.config(command=listbox.yview)
+    
+    # Populate list with preferred voices
+    preferred_voices = preferred_catalog_voices(voices)
+    for voice in preferred_voices:
+        listbox.insert(tk.END, f"{voice['name']}")
+    
+    # Try to select the current voice
+    settings = load_settings()
+    current_voice_id = settings.get('voice_id', '')
+    if current_voice_id:
+        for i, voice in enumerate(preferred_voices):
+            if voice['id'] == current_voice_id:
+                listbox.selection_set(i)
+                listbox.see(i)
+                break
+    elif preferred_voices:
+        # Default to first voice if none selected
+        listbox.selection_set(0)
+    
+    def test_voice():
+        selection = listbox.curselection()
+        if selection:
+            # Plays the pre-rendered sample, replacing any preview still playing
+            preview_voice(worker, preferred_voices[selection[0]])
+    
+    def save_voice():
+        selection = listbox.curselection()
+        if selection:
+            selected_voice = preferred_voices[selection[0]]
             settings = load_settings()
-            current_voice_id = settings.get('voice_id', '')
-            if current_voice_id:
-                for i, voice in enumerate(preferred_voices):
-                    if voice.id == current_voice_id:
-                        listbox.selection_set(i)
-                        listbox.see(i)
-                        break
-            elif preferred_voices:
-                # Default to first voice if none selected
-                listbox.selection_set(0)
-            
-            def test_voice():
-                selection = listbox.curselection()
-                if selection:
-                    selected_voice = preferred_voices[selection[0]]
-                    temp_engine.setProperty('voice', selected_voice.id)
-                    temp_engine.say("This is a test of how this voice sounds.")
-                    temp_engine.runAndWait()
-            
-            def save_voice():
-                selection = listbox.curselection()
-                if selection:
-                    selected_voice = preferred_voices[selection[0]]
-                    settings = load_settings()
-                    settings['voice_id'] = selected_voice.id
-                    settings['last_voice_id'] = selected_voice.id
-                    success = save_settings(settings)
-                    
-                    # Set the voice on the global engine if it exists
-                    global tts_engine
-                    if tts_engine:
-                        try:
-                            tts_engine.setProperty('voice', selected_voice.id)
-                        except:
-                            # Create a new engine if setting the voice fails
-                            tts_engine = initialize_engine()
-                            if tts_engine:
-                                tts_engine.setProperty('voice', selected_voice.id)
-                    
-                    voice_window.destroy()
-                    if success:
-                        messagebox.showinfo("Success", f"Voice set to: {selected_voice.name}")
-                    else:
-                        messagebox.showwarning("Warning", "Voice selection was made but settings could not be saved.")
-                else:
-                    messagebox.showwarning("No selection", "Please select a voice.")
-            
-            # Button frame
-            button_frame = ttk.Frame(voice_window)
-            button_frame.pack(pady=10)
-            
-            # Test button
-            test_btn = ttk.Button(button_frame, text="Test Voice", command=test_voice)
-            test_btn.pack(side=tk.LEFT, padx=5)
-            
-            # Save button
-            save_btn = ttk.Button(button_frame, text="Save", command=save_voice)
-            save_btn.pack(side=tk.LEFT, padx=5)
-            
-            # Cancel button
-            cancel_btn = ttk.Button(button_frame, text="Cancel", command=voice_window.destroy)
-            cancel_btn.pack(side=tk.LEFT, padx=5)
-            
-            # Clean up resources when window closes
-            def on_window_close():
-                del temp_engine
-                voice_window.destroy()
-            
-            voice_window.protocol("WM_DELETE_WINDOW", on_window_close)
-            
+            settings['voice_id'] = selected_voice['id']
+            settings['last_voice_id'] = selected_voice['id']
+            success = save_settings(settings)
+            
+            # Set the voice on the worker's engine
+            worker.set_voice(selected_voice['id'])
+            
+            stop_voice_preview()
+            voice_window.destroy()
+            if success:
+                messagebox.showinfo("Success", f"Voice set to: {selected_voice['name']}")
+            else:
+                messagebox.showwarning("Warning", "Voice selection was made but settings could not be saved.")
         else:
-            messagebox.showinfo("Online TTS", "Voice selection is not available for online TTS.")
-            
-    except Exception as e:
-        messagebox.showerror("Error", f"An error occurred while selecting a voice: {str(e)}")
+            messagebox.showwarning("No selection", "Please select a voice.")
+    
+    # Button frame
+    button_frame = ttk.Frame(voice_window)
+    button_frame.pack(pady=10)
+    
+    # Test button
+    test_btn = ttk.Button(button_frame, text="Test Voice", command=test_voice)
+    test_btn.pack(side=tk.LEFT, padx=5)
+    
+    # Save button
+    save_btn = ttk.Button(button_frame, text="Save", command=save_voice)
+    save_btn.pack(side=tk.LEFT, padx=5)
+    
+    # Stop any sample that is still playing when the window closes
+    def on_window_close():
+        stop_voice_preview()
+        voice_window.destroy()
+    
+    # Cancel button
+    cancel_btn = ttk.Button(button_frame, text="Cancel", command=on_window_close)
+    cancel_btn.pack(side=tk.LEFT, padx=5)
+    
+    voice_window.protocol("WM_DELETE_WINDOW", on_window_close)
 
-def speak_text(root, output_text, tts_var, test_all_voices_var=None):
-    """Speak the selected text with the chosen voice"""
+def speak_text(root, output_text, tts_var, test_all_voices_var=None, start_index=0, resume=False):
+    """Speak the selected text with the chosen voice
+    
+    Speech starts at unit start_index of the post's speech index, or where it
+    was last stopped if resume is set.
+    """
     global tts_engine, is_speaking, stop_speaking, speech_thread
     
     # Don't start new speech if already speaking
@@ -321,28 +373,31 @@ def speak_text(root, output_text, tts_var, test_all_voices_var=None):
         test_voices(root, output_text, None)
         return
     
+    if resume:
+        start_index = get_resume_index(text)
+    
     # Handle offline TTS
     if tts_var.get() == "offline":
         # Create speech thread
-        speech_thread = threading.Thread(target=lambda: speak_offline(root, text, tts_var))
+        speech_thread = threading.Thread(target=lambda: speak_offline(root, text, tts_var, start_index))
         speech_thread.daemon = True
         speech_thread.start()
     else:
         # Create speech thread for online TTS
-        speech_thread = threading.Thread(target=lambda: speak_online(root, output_text, text))
+        speech_thread = threading.Thread(target=lambda: speak_online(root, output_text, text, start_index))
         speech_thread.daemon = True
         speech_thread.start()
 
 
-def speak_offline(root, text, tts_var):
+def speak_offline(root, text, tts_var, start_index=0):
     """Handle offline TTS speech in a separate thread"""
     global is_speaking, stop_speaking, tts_engine
     
     with speech_lock:  # Use lock to prevent concurrent speech
         try:
-            # Create a new engine for this speech task if needed
+            # The worker process owns the engine; it is only started once
             if not tts_engine:
-                tts_engine = initialize_engine()
+                initialize_engine(root)
                 
             if not tts_engine:
                 messagebox.showerror("Error", "Failed to initialize speech engine.")
@@ -372,43 +427,29 @@ def speak_offline(root, text, tts_var):
                 root.after(0, lambda: select_voice(root, tts_var))
                 return
             
-            # Set the voice if we have one
-            if voice_id:
-                try:
-                    tts_engine.setProperty('voice', voice_id)
-                except Exception as e:
-                    print(f"Warning: Could not set voice: {e}")
-                    # Try to recreate the engine
-                    try:
-                        del tts_engine
-                        tts_engine = initialize_engine()
-                        if tts_engine:
-                            tts_engine.setProperty('voice', voice_id)
-                    except Exception as e2:
-                        print(f"Error recreating engine: {e2}")
-            
             # Add a check for stop_speaking before proceeding
             if stop_speaking:
                 is_speaking = False
                 update_speech_status(root, "Status: Ready")
                 return
                 
-            # Set a moderate rate
-            tts_engine.setProperty('rate', 190)
-            
-            # Speak the text
-            tts_engine.say(text)
+            # Use a moderate rate (sent with each render, along with the voice)
+            rate = 190
             
-            # Update UI before runAndWait - IMPORTANT!
-            root.after(0, lambda: update_speech_status(root, "Status: Speaking..."))
+            # Render the text chunk by chunk into the audio cache and play each chunk,
+            # so replays and partially edited posts reuse the audio that didn't change
+            # Update UI once the first chunk starts playing
+            def on_first_audio():
+                root.after(0, lambda: update_speech_status(root, "Status: Speaking..."))
             
-            # Run the speech - this blocks until speech is done
-            tts_engine.runAndWait()
+            # The worker renders one chunk at a time, so keep a single synthesis thread
+            synthesize = make_pyttsx3_synthesizer(tts_engine, voice_id, rate)
+            speak_from_index(text, start_index, synthesize, workers=1, lookahead=2,
+                             on_first_audio=on_first_audio)
             
             # Update UI after speech is done
             root.after(0, lambda: update_speech_status(root, "Status: Speech completed"))
             
-            # No need to delete the engine, we'll reuse it
             print("Speech completed successfully")
             
             # Make sure we don't exit the application
@@ -454,55 +495,308 @@ def finish_speech():
     print("Speech flags reset")
 
 
-def speak_online(root, output_text, text):
-    """Handle online TTS using Google's service"""
-    global is_speaking, stop_speaking
+def split_into_sentence_groups(text, max_chars=ONLINE_CHUNK_CHARS, first_chars=ONLINE_FIRST_CHUNK_CHARS):
+    """Split text into groups of whole sentences, each at most max_chars long (first_chars for the first)
+    
+    Groups never cross a line break, so editing one paragraph leaves the chunks
+    of every other paragraph (and their cached audio) unchanged.
+    """
+    groups = []
+    for paragraph in text.split('\n'):
+        sentences = [s.strip() for s in re.split(r'(?<=[.!?])\s+', paragraph) if s.strip()]
+        
+        current = ""
+        for sentence in sentences:
+            # Break up sentences that are too long on their own at word boundaries
+            while len(sentence) > max_chars:
+                cut = sentence.rfind(' ', 0, max_chars)
+                if cut <= 0:
+                    cut = max_chars
+                if current:
+                    groups.append(current)
+                    current = ""
+                groups.append(sentence[:cut].strip())
+                sentence = sentence[cut:].strip()
+            
+            limit = first_chars if not groups else max_chars
+            if current and len(current) + 1 + len(sentence) > limit:
+                groups.append(current)
+                current = sentence
+            else:
+                current = f"{current} {sentence}" if current else sentence
+        
+        if current:
+            groups.append(current)
+    return groups
+
+def gtts_synthesize(text):
+    """Synthesize one chunk of text to MP3 bytes in memory with Google TTS"""
+    buffer = BytesIO()
+    gTTS(text=text, lang='en', slow=False).write_to_fp(buffer)
+    return buffer.getvalue()
+
+def cached_gtts_synthesize(text):
+    """Synthesize one chunk with Google TTS, reusing cached audio for unchanged chunks"""
+    return synthesize_cached_bytes(text, 'gtts', gtts_synthesize, lang='en')
+
+def make_pyttsx3_synthesizer(worker, voice_id, rate):
+    """Return a synthesize(text) function that renders with the TTS worker, through the audio cache
+    
+    pyttsx3 can only render to a file, so this returns the path of the cached file.
+    """
+    def render(text, path):
+        return worker.render_to_file(text, path, voice_id=voice_id, rate=rate)
+    
+    def synthesize(text):
+        return synthesize_cached(text, 'pyttsx3', render, voice_id=voice_id, rate=rate)
+    
+    return synthesize
+
+def ensure_mixer():
+    """Initialize the pygame mixer once and keep it open between utterances"""
+    if not pygame.mixer.get_init():
+        pygame.mixer.init()
+
+def interrupt_playback():
+    """Wake the thread waiting for a clip to end so it can check whether to stop"""
+    playback_interrupt.set()
+
+def play_audio(source, should_stop=None):
+    """Play audio from a file path or in-memory bytes, blocking until it ends or speech is stopped
+    
+    Instead of polling the mixer, this waits on playback_interrupt for the
+    length of the clip, so it uses no CPU while playing and wakes immediately
+    on Stop or Skip.
+    """
+    if should_stop is None:
+        should_stop = lambda: stop_speaking
+    
+    ensure_mixer()
+    if isinstance(source, (bytes, bytearray)):
+        source = BytesIO(source)
+    sound = pygame.mixer.Sound(file=source)
+    
+    # Clear before checking the flags so a stop that lands in between still wakes us
+    playback_interrupt.clear()
+    if should_stop():
+        return
+    
+    channel = sound.play()
+    if channel is None:
+        return
+    end_time = time.perf_counter() + sound.get_length()
+    
+    while True:
+        remaining = end_time - time.perf_counter()
+        if remaining <= 0:
+            break
+        if playback_interrupt.wait(remaining):
+            playback_interrupt.clear()
+            if should_stop():
+                channel.stop()
+                break
+
+def build_speech_index(text, max_chars=ONLINE_CHUNK_CHARS, first_chars=ONLINE_FIRST_CHUNK_CHARS):
+    """Split a post into units to speak one at a time: each heading, then sentence groups
+    
+    Each unit is a dict with its 'text', the 'heading' title if the unit is a
+    heading, and the 'section' heading it falls under.
+    """
+    units = []
+    section = None
+    for line in text.split('\n'):
+        match = re.match(r'^\s*#{1,6}\s+(.*?)[\s#]*$', line)
+        if match and match.group(1):
+            section = match.group(1)
+            units.append({'text': section, 'heading': section, 'section': section})
+            continue
+        
+        # Only the very first unit is kept short so audio starts sooner
+        limit = first_chars if not units else max_chars
+        for group in split_into_sentence_groups(line, max_chars, limit):
+            units.append({'text': group, 'heading': None, 'section': section})
+    return units
+
+def text_fingerprint(text):
+    """Identify a post so a saved position is only reused for the same text"""
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+def remember_position(text, index):
+    """Record the unit about to be spoken"""
+    speech_position['text'] = text_fingerprint(text)
+    speech_position['index'] = index
+
+def save_speech_position():
+    """Persist the current position so Resume works after a restart"""
+    settings = load_settings()
+    settings['speech_position'] = dict(speech_position)
+    save_settings(settings)
+
+def get_resume_index(text):
+    """Return the unit to resume this post from, or 0 if it wasn't stopped part way"""
+    position = speech_position
+    if position['text'] is None:
+        position = load_settings().get('speech_position') or {}
+    if position.get('text') == text_fingerprint(text):
+        return position.get('index', 0)
+    return 0
+
+def speak_from_index(text, start_index, synthesize, play=None, **options):
+    """Speak a post unit by unit from start_index, tracking the position for Resume"""
+    units = build_speech_index(text)
+    start_index = max(0, min(start_index, len(units)))
+    chunks = [unit['text'] for unit in units[start_index:]]
+    
+    def on_chunk(i):
+        remember_position(text, start_index + i)
+    
+    try:
+        metrics = speak_pipelined(chunks, synthesize, play or play_audio, on_chunk=on_chunk, **options)
+        # Finished the whole post, so the next Resume starts from the top
+        if metrics['chunks_played'] == len(chunks) and not stop_speaking:
+            remember_position(text, 0)
+        return metrics
+    finally:
+        save_speech_position()
+
+def speak_from_heading(root, output_text, tts_var):
+    """Open a list of the post's headings and start speaking from the chosen one"""
+    text = output_text.get(1.0, tk.END).strip()
+    headings = [(i, unit['heading']) for i, unit in enumerate(build_speech_index(text)) if unit['heading']]
+    if not headings:
+        messagebox.showinfo("Headings", "This post has no headings.")
+        return
+    
+    heading_window = tk.Toplevel(root)
+    heading_window.title("Go to Heading")
+    heading_window.geometry("400x300")
+    heading_window.transient(root)
+    
+    listbox = tk.Listbox(heading_window)
+    listbox.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+    for _, heading in headings:
+        listbox.insert(tk.END, heading)
+    listbox.selection_set(0)
+    
+    def speak_selected(event=None):
+        selection = listbox.curselection()
+        if not selection:
+            return
+        heading_window.destroy()
+        start_index = headings[selection[0]][0]
+        previous = speech_thread
+        stop_text_to_speech()
+
+        def start_when_stopped():
+            # Wait off the Tk thread for the old speech thread to exit, so two never play at once
+            if previous and previous.is_alive():
+                previous.join()
+            root.after(0, lambda: speak_text(root, output_text, tts_var, start_index=start_index))
+
+        threading.Thread(target=start_when_stopped, daemon=True).start()
+    
+    listbox.bind("<Double-Button-1>", speak_selected)
+    ttk.Button(heading_window, text="Speak From Here", command=speak_selected).pack(pady=(0, 10))
+
+def speak_pipelined(chunks, synthesize, play, workers=ONLINE_TTS_WORKERS,
+                    lookahead=ONLINE_TTS_LOOKAHEAD, should_stop=None, on_first_audio=None, on_chunk=None):
+    """Synthesize chunks on a worker pool and play them back in order as they become ready
+    
+    synthesize(text) returns audio for one chunk, as bytes or a file path, and
+    play(audio) plays it to completion, so either can be replaced with a local
+    stub for testing. on_chunk(i) is called before chunk i plays. Returns
+    timing metrics for the run.
+    """
+    if should_stop is None:
+        should_stop = lambda: stop_speaking
+    
+    start = time.perf_counter()
+    metrics = {
+        'chunks': len(chunks),
+        'chunks_played': 0,
+        'time_to_first_audio': None,
+        'gaps': [],
+        'total_seconds': 0.0,
+    }
+    
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tts-synth")
+    pending = deque()
+    next_index = 0
+    last_end = None
+    
+    def submit_next():
+        nonlocal next_index
+        pending.append(pool.submit(synthesize, chunks[next_index]))
+        next_index += 1
+    
+    try:
+        # Keep a bounded number of chunks synthesizing ahead of playback
+        while next_index < len(chunks) and len(pending) < lookahead:
+            submit_next()
+        
+        while pending and not should_stop():
+            future = pending.popleft()
+            if next_index < len(chunks):
+                submit_next()
+            
+            # Don't block Stop on a chunk that is still being synthesized
+            while not wait([future], timeout=STOP_CHECK_SECONDS).done:
+                if should_stop():
+                    break
+            if should_stop():
+                break
+            audio = future.result()
+            
+            now = time.perf_counter()
+            if last_end is None:
+                metrics['time_to_first_audio'] = now - start
+                if on_first_audio:
+                    on_first_audio()
+            else:
+                metrics['gaps'].append(now - last_end)
+            
+            if on_chunk:
+                on_chunk(metrics['chunks_played'])
+            play(audio)
+            last_end = time.perf_counter()
+            metrics['chunks_played'] += 1
+    finally:
+        # Drop anything not yet started; a chunk still synthesizing finishes into the cache on its own
+        for future in pending:
+            future.cancel()
+        pool.shutdown(wait=False)
+    
+    metrics['total_seconds'] = time.perf_counter() - start
+    if metrics['gaps']:
+        metrics['max_gap'] = max(metrics['gaps'])
+        metrics['mean_gap'] = sum(metrics['gaps']) / len(metrics['gaps'])
+    return metrics
+
+def speak_online(root, output_text, text, start_index=0):
+    """Handle online TTS using Google's service, playing sentence groups as they are synthesized"""
+    global is_speaking, stop_speaking, last_speech_metrics
     
     with speech_lock:  # Use lock to prevent concurrent speech
         try:
-            # Initialize pygame mixer if not already done
-            if not pygame.mixer.get_init():
-                pygame.mixer.init()
+            # The mixer stays initialized between utterances
+            ensure_mixer()
             
-            # Create a temp file for the speech
-            temp_dir = os.path.join(os.path.dirname(__file__), "temp")
-            os.makedirs(temp_dir, exist_ok=True)
-            temp_file = os.path.join(temp_dir, "temp_speech.mp3")
             
             # Show progress message (in main thread)
             root.after(0, lambda: update_ui(output_text, "\n\nGenerating speech... Please wait...\n", True))
             
-            # Use gTTS to generate speech
-            tts = gTTS(text=text, lang='en', slow=False)
-            tts.save(temp_file)
+            def on_first_audio():
+                # Update message (in main thread)
+                root.after(0, lambda: update_ui(output_text, "Playing speech... Press Stop to end playback.\n", False))
             
-            # Check if user stopped while generating
-            if stop_speaking:
-                try:
-                    os.remove(temp_file)
-                except:
-                    pass
-                is_speaking = False
-                update_speech_status(root, "Status: Ready")
-                return
-            
-            # Play the generated speech
-            pygame.mixer.music.load(temp_file)
-            pygame.mixer.music.play()
+            last_speech_metrics = speak_from_index(text, start_index, cached_gtts_synthesize,
+                                                   on_first_audio=on_first_audio)
             
-            # Update message (in main thread)
-            root.after(0, lambda: update_ui(output_text, "Playing speech... Press Stop to end playback.\n", False))
-            
-            # Wait for playback to finish or user to stop
-            while pygame.mixer.music.get_busy() and not stop_speaking:
-                pygame.time.Clock().tick(10)  # Limit CPU usage
-            
-            # Clean up
-            pygame.mixer.music.stop()
-            try:
-                os.remove(temp_file)
-            except:
-                pass
+            ttfa = last_speech_metrics['time_to_first_audio']
+            if ttfa is not None:
+                print(f"Online TTS: {last_speech_metrics['chunks_played']}/{last_speech_metrics['chunks']} chunks, "
+                      f"first audio after {ttfa:.2f}s, "
+                      f"max gap {last_speech_metrics.get('max_gap', 0.0):.2f}s")
             
             # Set status back to ready
             update_speech_status(root, "Status: Ready")
@@ -514,11 +808,6 @@ def speak_online(root, output_text, text):
         finally:
             is_speaking = False
             stop_speaking = False
-            # Try to clean up pygame mixer
-            try:
-                pygame.mixer.quit()
-            except:
-                pass
 
 def update_ui(output_text, message, append):
     """Update UI from background thread"""
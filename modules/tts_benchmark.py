@@ -0,0 +1,230 @@
+import os
+import sys
+import json
+import time
+import wave
+import shutil
+import tempfile
+import argparse
+import platform
+import itertools
+from io import BytesIO
+from datetime import datetime
+
+# Measure audio without playing it through the speakers
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame
+
+from modules.tts import split_into_sentence_groups, speak_pipelined, gtts_synthesize, ONLINE_TTS_WORKERS
+from modules.tts_worker import TTSWorker
+
+# Fixed corpora, by number of sentences, so runs are comparable over time
+CORPUS_SIZES = {
+    'short': 5,
+    'medium': 50,
+    'long': 300,
+}
+
+CORPUS_SENTENCES = [
+    "The quick brown fox jumps over the lazy dog.",
+    "Speech synthesis turns written posts into something you can listen to.",
+    "Each paragraph is split into short groups of sentences before it is spoken.",
+    "Latency matters most for the first chunk, because that is when the listener is waiting.",
+    "After that, each chunk only has to be ready before the previous one finishes playing.",
+]
+
+# Stub engine: fixed latency plus a per-character cost, producing silence at a typical speaking pace
+STUB_BASE_SECONDS = 0.05
+STUB_SECONDS_PER_CHAR = 0.0005
+STUB_CHARS_PER_SECOND = 15
+STUB_SAMPLE_RATE = 16000
+
+def make_corpus(num_sentences):
+    """Build a deterministic text of num_sentences sentences in paragraphs of five"""
+    sentences = [CORPUS_SENTENCES[i % len(CORPUS_SENTENCES)] for i in range(num_sentences)]
+    paragraphs = [' '.join(sentences[i:i + 5]) for i in range(0, len(sentences), 5)]
+    return '\n'.join(paragraphs)
+
+def stub_synthesize(text):
+    """Pretend to synthesize text, returning silent WAV bytes of a realistic length"""
+    time.sleep(STUB_BASE_SECONDS + STUB_SECONDS_PER_CHAR * len(text))
+    frames = int(STUB_SAMPLE_RATE * len(text) / STUB_CHARS_PER_SECOND)
+    buffer = BytesIO()
+    with wave.open(buffer, 'wb') as output:
+        output.setnchannels(1)
+        output.setsampwidth(2)
+        output.setframerate(STUB_SAMPLE_RATE)
+        output.writeframes(b'\0\0' * frames)
+    return buffer.getvalue()
+
+def audio_duration(source):
+    """Return the length in seconds of audio given as bytes or a file path"""
+    if not pygame.mixer.get_init():
+        pygame.mixer.init()
+    if isinstance(source, (bytes, bytearray)):
+        source = BytesIO(source)
+    return pygame.mixer.Sound(file=source).get_length()
+
+def benchmark_corpus(text, synthesize, workers):
+    """Synthesize a corpus through the speech pipeline and measure latency and real-time factor
+
+    Playback is replaced with a stub that only measures each chunk, so the
+    timings reflect synthesis rather than listening time.
+    """
+    chunks = split_into_sentence_groups(text)
+    durations = []
+
+    def play(audio):
+        durations.append(audio_duration(audio))
+
+    metrics = speak_pipelined(chunks, synthesize, play, workers=workers, should_stop=lambda: False)
+    audio_seconds = sum(durations)
+    return {
+        'chars': len(text),
+        'chunks': len(chunks),
+        'time_to_first_audio': metrics['time_to_first_audio'],
+        'synthesis_seconds': metrics['total_seconds'],
+        'audio_seconds': audio_seconds,
+        'real_time_factor': metrics['total_seconds'] / audio_seconds if audio_seconds else None,
+    }
+
+def run_corpora(synthesize, workers, sizes):
+    """Benchmark every corpus size with one synthesizer"""
+    return {name: benchmark_corpus(make_corpus(CORPUS_SIZES[name]), synthesize, workers) for name in sizes}
+
+def benchmark_stub(name, sizes, workers):
+    """Benchmark the stub engine in place of an unavailable one"""
+    return {
+        'engine': name,
+        'stub': True,
+        'init_seconds': 0.0,
+        'enumeration_seconds': 0.0,
+        'voices': 0,
+        'corpora': run_corpora(stub_synthesize, workers, sizes),
+    }
+
+def benchmark_pyttsx3(sizes, timeout=30):
+    """Benchmark the offline engine through a fresh TTS worker process"""
+    worker = TTSWorker()
+    temp_dir = tempfile.mkdtemp(prefix="tts_benchmark_")
+    try:
+        # Fail fast if the engine can't start instead of waiting for the timeout
+        errors = []
+        worker.add_listener(lambda event: errors.append(event['error']) if event['type'] == 'error' else None)
+
+        # Init time covers spawning the worker process and starting its engine
+        start = time.perf_counter()
+        worker.start()
+        while not worker.ready.wait(0.05):
+            if errors:
+                raise RuntimeError(errors[0])
+            if time.perf_counter() - start > timeout:
+                raise RuntimeError("TTS worker did not start")
+        init_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        voices = worker.list_voices(timeout)
+        enumeration_seconds = time.perf_counter() - start
+
+        # Render to fresh files so the audio cache doesn't hide the engine's speed
+        counter = itertools.count()
+        extension = '.aiff' if sys.platform == 'darwin' else '.wav'
+
+        def synthesize(text):
+            path = os.path.join(temp_dir, f"chunk_{next(counter)}{extension}")
+            return worker.render_to_file(text, path, timeout=timeout)
+
+        return {
+            'engine': 'pyttsx3',
+            'stub': False,
+            'init_seconds': init_seconds,
+            'enumeration_seconds': enumeration_seconds,
+            'voices': len(voices),
+            'corpora': run_corpora(synthesize, 1, sizes),
+        }
+    finally:
+        worker.shutdown()
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+def benchmark_gtts(sizes):
+    """Benchmark the online engine, bypassing the audio cache"""
+    from gtts.lang import tts_langs
+
+    # gTTS has no engine to start; init is one short request, which also checks the connection
+    start = time.perf_counter()
+    gtts_synthesize("Hello.")
+    init_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    languages = tts_langs()
+    enumeration_seconds = time.perf_counter() - start
+
+    return {
+        'engine': 'gtts',
+        'stub': False,
+        'init_seconds': init_seconds,
+        'enumeration_seconds': enumeration_seconds,
+        'voices': len(languages),
+        'corpora': run_corpora(gtts_synthesize, ONLINE_TTS_WORKERS, sizes),
+    }
+
+def run_benchmarks(engines=('pyttsx3', 'gtts'), sizes=tuple(CORPUS_SIZES), use_stubs=False):
+    """Benchmark each engine, falling back to the stub engine if it isn't available"""
+    results = []
+    for engine in engines:
+        workers = 1 if engine == 'pyttsx3' else ONLINE_TTS_WORKERS
+        if use_stubs:
+            results.append(benchmark_stub(engine, sizes, workers))
+            continue
+        try:
+            if engine == 'pyttsx3':
+                results.append(benchmark_pyttsx3(sizes))
+            else:
+                results.append(benchmark_gtts(sizes))
+        except Exception as e:
+            print(f"Error benchmarking {engine}, using the stub engine instead: {str(e)}")
+            result = benchmark_stub(engine, sizes, workers)
+            result['error'] = str(e)
+            results.append(result)
+
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'platform': sys.platform,
+        'python': platform.python_version(),
+        'results': results,
+    }
+
+def print_results(report):
+    """Print a summary table of a benchmark report"""
+    for result in report['results']:
+        label = f"{result['engine']} (stub)" if result['stub'] else result['engine']
+        print(f"{label}: init {result['init_seconds'] * 1000:.0f} ms, "
+              f"{result['voices']} voices in {result['enumeration_seconds'] * 1000:.0f} ms")
+        for name, corpus in result['corpora'].items():
+            ttfa = corpus['time_to_first_audio'] or 0.0
+            rtf = corpus['real_time_factor'] or 0.0
+            print(f"  {name:<8} {corpus['chars']:6d} chars  {corpus['chunks']:4d} chunks  "
+                  f"first audio {ttfa * 1000:7.1f} ms  RTF {rtf:.3f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark text-to-speech latency and throughput")
+    parser.add_argument('--engines', nargs='+', choices=['pyttsx3', 'gtts'], default=['pyttsx3', 'gtts'],
+                        help="Engines to benchmark")
+    parser.add_argument('--sizes', nargs='+', choices=list(CORPUS_SIZES), default=list(CORPUS_SIZES),
+                        help="Corpus sizes to run")
+    parser.add_argument('--stub', action='store_true', help="Use the stub engine instead of the real ones")
+    parser.add_argument('-o', '--output', help="Write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.engines, args.sizes, args.stub)
+    print_results(report)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=4)
+        print(f"Results written to {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
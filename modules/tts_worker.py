@@ -0,0 +1,300 @@
+import os
+import time
+import queue
+import itertools
+import threading
+import multiprocessing
+
+# Commands understood by the worker process:
+#   speak        {'text', 'voice_id', 'rate', 'tag'}  queue an utterance
+#   render       {'text', 'path', 'voice_id', 'rate'} render an utterance to an audio file
+#   set_voice    {'voice_id'}
+#   set_rate     {'rate'}
+#   list_voices  {}                                   reply with the installed voices
+#   stop         {}                                   stop speaking and drop queued utterances
+#   skip         {}                                   stop the current utterance only
+#   shutdown     {}
+#
+# Events sent back: ready, started, finished, stopped, rendered, voices, error
+#
+# Commands that wait for a reply always get one, an error if they were dropped
+REPLY_COMMANDS = ('render', 'list_voices')
+
+def answer_queued_commands(command_queue, event_queue, error):
+    """Answer every command still queued with an error, so no caller waits out its timeout"""
+    while True:
+        try:
+            command = command_queue.get(timeout=0.1)
+        except queue.Empty:
+            return
+        if command.get('id') is not None:
+            event_queue.put({'type': 'error', 'id': command['id'], 'error': error})
+
+def worker_main(command_queue, event_queue):
+    """Entry point of the TTS subprocess: own one pyttsx3 engine and run commands from the queue"""
+    start = time.perf_counter()
+    try:
+        import pyttsx3
+        engine = pyttsx3.init()
+    except Exception as e:
+        error = f"Error initializing TTS engine: {e}"
+        event_queue.put({'type': 'error', 'error': error})
+        answer_queued_commands(command_queue, event_queue, error)
+        return
+    event_queue.put({'type': 'ready', 'seconds': time.perf_counter() - start})
+
+    # Stop and skip have to work while runAndWait() is blocking, so a reader thread
+    # handles them immediately and queues everything else for the main loop
+    work = queue.Queue()
+    interrupt = threading.Event()
+    state = {'stopping': False}
+
+    def on_word(name, location, length):
+        # pyttsx3 only allows stopping from inside its own callbacks
+        if interrupt.is_set():
+            engine.stop()
+
+    engine.connect('started-word', on_word)
+
+    def read_commands():
+        while True:
+            command = command_queue.get()
+            kind = command.get('type')
+            if kind == 'stop':
+                # Drop everything queued so far; the main loop resets the flag
+                state['stopping'] = True
+                while True:
+                    try:
+                        dropped = work.get_nowait()
+                    except queue.Empty:
+                        break
+                    if dropped.get('type') in REPLY_COMMANDS:
+                        event_queue.put({'type': 'error', 'id': dropped.get('id'), 'error': "stopped"})
+                interrupt.set()
+                work.put({'type': 'stopped'})
+            elif kind == 'skip':
+                interrupt.set()
+            else:
+                work.put(command)
+                if kind == 'shutdown':
+                    return
+
+    threading.Thread(target=read_commands, daemon=True).start()
+
+    def apply_overrides(command):
+        if command.get('voice_id'):
+            engine.setProperty('voice', command['voice_id'])
+        if command.get('rate'):
+            engine.setProperty('rate', command['rate'])
+
+    while True:
+        command = work.get()
+        kind = command.get('type')
+        try:
+            if kind == 'shutdown':
+                break
+            elif kind == 'stopped':
+                state['stopping'] = False
+                interrupt.clear()
+                event_queue.put({'type': 'stopped'})
+            elif state['stopping']:
+                if kind in REPLY_COMMANDS:
+                    event_queue.put({'type': 'error', 'id': command.get('id'), 'error': "stopped"})
+            elif kind == 'speak':
+                interrupt.clear()
+                apply_overrides(command)
+                event_queue.put({'type': 'started', 'id': command.get('id'), 'tag': command.get('tag')})
+                engine.say(command['text'])
+                engine.runAndWait()
+                skipped = interrupt.is_set()
+                interrupt.clear()
+                event_queue.put({'type': 'finished', 'id': command.get('id'),
+                                 'tag': command.get('tag'), 'skipped': skipped})
+            elif kind == 'render':
+                # A stop or skip meant for earlier speech mustn't cut this render short
+                interrupt.clear()
+                apply_overrides(command)
+                engine.save_to_file(command['text'], command['path'])
+                engine.runAndWait()
+                if interrupt.is_set():
+                    # Stopped partway: don't hand back a truncated file to be cached
+                    try:
+                        os.remove(command['path'])
+                    except OSError:
+                        pass
+                    event_queue.put({'type': 'error', 'id': command.get('id'), 'error': "stopped"})
+                else:
+                    event_queue.put({'type': 'rendered', 'id': command.get('id'), 'path': command['path']})
+            elif kind == 'set_voice':
+                engine.setProperty('voice', command['voice_id'])
+            elif kind == 'set_rate':
+                engine.setProperty('rate', command['rate'])
+            elif kind == 'list_voices':
+                voices = [
+                    {'index': i, 'id': v.id, 'name': v.name, 'languages': [str(l) for l in (v.languages or [])]}
+                    for i, v in enumerate(engine.getProperty('voices'))
+                ]
+                event_queue.put({'type': 'voices', 'id': command.get('id'), 'voices': voices})
+        except Exception as e:
+            event_queue.put({'type': 'error', 'id': command.get('id'), 'error': str(e)})
+
+class TTSWorker:
+    """Client for the long-lived TTS subprocess
+
+    Commands are fire-and-forget except render_to_file and list_voices, which
+    wait for the reply and so must not be called from the Tk thread. Status
+    events are passed to listeners on a background thread.
+    """
+
+    def __init__(self):
+        self.process = None
+        self.command_queue = None
+        self.event_queue = None
+        self.listeners = []
+        self.replies = {}
+        self.replies_lock = threading.Lock()
+        self.ids = itertools.count(1)
+        self.ready = threading.Event()
+
+    def start(self):
+        """Start the worker process and the thread that reads its events"""
+        if self.is_alive():
+            return
+        # Spawn so the child doesn't inherit Tk or audio state from the parent
+        context = multiprocessing.get_context('spawn')
+        self.command_queue = context.Queue()
+        self.event_queue = context.Queue()
+        self.ready.clear()
+        self.process = context.Process(target=worker_main, args=(self.command_queue, self.event_queue),
+                                       name="tts-worker", daemon=True)
+        self.process.start()
+        threading.Thread(target=self.read_events, args=(self.event_queue,), daemon=True).start()
+
+    def is_alive(self):
+        return self.process is not None and self.process.is_alive()
+
+    def read_events(self, event_queue):
+        """Dispatch events from the worker to waiting callers and listeners"""
+        while True:
+            try:
+                event = event_queue.get()
+            except (EOFError, OSError):
+                return
+            if event.get('type') == 'ready':
+                print(f"TTS worker ready in {event['seconds']:.2f}s")
+                self.ready.set()
+
+            # Wake up a caller waiting for this reply
+            with self.replies_lock:
+                waiter = self.replies.pop(event.get('id'), None)
+            if waiter:
+                waiter['event'] = event
+                waiter['done'].set()
+
+            for listener in list(self.listeners):
+                try:
+                    listener(event)
+                except Exception as e:
+                    print(f"Error in TTS event listener: {e}")
+
+    def add_listener(self, callback):
+        """Register callback(event) for status events (called on a background thread)"""
+        if callback not in self.listeners:
+            self.listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self.listeners:
+            self.listeners.remove(callback)
+
+    def send(self, kind, **fields):
+        """Send a command to the worker and return its id"""
+        self.start()
+        command_id = next(self.ids)
+        self.command_queue.put(dict(fields, type=kind, id=command_id))
+        return command_id
+
+    def request(self, kind, timeout=None, **fields):
+        """Send a command and wait for its reply event"""
+        self.start()
+        command_id = next(self.ids)
+        waiter = {'done': threading.Event(), 'event': None}
+        with self.replies_lock:
+            self.replies[command_id] = waiter
+        self.command_queue.put(dict(fields, type=kind, id=command_id))
+
+        if not waiter['done'].wait(timeout):
+            with self.replies_lock:
+                self.replies.pop(command_id, None)
+            raise TimeoutError(f"TTS worker did not answer '{kind}' in time")
+
+        event = waiter['event']
+        if event.get('type') == 'error':
+            raise RuntimeError(event.get('error'))
+        return event
+
+    def speak(self, text, voice_id=None, rate=None, tag=None):
+        return self.send('speak', text=text, voice_id=voice_id, rate=rate, tag=tag)
+
+    def stop(self):
+        if self.is_alive():
+            self.command_queue.put({'type': 'stop'})
+
+    def skip(self):
+        if self.is_alive():
+            self.command_queue.put({'type': 'skip'})
+
+    def set_voice(self, voice_id):
+        self.send('set_voice', voice_id=voice_id)
+
+    def set_rate(self, rate):
+        self.send('set_rate', rate=rate)
+
+    def setProperty(self, name, value):
+        """pyttsx3-style setter kept for callers written against the engine API"""
+        if name == 'voice':
+            self.set_voice(value)
+        elif name == 'rate':
+            self.set_rate(value)
+
+    def render_to_file(self, text, path, voice_id=None, rate=None, timeout=120):
+        """Render text to an audio file and wait until it is written"""
+        self.request('render', timeout=timeout, text=text, path=path, voice_id=voice_id, rate=rate)
+        return path
+
+    def list_voices(self, timeout=30):
+        """Return the installed voices as dicts with index, id, name and languages"""
+        return self.request('list_voices', timeout=timeout)['voices']
+
+    def shutdown(self, timeout=2):
+        """Stop the worker process"""
+        if not self.is_alive():
+            return
+        try:
+            self.command_queue.put({'type': 'stop'})
+            self.command_queue.put({'type': 'shutdown'})
+            self.process.join(timeout)
+        finally:
+            if self.process.is_alive():
+                self.process.terminate()
+            self.process = None
+
+# Shared worker, started on first use
+_tts_worker = None
+_tts_worker_lock = threading.Lock()
+
+def get_tts_worker():
+    """Return the shared TTS worker, starting the subprocess if needed"""
+    global _tts_worker
+    with _tts_worker_lock:
+        if _tts_worker is None:
+            _tts_worker = TTSWorker()
+        _tts_worker.start()
+        return _tts_worker
+
+def shutdown_tts_worker():
+    """Stop the shared TTS worker if it is running"""
+    global _tts_worker
+    with _tts_worker_lock:
+        if _tts_worker is not None:
+            _tts_worker.shutdown()
+            _tts_worker = None
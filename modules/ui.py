@@ -1,4 +1,10 @@
 import os
+import time
+import shutil
+import itertools
+import sqlite3
+import tempfile
+from datetime import datetime
 import tkinter as tk
 from tkinter import filedialog, scrolledtext, ttk, messagebox
 import threading
@@ -7,21 +13,35 @@ import openai
 # Fix the import statement
 from modules.settings import (
     load_settings, save_settings, load_prompt, 
-    PREFERRED_VOICE_IDS, DEFAULT_MODEL, DEFAULT_TEMPERATURE, DEFAULT_MAX_TOKENS
+    PREFERRED_VOICE_IDS, DEFAULT_MODEL, DEFAULT_TEMPERATURE, DEFAULT_MAX_TOKENS,
+    OUTPUT_DIR, EXPORT_FORMATS, EXPORT_MODES, DEFAULT_EXPORT_FORMAT, DEFAULT_EXPORT_MODE,
+    JOBS_DIR, ARCHIVE_DIR
 )
 
 # Update the imports at the top of the file
 from modules.tts import (
-    speak_text, stop_text_to_speech, test_voices, select_voice, initialize_engine
+    speak_text, stop_text_to_speech, test_voices, select_voice,
+    prerender_voice_samples, speak_from_heading
 )
+from modules.tts_worker import shutdown_tts_worker
 
 
 from modules.openai_api import (
-    get_api_key, set_new_api_key, generate_blog_post
+    get_api_key, set_new_api_key, CANCELLED_MESSAGE
 )
 
 from modules.openai_api import detect_key_type, using_openrouter
 
+from modules.export import export_pending, pending_export_count, shutdown_exports
+from modules.anthology import build_anthology
+from modules.ui_bus import UIBus
+from modules.batch import find_transcripts, run_batch, generate_single
+from modules.cancel import CancelToken
+from modules.journal import JobJournal
+from modules.catalog import search_posts, get_post
+from modules.post_archive import read_index, read_member
+from modules.batch_progress import format_progress
+
 # Available OpenAI models
 AVAILABLE_MODELS = [
     "gpt-4",
@@ -96,13 +116,35 @@ The model may not use all available tokens if it completes the post earlier.
 # Global variables for UI components
 output_text = None
 progress_bar = None
+progress_label = None
 select_button = None
+cancel_button = None
 api_status = None
 tts_engine = None  # Add this global variable
 
+# Results browser: one row per generated post, whose content stays on disk until it is selected
+results_tree = None
+results_items = {}  # Treeview item id -> {'name', 'path', 'status'} (catalog search hits have a 'post_id' instead of a path,
+                    # posts opened from an archive have an 'archive' and 'member')
+search_row = None  # Treeview item holding the latest catalog search hits
+archive_rows = {}  # Archive path -> Treeview item listing its posts
+results_dir = None
+results_counter = itertools.count()
+VIEWER_CHUNK_CHARS = 20000  # Large posts are inserted into the viewer this many characters at a time
+CLOSE_WAIT_SECONDS = 5  # How long closing waits for cancelled jobs to stop
+viewer_generation = 0  # Bumped on every new selection so older chunked inserts stop
+
+# Worker threads post UI updates here; the Tk main loop applies them
+ui_bus = None
+
+# Running generation jobs (cancel token -> worker thread), so they can be cancelled from the UI or on close.
+# A single file can be started while a folder is running; the scheduler runs it first
+running_jobs = {}
+close_when_done = None  # Set to the root window when closing waits for the jobs to finish
+
 def create_ui(root):
     """Create the complete UI for the application"""
-    global output_text, progress_bar, select_button, api_status, tts_engine
+    global output_text, progress_bar, progress_label, select_button, cancel_button, api_status, tts_engine, results_tree, ui_bus
     
     # Get saved settings
     settings = load_settings()
@@ -297,22 +339,79 @@ def create_ui(root):
     # Select button
     select_button = ttk.Button(selection_frame, text="Select", 
                               command=lambda: process_selection(root, selection_var, model_var, temp_scale, token_scale))
-    select_button.pack(side=tk.LEFT, padx=20)
+    select_button.pack(side=tk.LEFT, padx=(20, 5))
+    
+    # Cancel button (enabled while a job is running)
+    cancel_button = ttk.Button(selection_frame, text="Cancel", state=tk.DISABLED, command=cancel_current_job)
+    cancel_button.pack(side=tk.LEFT, padx=(0, 20))
+    
+    # Export options (format and whether to export in the background or on request)
+    export_format_var = tk.StringVar(value=settings.get('export_format', DEFAULT_EXPORT_FORMAT))
+    export_mode_var = tk.StringVar(value=settings.get('export_mode', DEFAULT_EXPORT_MODE))
+    
+    ttk.Label(selection_frame, text="Export:").pack(side=tk.LEFT, padx=(10, 5))
+    
+    export_format_dropdown = ttk.Combobox(selection_frame, textvariable=export_format_var,
+                                          values=EXPORT_FORMATS, state="readonly", width=9)
+    export_format_dropdown.pack(side=tk.LEFT, padx=2)
+    
+    export_mode_dropdown = ttk.Combobox(selection_frame, textvariable=export_mode_var,
+                                        values=EXPORT_MODES, state="readonly", width=11)
+    export_mode_dropdown.pack(side=tk.LEFT, padx=2)
+    
+    export_format_dropdown.bind("<<ComboboxSelected>>",
+                                lambda e: save_export_settings(export_format_var, export_mode_var))
+    export_mode_dropdown.bind("<<ComboboxSelected>>",
+                              lambda e: save_export_settings(export_format_var, export_mode_var))
+    
+    export_now_button = ttk.Button(selection_frame, text="Export Pending",
+                                   command=lambda: export_pending_posts(root))
+    export_now_button.pack(side=tk.LEFT, padx=5)
     
     # --- PROGRESS BAR SECTION ---
     progress_frame = ttk.Frame(root, padding=(10, 0))
     progress_frame.pack(fill=tk.X)
+    progress_frame.columnconfigure(0, weight=1)
     
-    # Progress bar (initially hidden)
+    # Progress bar and batch status line (initially hidden)
     progress_bar = ttk.Progressbar(progress_frame, mode="indeterminate")
+    progress_label = ttk.Label(progress_frame, text="")
     
     # --- OUTPUT AREA SECTION ---
     output_frame = ttk.Frame(root, padding=5)
     output_frame.pack(padx=10, pady=10, fill=tk.BOTH, expand=True)
     
+    # Results list on the left, viewer for the selected post on the right
+    output_panes = ttk.PanedWindow(output_frame, orient=tk.HORIZONTAL)
+    output_panes.pack(fill=tk.BOTH, expand=True)
+    
+    results_frame = ttk.Frame(output_panes)
+    
+    # Full-text search of every post generated so far; hits are listed at the top of the results
+    search_frame = ttk.Frame(results_frame)
+    search_frame.pack(side=tk.TOP, fill=tk.X, pady=(0, 5))
+    search_var = tk.StringVar()
+    search_entry = ttk.Entry(search_frame, textvariable=search_var)
+    search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
+    search_entry.bind("<Return>", lambda event: search_catalog(search_var.get()))
+    ttk.Button(search_frame, text="Search", command=lambda: search_catalog(search_var.get())).pack(side=tk.LEFT, padx=(5, 0))
+    ttk.Button(search_frame, text="Open Archive", command=open_archive_dialog).pack(side=tk.LEFT, padx=(5, 0))
+    
+    results_tree = ttk.Treeview(results_frame, columns=("status",), selectmode="browse")
+    results_tree.heading("#0", text="Post")
+    results_tree.heading("status", text="Status")
+    results_tree.column("#0", width=180)
+    results_tree.column("status", width=70, stretch=False)
+    results_scrollbar = ttk.Scrollbar(results_frame, command=results_tree.yview)
+    results_tree.config(yscrollcommand=results_scrollbar.set)
+    results_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+    results_tree.pack(fill=tk.BOTH, expand=True)
+    results_tree.bind("<<TreeviewSelect>>", lambda event: show_selected_result(root))
+    output_panes.add(results_frame, weight=1)
+    
     # Output text area
-    output_text = scrolledtext.ScrolledText(output_frame, wrap=tk.WORD, width=100, height=20)  # Changed height from 30 to 20
-    output_text.pack(fill=tk.BOTH, expand=True)
+    output_text = scrolledtext.ScrolledText(output_panes, wrap=tk.WORD, width=100, height=20)  # Changed height from 30 to 20
+    output_panes.add(output_text, weight=4)
     
     # --- BOTTOM BUTTONS SECTION ---
     button_frame = ttk.Frame(output_frame, padding=(0, 5, 0, 0))
@@ -341,11 +440,26 @@ def create_ui(root):
                              command=lambda: simple_speak_text(root, output_text, tts_var))
     speak_button.pack(side=tk.LEFT, padx=10)
     
+    # Resume from where speech was last stopped
+    resume_button = ttk.Button(button_frame, text="Resume",
+                               command=lambda: speak_text(root, output_text, tts_var, resume=True))
+    resume_button.pack(side=tk.LEFT)
+    
+    # Start speaking from a chosen heading
+    heading_button = ttk.Button(button_frame, text="Go to Heading",
+                                command=lambda: speak_from_heading(root, output_text, tts_var))
+    heading_button.pack(side=tk.LEFT, padx=10)
+    
     # Copy button
     copy_button = ttk.Button(button_frame, text="Copy to Clipboard", 
                             command=lambda: copy_to_clipboard(root, output_text))
     copy_button.pack(side=tk.RIGHT)
     
+    # Anthology button (merge a folder of posts into one document)
+    anthology_button = ttk.Button(button_frame, text="Build Anthology",
+                                  command=lambda: build_anthology_dialog(root))
+    anthology_button.pack(side=tk.RIGHT, padx=5)
+    
     # Stop button with error handling
     stop_button = ttk.Button(button_frame, text="Stop", 
                             command=lambda: safe_stop_speech())
@@ -411,6 +525,17 @@ def create_ui(root):
 
     # Initialize UI indicators at startup
     update_ui_after_key_change(api_status)
+    
+    # Finish background exports before the window closes
+    root.protocol("WM_DELETE_WINDOW", lambda: on_closing(root))
+    
+    # Apply updates posted by worker threads on a fixed cadence
+    ui_bus = UIBus(root)
+    subscribe_ui_events()
+    ui_bus.start()
+    
+    # Render the preferred voice samples once the window is up, so previews start instantly
+    root.after(1000, lambda: prerender_voice_samples(root))
 
     def select_input():
         """Handle input selection"""
@@ -440,25 +565,103 @@ def create_ui(root):
             print(f"Debug: Selected folder: {selected}")
             print(f"Debug: Saved to settings: {settings['last_folder']}")
 
+def on_closing(root):
+    """Wait for queued exports to finish, stop the TTS worker, then close the window
+    
+    If a job is running, the user chooses to let it finish first or to cancel it;
+    either way the posts it already generated are kept in its journal.
+    """
+    global close_when_done
+    if close_when_done is None and any(thread.is_alive() for thread in running_jobs.values()):
+        answer = messagebox.askyesnocancel(
+            "Job Running",
+            "Posts are still being generated.\n\n"
+            "Yes: finish the job, then close\n"
+            "No: cancel the job and close now\n\n"
+            f"Finished posts are saved in {JOBS_DIR}/."
+        )
+        if answer is None:
+            return
+        if answer:
+            close_when_done = root
+            ui_bus.post('status', message="Closing when the running jobs finish...\n")
+            return
+        for token in list(running_jobs):
+            token.cancel()
+        # Give the cancelled jobs a moment to wind down, without blocking the Tk thread
+        close_after_jobs(root, time.monotonic() + CLOSE_WAIT_SECONDS)
+        return
+    
+    finish_closing(root)
+
+def close_after_jobs(root, deadline):
+    """Poll until the cancelled jobs have stopped (or the deadline passes), then close"""
+    if time.monotonic() < deadline and any(thread.is_alive() for thread in running_jobs.values()):
+        root.after(100, lambda: close_after_jobs(root, deadline))
+        return
+    finish_closing(root)
+
+def finish_closing(root):
+    """Export any posts left in the lazy queue, shut the workers down and close the window"""
+    global close_when_done
+    # Posts queued in lazy mode would be lost with the window
+    pending = pending_export_count()
+    if pending:
+        answer = messagebox.askyesnocancel(
+            "Exports Pending",
+            f"{pending} posts are waiting to be exported.\n\n"
+            "Yes: export them, then close\n"
+            "No: close without exporting them"
+        )
+        if answer is None:
+            close_when_done = None
+            return
+        if answer:
+            export_pending()
+    
+    try:
+        shutdown_exports(wait=True)
+    except Exception as e:
+        print(f"Error shutting down exports: {e}")
+    try:
+        shutdown_tts_worker()
+    except Exception as e:
+        print(f"Error shutting down TTS worker: {e}")
+    if results_dir:
+        shutil.rmtree(results_dir, ignore_errors=True)
+    # No more UI events once the widgets are gone
+    ui_bus.stop()
+    root.destroy()
+
+def save_export_settings(export_format_var, export_mode_var):
+    """Save the export format and mode"""
+    settings = load_settings()
+    settings['export_format'] = export_format_var.get()
+    settings['export_mode'] = export_mode_var.get()
+    if not save_settings(settings):
+        messagebox.showwarning("Warning", "Failed to save export settings.")
+
+def export_pending_posts(root):
+    """Export the posts queued while in lazy export mode"""
+    count = pending_export_count()
+    if not count:
+        messagebox.showinfo("Export", "There are no posts waiting to be exported.")
+        return
+    
+    def run_export():
+        paths = export_pending()
+        ui_bus.post('info', title="Export", message=f"Exported {len(paths)} of {count} posts to {OUTPUT_DIR}/")
+    
+    threading.Thread(target=run_export, daemon=True).start()
+
 def manage_voice(root, tts_var):
     """Open the voice management dialog"""
     if tts_var.get() == "offline":
-        # Initialize a temporary engine for voice selection
-        temp_engine = initialize_engine()
-        if not temp_engine:
-            messagebox.showerror("Error", "Failed to initialize speech engine.")
-            return
-            
+        # select_voice uses the shared TTS worker, so no temporary engine is needed
         try:
-            # Use select_voice instead of select_voice_dialog
             select_voice(root, tts_var)
         except Exception as e:
             messagebox.showerror("Error", f"Failed to select voice: {str(e)}")
-        finally:
-            try:
-                del temp_engine
-            except:
-                pass
     else:
         messagebox.showinfo("Online TTS", "Voice selection is not available for online TTS.")
 
@@ -550,126 +753,322 @@ def process_selection(root, selection_var, model_var, temp_scale, token_scale):
         else:
             api_status.config(text="API Key: Set ✓")
     
-    # Start processing in a separate thread
-    threading.Thread(
-        target=lambda: process_in_background(root, selection_var, model_var, temp_scale, token_scale), 
-        daemon=True
-    ).start()
-
-def process_in_background(root, selection_var, model_var, temp_scale, token_scale):
-    """Background thread for processing files"""
-    # Enable the progress bar
-    progress_bar.grid(row=0, column=0, sticky="ew", padx=10, pady=5)
-    progress_bar.start(10)  # Start the indeterminate progress
+    # Dialogs and Tk variables belong to the main thread, so read them before starting the worker
+    mode = selection_var.get()
+    if mode == "file":
+        path = filedialog.askopenfilename(filetypes=[("Text files", "*.txt")])
+    else:
+        path = filedialog.askdirectory()
+    if not path:
+        return
     
-    # Disable the select button during processing
-    select_button.config(state=tk.DISABLED)
+    model = model_var.get()
+    temperature = float(temp_scale.get())
+    max_tokens = int(token_scale.get())
     
+    if mode == "folder" and not running_jobs:
+        # Clear the results of the previous run
+        clear_results()
+    
+    # Start processing in a separate thread, with a token the Cancel button can trip
+    token = CancelToken()
+    thread = threading.Thread(
+        target=lambda: process_in_background(mode, path, model, temperature, max_tokens, token),
+        daemon=True
+    )
+    running_jobs[token] = thread
+    set_busy(True)
+    thread.start()
+
+def cancel_current_job():
+    """Cancel the most recently started job; its requests in flight are aborted and its queued files dropped
+
+    Other jobs keep running (a single file picked during a folder run doesn't
+    take the folder run with it); pressing Cancel again cancels the next one.
+    """
+    active = [token for token in running_jobs if not token.cancelled]
+    if not active:
+        return
+    active[-1].cancel()
+    if len(active) == 1:
+        cancel_button.config(state=tk.DISABLED)
+    show_status("Cancelling...\n")
+
+def process_in_background(mode, path, model, temperature, max_tokens, cancel_token):
+    """Background thread for processing files; all UI changes go through the UI bus"""
     try:
-        if selection_var.get() == "file":
-            process_file(root, model_var, temp_scale, token_scale)
+        if mode == "file":
+            process_file(path, model, temperature, max_tokens, cancel_token)
         else:
-            process_folder(root, model_var, temp_scale, token_scale)
+            process_folder(path, model, temperature, max_tokens, cancel_token)
     finally:
-        # Hide the progress bar and re-enable the select button
-        progress_bar.stop()
-        progress_bar.grid_forget()
-        select_button.config(state=tk.NORMAL)
+        # Hide the progress bar once no other job is running
+        ui_bus.post('job_finished', token=cancel_token)
 
-def process_file(root, model_var, temp_scale, token_scale):
-    """Process a single text file"""
-    file_selected = filedialog.askopenfilename(filetypes=[("Text files", "*.txt")])
-    if not file_selected:
-        return
-    
-    # Clear the output text area
-    output_text.delete(1.0, tk.END)
-    
+def finish_job(token):
+    """Forget a finished job, and leave the busy state when it was the last one"""
+    running_jobs.pop(token, None)
+    if not running_jobs:
+        set_busy(False)
+
+def process_file(file_selected, model, temperature, max_tokens, cancel_token):
+    """Process a single text file as an interactive job, ahead of any running folder"""
     try:
-        with open(file_selected, "r", encoding="utf-8") as file:
-            transcript = file.read()
-        
         # Get the current prompt
         prompt = load_prompt()
         
         # Show a "Processing..." message
-        output_text.insert(tk.END, "Processing...\n\n")
-        root.update_idletasks()
-        
-        # Get model settings
-        model = model_var.get()
-        temperature = float(temp_scale.get())
-        max_tokens = int(token_scale.get())
-        
-        formatted_post = generate_blog_post(transcript, prompt, model, temperature, max_tokens)
+        ui_bus.post('status', message="Processing...\n\n")
         
-        # Clear the "Processing..." message
-        output_text.delete(1.0, tk.END)
+        formatted_post = generate_single(file_selected, prompt, model, temperature, max_tokens, cancel_token)
+        if formatted_post == CANCELLED_MESSAGE:
+            ui_bus.post('status', message="Cancelled.\n")
+            return
         
+        # Add the post to the results list and show it
         filename = os.path.basename(file_selected)
-        output_text.insert(tk.END, f"=== {filename} ===\n\n" + formatted_post + "\n\n")
+        add_result(filename, formatted_post, select=True)
     except Exception as e:
-        messagebox.showerror("Error", f"An error occurred: {str(e)}")
+        ui_bus.post('error', title="Error", message=f"An error occurred: {str(e)}")
 
-def process_folder(root, model_var, temp_scale, token_scale):
-    """Process all text files in a selected folder"""
-    folder_selected = filedialog.askdirectory()
-    if not folder_selected:
-        return
-    
-    # Clear the output text area
-    output_text.delete(1.0, tk.END)
-    
+def process_folder(folder_selected, model, temperature, max_tokens, cancel_token):
+    """Process all text files in a selected folder, journaling each post as it finishes"""
     try:
         # Get the current prompt
         prompt = load_prompt()
         
-        # Get model settings
-        model = model_var.get()
-        temperature = float(temp_scale.get())
-        max_tokens = int(token_scale.get())
-        
         # Show a "Processing..." message
-        output_text.insert(tk.END, "Processing files...\n\n")
-        root.update_idletasks()
+        ui_bus.post('status', message="Processing files...\n\n")
         
-        # Count how many files to process
-        txt_files = [f for f in os.listdir(folder_selected) if f.endswith(".txt")]
-        total_files = len(txt_files)
+        # Each post goes into the results list; only the selected one is loaded into the viewer.
+        # Progress snapshots are coalesced, so only the latest one is drawn.
+        # The folder (and its subfolders) is scanned while the first files are generated
+        txt_files = find_transcripts(folder_selected)
+        journal = JobJournal()
+        progress = run_batch(txt_files, prompt, model, temperature, max_tokens,
+                             on_result=add_result,
+                             on_progress=lambda snapshot: ui_bus.post('progress', snapshot=snapshot),
+                             cancel_token=cancel_token, journal=journal, root=folder_selected)
         
-        for i, filename in enumerate(txt_files):
-            # Update processing status
-            output_text.delete(1.0, tk.END)
-            output_text.insert(tk.END, f"Processing file {i+1} of {total_files}: {filename}...\n\n")
-            root.update_idletasks()
-            
-            filepath = os.path.join(folder_selected, filename)
-            with open(filepath, "r", encoding="utf-8") as file:
-                content = file.read()
-                
-            # Create a named string with the filename
-            class NamedString(str): pass
-            named_content = NamedString(content)
-            named_content.name = filename  # Use just the filename, not the full path
-            
-            formatted_post = generate_blog_post(named_content, prompt, model, temperature, max_tokens)
-            
-            # Clear and update the output area with all processed files
-            output_text.delete(1.0, tk.END)
-            for j, processed_file in enumerate(txt_files[:i+1]):
-                if j == i:  # This is the file we just processed
-                    output_text.insert(tk.END, f"=== {processed_file} ===\n\n" + formatted_post + "\n\n")
-                else:
-                    # Just indicate it was processed earlier
-                    output_text.insert(tk.END, f"=== {processed_file} === (Processed)\n\n")
-            
-            root.update_idletasks()
+        snapshot = progress.snapshot()
+        print(f"Debug: {format_progress(snapshot)}")
+        if cancel_token.cancelled:
+            ui_bus.post('status', message=f"Cancelled after {snapshot['done']} files. "
+                                          f"Finished posts are saved in {journal.directory}\n")
+        else:
+            ui_bus.post('status', message=f"Processed {snapshot['total']} files. Select a post in the list to view it.\n")
     except Exception as e:
-        messagebox.showerror("Error", f"An error occurred: {str(e)}")
+        ui_bus.post('error', title="Error", message=f"An error occurred: {str(e)}")
+
+def subscribe_ui_events():
+    """Register the handlers that apply worker events to the widgets on the Tk thread"""
+    ui_bus.subscribe('job_finished', finish_job)
+    ui_bus.subscribe('status', show_status, coalesce=True)
+    ui_bus.subscribe('progress', show_progress, coalesce=True)
+    ui_bus.subscribe('result', insert_result_row)
+    ui_bus.subscribe('info', lambda title, message: messagebox.showinfo(title, message))
+    ui_bus.subscribe('error', lambda title, message: messagebox.showerror(title, message))
+
+def set_busy(busy):
+    """Show the progress bar and enable the cancel button while jobs are running"""
+    if busy:
+        if not progress_bar.winfo_ismapped():
+            progress_bar.grid(row=0, column=0, sticky="ew", padx=10, pady=5)
+            progress_bar.start(10)  # Start the indeterminate progress
+        cancel_button.config(state=tk.NORMAL)
+    else:
+        progress_bar.stop()
+        progress_bar.config(mode="indeterminate", value=0)
+        progress_bar.grid_forget()
+        progress_label.grid_forget()
+        cancel_button.config(state=tk.DISABLED)
+        # Finish a close that was waiting for the jobs, once the UI bus is done with this drain
+        if close_when_done is not None:
+            close_when_done.after_idle(lambda: on_closing(close_when_done))
+
+def show_progress(snapshot):
+    """Switch the progress bar to determinate and show the batch counts, rate and ETA"""
+    if str(progress_bar.cget("mode")) != "determinate":
+        progress_bar.stop()
+        progress_bar.config(mode="determinate")
+        progress_label.grid(row=1, column=0, sticky="w", padx=10)
+    progress_bar.config(maximum=max(1, snapshot['total']), value=snapshot['done'])
+    progress_label.config(text=format_progress(snapshot))
+
+def show_status(message):
+    """Show a progress message in the viewer unless the user is reading a post"""
+    if selected_result() is None:
+        output_text.delete(1.0, tk.END)
+        output_text.insert(tk.END, message)
+
+def get_results_dir():
+    """Return the folder holding this session's generated posts"""
+    global results_dir
+    if results_dir is None:
+        results_dir = tempfile.mkdtemp(prefix="blog_results_")
+    return results_dir
+
+def add_result(name, content, select=False):
+    """Save a generated post to the results folder and queue it for the results list"""
+    status = "failed" if content.startswith("Error") else "done"
+    path = os.path.join(get_results_dir(), f"{next(results_counter):05d}.md")
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    
+    # Called from worker threads, so the Treeview is updated by the UI bus on the Tk thread
+    ui_bus.post('result', name=name, path=path, status=status, select=select)
+
+def insert_result_row(name, path, status, select=False):
+    """Add a row for a generated post to the results list"""
+    iid = results_tree.insert("", tk.END, text=name, values=(status,))
+    results_items[iid] = {'name': name, 'path': path, 'status': status}
+    if select:
+        results_tree.selection_set(iid)
+        results_tree.see(iid)
+
+def clear_results():
+    """Remove every post from the results list and its saved content"""
+    global search_row
+    results_tree.delete(*results_tree.get_children())
+    for result in results_items.values():
+        if result['path'] is None:
+            continue
+        try:
+            os.remove(result['path'])
+        except OSError:
+            pass
+    results_items.clear()
+    archive_rows.clear()
+    search_row = None
+
+def search_catalog(query):
+    """List the catalog's posts matching a full-text query under a row at the top of the results"""
+    global search_row
+    query = query.strip()
+    if not query:
+        return
+    try:
+        # Plain words, not FTS5 syntax: "self-hosting" or "C++" would otherwise be errors
+        hits = search_posts(query, raw=False)
+    except sqlite3.Error as e:
+        messagebox.showerror("Search", f"Could not search for \"{query}\": {str(e)}")
+        return
+    
+    # Replace the previous search
+    if search_row is not None:
+        for iid in results_tree.get_children(search_row):
+            results_items.pop(iid, None)
+        results_tree.delete(search_row)
+    search_row = results_tree.insert("", 0, text=f"Search: {query}", values=(f"{len(hits)} found",), open=True)
+    for hit in hits:
+        created = datetime.fromtimestamp(hit['created']).strftime("%Y-%m-%d")
+        iid = results_tree.insert(search_row, tk.END, text=f"{hit['title'] or hit['name']}", values=(created,))
+        results_items[iid] = {'name': hit['name'], 'path': None, 'status': 'catalog', 'post_id': hit['id']}
+    results_tree.see(search_row)
+
+def open_archive_dialog():
+    """Ask for a post archive and list its posts in the results"""
+    archive = filedialog.askopenfilename(
+        title="Open Post Archive",
+        initialdir=ARCHIVE_DIR if os.path.isdir(ARCHIVE_DIR) else None,
+        filetypes=[("Post archive", "*.zip")]
+    )
+    if archive:
+        show_archive(archive)
+
+def show_archive(archive):
+    """List an archive's posts under a row at the top of the results (read from its index, nothing is extracted)"""
+    try:
+        posts = read_index(archive)
+    except Exception as e:
+        messagebox.showerror("Archive", f"Could not open {archive}: {str(e)}")
+        return
+    
+    # Reopening an archive replaces its rows
+    if archive in archive_rows:
+        for iid in results_tree.get_children(archive_rows[archive]):
+            results_items.pop(iid, None)
+        results_tree.delete(archive_rows[archive])
+    row = results_tree.insert("", 0, text=f"Archive: {os.path.basename(archive)}", values=(f"{len(posts)} posts",), open=True)
+    archive_rows[archive] = row
+    for post in posts:
+        created = datetime.fromtimestamp(post['created']).strftime("%Y-%m-%d")
+        iid = results_tree.insert(row, tk.END, text=f"{post['title'] or post['name']}", values=(created,))
+        results_items[iid] = {'name': post['name'], 'path': None, 'status': 'archived',
+                              'archive': archive, 'member': post['entries']['post']}
+    results_tree.see(row)
+
+def selected_result():
+    """Return the selected results entry, or None"""
+    selection = results_tree.selection() if results_tree else ()
+    return results_items.get(selection[0]) if selection else None
+
+def read_result(result):
+    """Load a post's content from the results folder, the catalog for search hits, or its archive"""
+    if result.get('archive'):
+        return read_member(result['archive'], result['member']).decode('utf-8')
+    if result.get('post_id') is not None:
+        return get_post(result['post_id'])['markdown']
+    with open(result['path'], 'r', encoding='utf-8') as f:
+        return f.read()
+
+def show_selected_result(root):
+    """Load the selected post into the viewer"""
+    result = selected_result()
+    if result:
+        try:
+            show_text_in_chunks(root, read_result(result))
+        except Exception as e:
+            messagebox.showerror("Error", f"Could not load {result['name']}: {str(e)}")
+
+def show_text_in_chunks(root, text):
+    """Replace the viewer's content, inserting large texts a chunk at a time so the UI stays responsive"""
+    global viewer_generation
+    viewer_generation += 1
+    generation = viewer_generation
+    output_text.delete(1.0, tk.END)
+    
+    def insert_chunk(start):
+        # A newer selection replaced this one
+        if generation != viewer_generation:
+            return
+        output_text.insert(tk.END, text[start:start + VIEWER_CHUNK_CHARS])
+        if start + VIEWER_CHUNK_CHARS < len(text):
+            root.after(1, lambda: insert_chunk(start + VIEWER_CHUNK_CHARS))
+    
+    insert_chunk(0)
+
+def build_anthology_dialog(root):
+    """Ask for a folder of markdown posts and an output file, then build the anthology"""
+    folder_selected = filedialog.askdirectory(title="Select Folder of Markdown Posts")
+    if not folder_selected:
+        return
+    
+    output_file = filedialog.asksaveasfilename(
+        title="Save Anthology As",
+        defaultextension=".docx",
+        filetypes=[("Word document", "*.docx"), ("Rich Text", "*.rtf")]
+    )
+    if not output_file:
+        return
+    
+    def run_build():
+        try:
+            build_anthology(folder_selected, output_file)
+            ui_bus.post('info', title="Anthology", message=f"Anthology saved to:\n{output_file}")
+        except Exception as e:
+            error_message = f"Failed to build anthology: {str(e)}"
+            print(error_message)
+            ui_bus.post('error', title="Anthology Error", message=error_message)
+    
+    # Building can take a while for big folders, so keep it off the Tk thread
+    threading.Thread(target=run_build, daemon=True).start()
 
 def copy_to_clipboard(root, output_text):
-    """Copy the contents of the output text area to the clipboard"""
-    content = output_text.get(1.0, tk.END)
+    """Copy the selected post (or the contents of the output text area) to the clipboard"""
+    # Read the selected post from disk rather than from the viewer, which may still be filling
+    result = selected_result()
+    content = read_result(result) if result else output_text.get(1.0, tk.END)
     root.clipboard_clear()
     root.clipboard_append(content)
     messagebox.showinfo("Success", "Content copied to clipboard!")
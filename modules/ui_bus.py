@@ -0,0 +1,78 @@
+import queue
+import threading
+
+# How often the Tk main loop drains the queue, and the most events applied per drain
+UI_BUS_INTERVAL_MS = 50
+UI_BUS_MAX_EVENTS = 200
+
+class UIBus:
+    """Queue of UI updates posted by worker threads and applied on the Tk main loop
+
+    Workers call post() and never touch widgets. The main loop drains the queue
+    every interval_ms. Events of a coalesced kind replace a pending event with
+    the same kind and key, so a burst of progress or status updates costs one
+    redraw per drain no matter how many workers post them.
+    """
+
+    def __init__(self, root, interval_ms=UI_BUS_INTERVAL_MS, max_events=UI_BUS_MAX_EVENTS):
+        self.root = root
+        self.interval_ms = interval_ms
+        self.max_events = max_events
+        self.queue = queue.Queue()
+        self.handlers = {}
+        self.coalesced = set()
+        self.latest = {}
+        self.lock = threading.Lock()
+        self.running = False
+
+    def subscribe(self, kind, handler, coalesce=False):
+        """Register handler(**fields) for events of a kind, optionally keeping only the latest one"""
+        self.handlers[kind] = handler
+        if coalesce:
+            self.coalesced.add(kind)
+
+    def post(self, kind, key=None, **fields):
+        """Queue an event from any thread"""
+        if kind not in self.coalesced:
+            self.queue.put((kind, fields))
+            return
+
+        # Keep the queue position of the first pending event, but the fields of the newest
+        with self.lock:
+            pending = (kind, key) in self.latest
+            self.latest[(kind, key)] = fields
+        if not pending:
+            self.queue.put((kind, key))
+
+    def start(self):
+        """Start draining the queue on the Tk main loop"""
+        if not self.running:
+            self.running = True
+            self.root.after(self.interval_ms, self.drain)
+
+    def stop(self):
+        self.running = False
+
+    def drain(self):
+        """Apply up to max_events queued events, then reschedule"""
+        for _ in range(self.max_events):
+            try:
+                kind, payload = self.queue.get_nowait()
+            except queue.Empty:
+                break
+
+            if kind in self.coalesced:
+                with self.lock:
+                    fields = self.latest.pop((kind, payload), None)
+                if fields is None:
+                    continue
+            else:
+                fields = payload
+
+            try:
+                self.handlers[kind](**fields)
+            except Exception as e:
+                print(f"Error handling UI event {kind}: {e}")
+
+        if self.running:
+            self.root.after(self.interval_ms, self.drain)
@@ -0,0 +1,166 @@
+import os
+import sys
+import json
+import platform
+import threading
+
+from modules.settings import get_preferred_voices, VOICE_CATALOG_FILE
+from modules.audio_cache import synthesize_cached, cached_audio_path
+
+# Voice indices used when no preferred voices are saved
+DEFAULT_VOICE_INDICES = [14, 30, 38, 39, 66, 80, 89, 90, 97, 108]
+
+# Samples are rendered at the same rate the app speaks at
+VOICE_SAMPLE_RATE = 190
+VOICE_SAMPLE_TEXT = "This is a sample of my voice. How do I sound?"
+
+# Folders where each platform installs voices; a change to any of them means
+# voices were added or removed, so the cached catalog is rebuilt
+VOICE_DIRS = {
+    'darwin': ['/System/Library/Speech/Voices', '/Library/Speech/Voices',
+               os.path.expanduser('~/Library/Speech/Voices')],
+    'win32': [os.path.join(os.environ.get('WINDIR', r'C:\Windows'), 'Speech_OneCore', 'Voices', 'Tokens'),
+              os.path.join(os.environ.get('WINDIR', r'C:\Windows'), 'Speech', 'Engines', 'TTS')],
+    'linux': ['/usr/share/espeak-ng-data/voices', '/usr/lib/x86_64-linux-gnu/espeak-ng-data/voices',
+              '/usr/share/espeak-data/voices'],
+}
+
+# Catalog loaded in this process, and the background sample renderer
+_voice_catalog = None
+_catalog_lock = threading.Lock()
+_prerender_thread = None
+
+def tts_driver_name():
+    """Return the pyttsx3 driver used on this platform"""
+    if sys.platform == 'darwin':
+        return 'nsss'
+    if sys.platform == 'win32':
+        return 'sapi5'
+    return 'espeak'
+
+def catalog_fingerprint():
+    """Describe the platform, driver and installed voice folders the catalog was built for
+
+    Only stats a few folders, so checking it is much cheaper than enumerating voices.
+    """
+    try:
+        from importlib.metadata import version
+        pyttsx3_version = version('pyttsx3')
+    except Exception:
+        pyttsx3_version = ''
+
+    voice_dirs = {}
+    for path in VOICE_DIRS.get(sys.platform, VOICE_DIRS['linux']):
+        try:
+            voice_dirs[path] = os.path.getmtime(path)
+        except OSError:
+            continue
+
+    return {
+        'platform': sys.platform,
+        'release': platform.release(),
+        'driver': tts_driver_name(),
+        'pyttsx3': pyttsx3_version,
+        'voice_dirs': voice_dirs,
+    }
+
+def load_voice_catalog():
+    """Return the voices saved on disk, or None if missing or built for a different setup"""
+    try:
+        with open(VOICE_CATALOG_FILE, 'r', encoding='utf-8') as f:
+            catalog = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if catalog.get('fingerprint') != catalog_fingerprint():
+        return None
+    return catalog.get('voices')
+
+def save_voice_catalog(voices):
+    """Save the voice list along with the fingerprint it is valid for"""
+    try:
+        temp_path = VOICE_CATALOG_FILE + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'fingerprint': catalog_fingerprint(), 'voices': voices}, f, indent=4)
+        os.replace(temp_path, VOICE_CATALOG_FILE)
+    except Exception as e:
+        print(f"Error saving voice catalog: {str(e)}")
+
+def get_voice_catalog(worker, refresh=False):
+    """Return the installed voices, asking the TTS worker only when the cached catalog is stale"""
+    global _voice_catalog
+    with _catalog_lock:
+        if _voice_catalog is not None and not refresh:
+            return _voice_catalog
+
+    # Enumerating can take seconds, so it runs without the lock and callers that
+    # only need the loaded catalog aren't held up behind it
+    voices = None if refresh else load_voice_catalog()
+    if voices is None:
+        voices = worker.list_voices()
+        save_voice_catalog(voices)
+        print(f"Debug: Enumerated {len(voices)} voices")
+    with _catalog_lock:
+        _voice_catalog = voices
+    return voices
+
+def get_preferred_indices():
+    """Return the preferred voice indices from settings as integers"""
+    preferred_indices = []
+    for idx in get_preferred_voices():
+        try:
+            preferred_indices.append(int(idx))
+        except:
+            continue
+
+    # Use default indices if none are set
+    return preferred_indices or list(DEFAULT_VOICE_INDICES)
+
+def preferred_catalog_voices(voices):
+    """Return the preferred voices that are installed, in preference order"""
+    return [voices[i] for i in get_preferred_indices() if i < len(voices)]
+
+def sample_text(voice):
+    """Return the text spoken when previewing a voice"""
+    return f"Voice number {voice['index']}: {voice['name']}. {VOICE_SAMPLE_TEXT}"
+
+def cached_sample_path(voice):
+    """Return the pre-rendered sample for a voice, or None if it hasn't been rendered yet"""
+    return cached_audio_path(sample_text(voice), 'pyttsx3', voice['id'], VOICE_SAMPLE_RATE)
+
+def render_sample(worker, voice):
+    """Return the sample clip for a voice, rendering it with the TTS worker if needed"""
+    def render(text, path):
+        return worker.render_to_file(text, path, voice_id=voice['id'], rate=VOICE_SAMPLE_RATE)
+
+    return synthesize_cached(sample_text(voice), 'pyttsx3', render, voice['id'], VOICE_SAMPLE_RATE)
+
+def prerender_samples(worker):
+    """Render sample clips for every preferred voice that doesn't have one yet"""
+    try:
+        voices = preferred_catalog_voices(get_voice_catalog(worker))
+    except Exception as e:
+        print(f"Error loading voice catalog: {str(e)}")
+        return 0
+
+    rendered = 0
+    for voice in voices:
+        if cached_sample_path(voice):
+            continue
+        try:
+            render_sample(worker, voice)
+            rendered += 1
+        except Exception as e:
+            print(f"Error rendering sample for {voice['name']}: {str(e)}")
+    if rendered:
+        print(f"Debug: Pre-rendered {rendered} voice samples")
+    return rendered
+
+def start_sample_prerender(worker):
+    """Pre-render the preferred voice samples on a background thread (once at a time)"""
+    global _prerender_thread
+    if _prerender_thread is not None and _prerender_thread.is_alive():
+        return _prerender_thread
+    _prerender_thread = threading.Thread(target=prerender_samples, args=(worker,),
+                                         name="voice-samples", daemon=True)
+    _prerender_thread.start()
+    return _prerender_thread